@@ -0,0 +1,202 @@
+import copy
+import json
+import logging
+import os
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from .cache import ResponseCache
+from .concurrency import run_concurrently
+from .decorators import merge_blocks, time_indexed
+from .exceptions import NoMatchingDataError
+from .mappings import Area
+from .misc import day_blocks, month_blocks, year_blocks
+from .priority import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+BLOCKS = {
+    'year': year_blocks,
+    'month': month_blocks,
+    'day': day_blocks,
+}
+
+
+class Backfill:
+    """
+    Long running query split into blocks that are checkpointed to a journal,
+    so an interrupted backfill resumes where it stopped.
+
+    Every finished block is stored in the directory and recorded in
+    journal.jsonl. The raw responses, including every offset of paginated
+    queries, go to a persistent response cache in the same directory, so
+    after a crash even a half finished block does not repeat the requests it
+    already made.
+
+    backfill = Backfill(client, 'query_unavailability_of_generation_units', 'BE',
+                        start=start, end=end, directory='backfill_be')
+    df = backfill.run()
+    """
+
+    JOURNAL = 'journal.jsonl'
+
+    def __init__(self, client, method: str, *args, start: pd.Timestamp, end: pd.Timestamp,
+                 directory: str, block: str = 'month', **kwargs):
+        """
+        Parameters
+        ----------
+        client : EntsoePandasClient
+        method : str
+            name of the query method
+        start : pd.Timestamp
+        end : pd.Timestamp
+        directory : str
+            folder for the journal, the finished blocks and the responses
+        block : str
+            size of a checkpointed unit: 'year', 'month' or 'day'
+        args, kwargs
+            passed on to the query method
+        """
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.start = start
+        self.end = end
+        self.directory = directory
+        self.units: List[Tuple[pd.Timestamp, pd.Timestamp]] = list(BLOCKS[block](start, end))
+        os.makedirs(directory, exist_ok=True)
+
+        # a copy of the client that keeps every response in the backfill directory
+        self.client = copy.copy(client)
+        self.client.cache = ResponseCache(
+            directory=os.path.join(directory, 'responses'), ttl=None,
+            negative_ttl=None, recent_negative_ttl=None, max_memory_entries=0)
+
+        self._lock = threading.Lock()
+        self._done = {}
+        self._load_journal()
+
+    def _description(self) -> dict:
+        def normalize(value):
+            return value.name if isinstance(value, Area) else str(value)
+        return {
+            'method': self.method,
+            'args': [normalize(a) for a in self.args],
+            'kwargs': {k: normalize(v) for k, v in sorted(self.kwargs.items())},
+            'units': [[s.isoformat(), e.isoformat()] for s, e in self.units]
+        }
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.directory, self.JOURNAL)
+
+    def _load_journal(self):
+        path = self._journal_path()
+        if not os.path.exists(path):
+            self._append({'job': self._description()})
+            return
+        lines = []
+        intact = 0
+        with open(path, 'rb') as stream:
+            raw = stream.readlines()
+        for i, line in enumerate(raw):
+            try:
+                if line.strip():
+                    lines.append(json.loads(line))
+            except ValueError:
+                # a crash while appending leaves the last line incomplete
+                if i < len(raw) - 1:
+                    raise ValueError(f'Line {i + 1} of the journal in {self.directory} is corrupt')
+                logger.warning(f'Dropping the incomplete last line of the journal in {self.directory}')
+                break
+            intact += len(line)
+        if intact < sum(len(line) for line in raw):
+            with open(path, 'r+b') as stream:
+                stream.truncate(intact)
+        if len(lines) == 0:
+            self._append({'job': self._description()})
+            return
+        if lines[0].get('job') != self._description():
+            raise ValueError(f'{self.directory} holds the journal of a different backfill')
+        for line in lines[1:]:
+            self._done[line['unit']] = line
+
+    def _append(self, record: dict):
+        with self._lock:
+            with open(self._journal_path(), 'a') as stream:
+                stream.write(json.dumps(record) + '\n')
+                stream.flush()
+                os.fsync(stream.fileno())
+
+    def _unit_path(self, unit: int) -> str:
+        return os.path.join(self.directory, f'unit-{unit:05d}.pkl')
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """(finished units, total units)"""
+        return len(self._done), len(self.units)
+
+    @property
+    def finished(self) -> bool:
+        return len(self._done) == len(self.units)
+
+    def _run_unit(self, unit: int, on_progress: Optional[Callable]):
+        _start, _end = self.units[unit]
+        query = getattr(self.client, self.method)
+        try:
+            frame = query(*self.args, start=_start, end=_end, **self.kwargs)
+        except NoMatchingDataError:
+            frame = None
+        if frame is not None:
+            frame.to_pickle(self._unit_path(unit))
+        record = {'unit': unit, 'start': _start.isoformat(), 'end': _end.isoformat(),
+                  'empty': frame is None}
+        self._append(record)
+        with self._lock:
+            self._done[unit] = record
+        logger.info(f'Backfill {self.method}: {len(self._done)}/{len(self.units)} units done')
+        if on_progress is not None:
+            on_progress(*self.progress)
+
+    def run(self, max_workers: int = 1, on_progress: Optional[Callable[[int, int], None]] = None,
+            priority: Priority = Priority.BULK):
+        """
+        Run the units that are not in the journal yet and return the result.
+        If a unit fails the error is raised once the running units finished,
+        calling run again resumes from there.
+
+        Parameters
+        ----------
+        max_workers : int
+            number of units that run at the same time
+        on_progress : callable, optional
+            called with (finished units, total units) after every unit
+        priority : Priority
+            priority of the requests, bulk by default so interactive queries
+            sharing the rate limiter go first
+
+        Returns
+        -------
+        pd.DataFrame | pd.Series
+        """
+        todo = [unit for unit in range(len(self.units)) if unit not in self._done]
+        with request_priority(priority):
+            outcomes = run_concurrently(
+                [lambda unit=unit: self._run_unit(unit, on_progress) for unit in todo],
+                max_workers=max_workers)
+        for _, error in outcomes:
+            if error is not None:
+                raise error
+        return self.result()
+
+    def result(self):
+        """Combine the finished units, raises NoMatchingDataError if none has data"""
+        frames = []
+        for unit, (_start, _end) in enumerate(self.units):
+            record = self._done.get(unit)
+            if record is None or record['empty']:
+                frames.append((_start, None))
+            else:
+                frames.append((_start, pd.read_pickle(self._unit_path(unit))))
+        return merge_blocks(frames, truncate=time_indexed(self.method))
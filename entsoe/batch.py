@@ -0,0 +1,159 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+
+from .concurrency import run_concurrently
+from .decorators import merge_blocks, time_indexed
+from .exceptions import NoMatchingDataError
+from .mappings import Area, lookup_area
+from .misc import year_blocks
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJob(NamedTuple):
+    """
+    One query of a batch: a client method name, the area (or tuple of areas
+    for cross border methods) and any other keyword arguments. start and end
+    may be given in kwargs to override the window of the batch.
+    """
+    method: str
+    area: Union[Area, str, Tuple[Union[Area, str], ...]]
+    kwargs: Optional[Dict] = None
+
+    @property
+    def args(self) -> tuple:
+        return self.area if isinstance(self.area, tuple) else (self.area,)
+
+    def __str__(self):
+        areas = ', '.join(lookup_area(a).name for a in self.args)
+        return f'{self.method}({areas})'
+
+
+class BatchFailure(NamedTuple):
+    index: int
+    job: BatchJob
+    error: BaseException
+
+
+class BatchResult:
+    """Outcome of run_batch: a result per job and the jobs that failed"""
+
+    def __init__(self, jobs: List[BatchJob], results: List[Any], failures: List[BatchFailure]):
+        self.jobs = jobs
+        self.results = results
+        self.failures = failures
+
+    def __getitem__(self, index: int) -> Any:
+        return self.results[index]
+
+    def __iter__(self):
+        return iter(zip(self.jobs, self.results))
+
+    def __len__(self):
+        return len(self.jobs)
+
+    @property
+    def ok(self) -> bool:
+        return len(self.failures) == 0
+
+    def failure_report(self) -> pd.DataFrame:
+        """One row per failed job with the error that stopped it"""
+        return pd.DataFrame(
+            [{
+                'job': f.index,
+                'method': f.job.method,
+                'area': ', '.join(lookup_area(a).name for a in f.job.args),
+                'error': type(f.error).__name__,
+                'message': str(f.error)
+            } for f in self.failures],
+            columns=['job', 'method', 'area', 'error', 'message']
+        )
+
+
+def plan_batch(jobs: List[BatchJob], start: Optional[pd.Timestamp] = None,
+               end: Optional[pd.Timestamp] = None) -> List[Tuple[int, pd.Timestamp, pd.Timestamp]]:
+    """
+    Split jobs into the units that are executed concurrently: one per year
+    block of the job's window, as year_limited would request them, so long
+    windows are spread over the workers as well.
+
+    Returns
+    -------
+    [(job index, pd.Timestamp, pd.Timestamp)]
+    """
+    units = []
+    for i, job in enumerate(jobs):
+        kwargs = job.kwargs or {}
+        _start = kwargs.get('start', start)
+        _end = kwargs.get('end', end)
+        if _start is None or _end is None:
+            raise ValueError(f'No start and end given for {job}')
+        # results not indexed by time cannot be stitched back together per year
+        if not time_indexed(job.method):
+            units.append((i, _start, _end))
+            continue
+        for block_start, block_end in year_blocks(_start, _end):
+            units.append((i, block_start, block_end))
+    return units
+
+
+def run_batch(client, jobs: List[Union[BatchJob, tuple]],
+              start: Optional[pd.Timestamp] = None,
+              end: Optional[pd.Timestamp] = None,
+              max_workers: int = 4) -> BatchResult:
+    """
+    Run many queries, for instance a few endpoints for every bidding zone,
+    with bounded concurrency. Requests go through the client so its rate
+    limiter and cache apply. A failing job is recorded in the failure report
+    and does not stop the rest of the batch.
+
+    Parameters
+    ----------
+    client : EntsoePandasClient
+    jobs : [BatchJob | (method, area, kwargs)]
+    start : pd.Timestamp
+        window for all jobs that do not set their own
+    end : pd.Timestamp
+    max_workers : int
+        maximum number of requests in flight
+
+    Returns
+    -------
+    BatchResult
+    """
+    jobs = [job if isinstance(job, BatchJob) else BatchJob(*job) for job in jobs]
+    units = plan_batch(jobs, start, end)
+    logger.debug(f'Batch of {len(jobs)} jobs planned as {len(units)} units')
+
+    def task(i, _start, _end):
+        job = jobs[i]
+        kwargs = {k: v for k, v in (job.kwargs or {}).items() if k not in ('start', 'end')}
+        return getattr(client, job.method)(*job.args, start=_start, end=_end, **kwargs)
+
+    outcomes = run_concurrently(
+        [lambda unit=unit: task(*unit) for unit in units], max_workers=max_workers)
+
+    per_job = {i: [] for i in range(len(jobs))}
+    errors = {}
+    for (i, _start, _end), (frame, error) in zip(units, outcomes):
+        if isinstance(error, NoMatchingDataError):
+            error = None
+        if error is not None:
+            errors.setdefault(i, error)
+        per_job[i].append((_start, frame))
+
+    results = []
+    failures = []
+    for i, job in enumerate(jobs):
+        if i in errors:
+            results.append(None)
+            failures.append(BatchFailure(i, job, errors[i]))
+            continue
+        try:
+            results.append(merge_blocks(per_job[i]))
+        except NoMatchingDataError as e:
+            results.append(None)
+            failures.append(BatchFailure(i, job, e))
+    return BatchResult(jobs, results, failures)
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to the API while it is down.
+
+    After failure_threshold consecutive failed requests (connection errors,
+    timeouts or 5xx responses) the circuit opens and requests fail at once
+    with CircuitOpenError instead of waiting for retries, or are answered
+    with a stale cached response if the client has one. After reset_timeout
+    a few probe requests are let through (half-open): a successful probe
+    closes the circuit again, a failed one opens it for another reset_timeout.
+
+    Share one breaker between the clients and threads using the same API.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 half_open_requests: int = 1):
+        """
+        Parameters
+        ----------
+        failure_threshold : int
+            consecutive failures that open the circuit
+        reset_timeout : float
+            seconds the circuit stays open before it is probed
+        half_open_requests : int
+            number of probe requests allowed at the same time while half-open
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self._state = CLOSED
+        self._failures = 0
+        self._opened = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now, a True while half-open is a probe"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._probes >= self.half_open_requests:
+                return False
+            self._probes += 1
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError if a request may not be sent now"""
+        if not self.allow():
+            raise CircuitOpenError(f'ENTSO-E API unavailable, circuit open after {self._failures} failures')
+
+    def success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info('ENTSO-E API is back, circuit closed')
+            self._state = CLOSED
+            self._failures = 0
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or \
+                    (self._state == CLOSED and self._failures >= self.failure_threshold):
+                logger.warning(f'{self._failures} failed requests, circuit open for {self.reset_timeout} seconds')
+                self._state = OPEN
+                self._opened = time.monotonic()
+
+    def __repr__(self):
+        return f'<CircuitBreaker: {self.state}>'
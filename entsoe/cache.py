@@ -0,0 +1,349 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import pandas as pd
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(params: Dict) -> str:
+    """
+    Key identifying an API request by its parameters, independent of the
+    order they were given in and of the security token used to make it
+    """
+    normalized = sorted((k, str(v)) for k, v in params.items() if k != 'securityToken')
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+def is_no_matching_data(response: requests.Response) -> bool:
+    """
+    Whether a response is ENTSO-E's acknowledgement that there is no data
+    for the query. Depending on the endpoint this comes as an error status or
+    as a 200 with an acknowledgement document, zip files are never checked.
+    """
+    if response.status_code != 200 or response.headers.get('content-type', '') in ['application/xml', 'text/xml']:
+        return b'No matching data found' in response.content
+    return False
+
+
+class CacheEntry:
+    """A stored API response"""
+
+    def __init__(self, content: bytes, status_code: int, content_type: str,
+                 params: Dict, stored_at: Optional[float] = None,
+                 negative: bool = False):
+        self.content = content
+        self.status_code = status_code
+        self.content_type = content_type
+        self.params = {k: str(v) for k, v in params.items() if k != 'securityToken'}
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.negative = negative
+
+    @classmethod
+    def from_response(cls, response: requests.Response, params: Dict) -> 'CacheEntry':
+        return cls(
+            content=response.content,
+            status_code=response.status_code,
+            content_type=response.headers.get('content-type', ''),
+            params=params,
+            negative=is_no_matching_data(response)
+        )
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response._content = self.content
+        response.status_code = self.status_code
+        response.headers['content-type'] = self.content_type
+        response.encoding = 'utf-8'
+        response.url = 'cache://' + request_key(self.params)
+        return response
+
+    def age(self, now: Optional[float] = None) -> pd.Timedelta:
+        now = time.time() if now is None else now
+        return pd.Timedelta(seconds=now - self.stored_at)
+
+    @property
+    def period_end(self) -> Optional[pd.Timestamp]:
+        """End of the requested window, None for requests without one"""
+        if 'periodEnd' not in self.params:
+            return None
+        return pd.Timestamp(self.params['periodEnd'], tz='UTC')
+
+
+class TTLRule(NamedTuple):
+    """
+    Freshness of the responses of one endpoint. Data for windows that had
+    ended at least final_after before it was fetched is considered final and
+    kept for final_ttl, more recent data for recent_ttl. A final_after of
+    None means the data is never final. A ttl of None means forever.
+    """
+    final_after: Optional[pd.Timedelta]
+    recent_ttl: Optional[pd.Timedelta]
+    final_ttl: Optional[pd.Timedelta] = None
+
+
+# keyed by documentType or (documentType, processType), the latter takes precedence
+DEFAULT_TTL_RULES = {
+    # day ahead prices and net positions are final once the auction is published
+    'A44': TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(minutes=15)),
+    'A25': TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(minutes=15)),
+    # forecasts do not change after publication, only future windows still fill up
+    ('A65', 'A01'): TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(hours=1)),
+    'A69': TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(hours=1)),
+    'A71': TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(hours=1)),
+    'A61': TTLRule(final_after=pd.Timedelta(0), recent_ttl=pd.Timedelta(hours=1)),
+    # actuals are revised for days after real time
+    ('A65', 'A16'): TTLRule(final_after=pd.Timedelta(days=7), recent_ttl=pd.Timedelta(minutes=15)),
+    'A73': TTLRule(final_after=pd.Timedelta(days=7), recent_ttl=pd.Timedelta(minutes=15)),
+    'A75': TTLRule(final_after=pd.Timedelta(days=7), recent_ttl=pd.Timedelta(minutes=15)),
+    'A11': TTLRule(final_after=pd.Timedelta(days=7), recent_ttl=pd.Timedelta(minutes=15)),
+    'A72': TTLRule(final_after=pd.Timedelta(days=7), recent_ttl=pd.Timedelta(hours=1)),
+    # imbalance settlement data is corrected for weeks
+    'A85': TTLRule(final_after=pd.Timedelta(days=30), recent_ttl=pd.Timedelta(minutes=15)),
+    'A86': TTLRule(final_after=pd.Timedelta(days=30), recent_ttl=pd.Timedelta(minutes=15)),
+    # installed capacity is published yearly
+    'A68': TTLRule(final_after=pd.Timedelta(days=366), recent_ttl=pd.Timedelta(days=1)),
+    ('A71', 'A33'): TTLRule(final_after=pd.Timedelta(days=366), recent_ttl=pd.Timedelta(days=1)),
+    # outages are updated all the time, only long past windows settle down
+    'A77': TTLRule(final_after=pd.Timedelta(days=90), recent_ttl=pd.Timedelta(minutes=10)),
+    'A78': TTLRule(final_after=pd.Timedelta(days=90), recent_ttl=pd.Timedelta(minutes=10)),
+    'A79': TTLRule(final_after=pd.Timedelta(days=90), recent_ttl=pd.Timedelta(minutes=10)),
+    'A80': TTLRule(final_after=pd.Timedelta(days=90), recent_ttl=pd.Timedelta(minutes=10)),
+}
+
+
+class FreshnessPolicy:
+    """
+    Derives the lifetime of a cached response from the endpoint it came from
+    (documentType and processType) and how old the requested window was when
+    it was fetched, so finalized history is served forever while the recent,
+    still changing tail is refreshed.
+    """
+
+    def __init__(self, rules: Optional[Dict] = None,
+                 default: TTLRule = TTLRule(final_after=pd.Timedelta(days=7),
+                                            recent_ttl=pd.Timedelta(hours=1))):
+        """
+        Parameters
+        ----------
+        rules : dict, optional
+            TTLRule per documentType or (documentType, processType), these
+            are added to and override DEFAULT_TTL_RULES
+        default : TTLRule
+            rule for endpoints without a specific one
+        """
+        self.rules = dict(DEFAULT_TTL_RULES)
+        self.rules.update(rules or {})
+        self.default = default
+
+    def rule_for(self, params: Dict) -> TTLRule:
+        document_type = params.get('documentType')
+        process_type = params.get('processType')
+        rule = self.rules.get((document_type, process_type))
+        if rule is None:
+            rule = self.rules.get(document_type)
+        return self.default if rule is None else rule
+
+    def ttl(self, entry: 'CacheEntry') -> Optional[pd.Timedelta]:
+        rule = self.rule_for(entry.params)
+        period_end = entry.period_end
+        if rule.final_after is None or period_end is None:
+            return rule.recent_ttl
+        stored_at = pd.Timestamp(entry.stored_at, unit='s', tz='UTC')
+        if period_end <= stored_at - rule.final_after:
+            return rule.final_ttl
+        return rule.recent_ttl
+
+
+class ResponseCache:
+    """
+    Cache of raw API responses keyed by request_key.
+
+    Entries live in memory and, when a directory is given, also on disk so
+    they survive restarts and can be shared between processes. On disk the
+    response bodies are content addressed (objects/<sha256>) and every request
+    key has a small json file (entries/<key>.json) pointing to its body.
+
+    Besides responses with data, "No matching data found" acknowledgements
+    are cached as well so known empty queries (and the final empty offset of
+    paginated queries) are answered locally. Since ENTSO-E may still publish
+    data for recent windows, those negative entries get their own lifetime.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 ttl: Optional[pd.Timedelta] = None,
+                 max_memory_entries: Optional[int] = 1024,
+                 negative_ttl: Optional[pd.Timedelta] = pd.Timedelta(days=1),
+                 recent_negative_ttl: Optional[pd.Timedelta] = pd.Timedelta(minutes=15),
+                 recent_window: pd.Timedelta = pd.Timedelta(days=7),
+                 policy: Optional[FreshnessPolicy] = None):
+        """
+        Parameters
+        ----------
+        directory : str, optional
+            folder to persist the cache in, memory only if None
+        ttl : pd.Timedelta, optional
+            how long an entry stays fresh, forever if None
+        max_memory_entries : int, optional
+            number of most recently used entries kept in memory, unbounded if None
+        negative_ttl : pd.Timedelta, optional
+            how long an empty result stays fresh, forever if None, use
+            pd.Timedelta(0) to not cache empty results at all
+        recent_negative_ttl : pd.Timedelta, optional
+            how long an empty result for a recent window stays fresh
+        recent_window : pd.Timedelta
+            a window counts as recent if it ended less than this before the
+            empty result was received
+        policy : FreshnessPolicy, optional
+            derive the lifetime of responses with data from their endpoint and
+            window instead of using ttl
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.recent_negative_ttl = recent_negative_ttl
+        self.recent_window = recent_window
+        self.policy = policy
+        self.max_memory_entries = max_memory_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            os.makedirs(os.path.join(self.directory, 'entries'), exist_ok=True)
+            os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, 'entries', f'{key}.json')
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest)
+
+    def _remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if self.max_memory_entries is not None:
+                while len(self._entries) > self.max_memory_entries:
+                    self._entries.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None or self.directory is None:
+            return entry
+        try:
+            with open(self._entry_path(key), 'r') as stream:
+                meta = json.load(stream)
+            with open(self._object_path(meta['object']), 'rb') as stream:
+                content = stream.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        entry = CacheEntry(content=content, status_code=meta['status_code'],
+                           content_type=meta['content_type'], params=meta['params'],
+                           stored_at=meta['stored_at'], negative=meta.get('negative', False))
+        self._remember(key, entry)
+        return entry
+
+    def _write(self, key: str, entry: CacheEntry):
+        self._remember(key, entry)
+        if self.directory is None:
+            return
+        digest = hashlib.sha256(entry.content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            # write to a temporary file first so readers never see half a body
+            tmp = f'{object_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp, 'wb') as stream:
+                stream.write(entry.content)
+            os.replace(tmp, object_path)
+        entry_path = self._entry_path(key)
+        tmp = f'{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as stream:
+            json.dump({
+                'object': digest,
+                'status_code': entry.status_code,
+                'content_type': entry.content_type,
+                'params': entry.params,
+                'stored_at': entry.stored_at,
+                'negative': entry.negative
+            }, stream)
+        os.replace(tmp, entry_path)
+
+    def is_recent(self, entry: CacheEntry) -> bool:
+        """Whether the entry's window ended within recent_window of storing it"""
+        period_end = entry.period_end
+        if period_end is None:
+            return True
+        stored_at = pd.Timestamp(entry.stored_at, unit='s', tz='UTC')
+        return period_end > stored_at - self.recent_window
+
+    def ttl_for(self, entry: CacheEntry) -> Optional[pd.Timedelta]:
+        """Freshness lifetime of an entry, None means it never goes stale"""
+        if entry.negative:
+            return self.recent_negative_ttl if self.is_recent(entry) else self.negative_ttl
+        if self.policy is not None:
+            return self.policy.ttl(entry)
+        return self.ttl
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        ttl = self.ttl_for(entry)
+        return ttl is None or entry.age() <= ttl
+
+    def get(self, key: str, stale: bool = False) -> Optional[requests.Response]:
+        """
+        Return the cached response for a key, None if missing or stale.
+        With stale=True an expired response is returned as well, as a fallback
+        for when the API cannot be reached.
+        """
+        entry = self._read(key)
+        if entry is None or not (stale or self.is_fresh(entry)):
+            return None
+        logger.debug(f'Cache hit for {entry.params}')
+        return entry.to_response()
+
+    def put(self, key: str, response: requests.Response, params: Dict) -> bool:
+        """
+        Store a response if it is cacheable: successful responses and no data
+        acknowledgements are kept, other errors are left for the caller
+
+        Returns
+        -------
+        bool
+            whether the response was stored
+        """
+        entry = CacheEntry.from_response(response, params)
+        if entry.negative:
+            if self.ttl_for(entry) == pd.Timedelta(0):
+                return False
+        elif response.status_code != 200:
+            return False
+        self._write(key, entry)
+        return True
+
+    def store(self, key: str, response: requests.Response, params: Dict):
+        """Store a response whatever its status, bypassing the checks of put"""
+        self._write(key, CacheEntry.from_response(response, params))
+
+    def clear(self):
+        """Drop all entries from memory and disk"""
+        with self._lock:
+            self._entries = OrderedDict()
+        if self.directory is None:
+            return
+        for folder in ['entries', 'objects']:
+            path = os.path.join(self.directory, folder)
+            for name in os.listdir(path):
+                os.remove(os.path.join(path, name))
+
+    def __len__(self):
+        if self.directory is None:
+            return len(self._entries)
+        return len([n for n in os.listdir(os.path.join(self.directory, 'entries')) if n.endswith('.json')])
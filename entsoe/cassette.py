@@ -0,0 +1,181 @@
+"""
+Record the responses of the API and the file library once, then replay them
+without network access, for reproducible benchmarks and CI without keys.
+
+    cassette = Cassette('cassettes/prices', mode='record')
+    client = EntsoePandasClient(api_key, session=cassette.session())
+    client.query_day_ahead_prices('BE', start=start, end=end)
+
+    # later, anywhere, no key and no network needed
+    client = EntsoePandasClient('replay', session=Cassette('cassettes/prices').session())
+
+The cassette is a directory in the layout of a persistent ResponseCache.
+Requests are keyed by their normalized parameters without the security
+token, API requests by the same key as the response cache so a cassette can
+also be read with entsoe.manifest.offline_client. Passwords are left out of
+the keys and access tokens are redacted from the recorded responses.
+Throttled (429), failed (5xx) and rejected (4xx) responses are passed on but
+not recorded, except for the acknowledgements of no data and of the
+pagination limits which are answers to the request.
+"""
+import hashlib
+import json
+import logging
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from .cache import ResponseCache, request_key
+from .exceptions import CacheMissError
+
+logger = logging.getLogger(__name__)
+
+MODES = ('record', 'replay', 'auto')
+# left out of the keys and stored parameters of requests
+SECRET_PARAMS = {'securityToken', 'username', 'password', 'client_secret'}
+# redacted from recorded json responses
+SECRET_FIELDS = {'access_token', 'refresh_token', 'id_token'}
+REDACTED = 'redacted'
+# client errors that answer the request and are recorded like data
+RECORDED_ERRORS = (
+    'No matching data found',
+    'amount of requested data exceeds allowed limit',
+    'requested data to be gathered via the offset parameter exceeds the allowed limit',
+)
+
+
+def normalize(request: requests.PreparedRequest) -> Dict[str, str]:
+    """
+    Parameters identifying a request. For GET requests to the API these are
+    its query parameters, other requests add their method, url and body.
+    """
+    url = urlsplit(request.url)
+    params = {k: v for k, v in parse_qsl(url.query, keep_blank_values=True) if k not in SECRET_PARAMS}
+    if request.method == 'GET':
+        return params
+    params['method'] = request.method
+    params['url'] = f'{url.scheme}://{url.netloc}{url.path}'
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode()
+    content_type = request.headers.get('Content-Type', '')
+    if 'json' in content_type:
+        params['body'] = json.dumps(json.loads(body), sort_keys=True)
+    elif 'x-www-form-urlencoded' in content_type:
+        form = sorted((k, v) for k, v in parse_qsl(body.decode()) if k not in SECRET_PARAMS)
+        params['body'] = json.dumps(form)
+    elif body:
+        params['body'] = hashlib.sha256(body).hexdigest()
+    return params
+
+
+def recordable(response: requests.Response) -> bool:
+    """Whether a response answers its request, rather than a failure to send it or to authenticate"""
+    if response.status_code < 400:
+        return True
+    if response.status_code < 500 and response.status_code != 429:
+        return any(error in response.text for error in RECORDED_ERRORS)
+    return False
+
+
+def redact(response: requests.Response) -> requests.Response:
+    """The response with the access tokens in a json body replaced"""
+    if 'json' not in response.headers.get('content-type', ''):
+        return response
+    try:
+        data = response.json()
+    except ValueError:
+        return response
+    if not isinstance(data, dict) or not SECRET_FIELDS & data.keys():
+        return response
+    data = {k: REDACTED if k in SECRET_FIELDS else v for k, v in data.items()}
+    redacted = requests.Response()
+    redacted._content = json.dumps(data).encode()
+    redacted.status_code = response.status_code
+    redacted.headers['content-type'] = response.headers['content-type']
+    return redacted
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter recording responses to or replaying them from a cassette"""
+
+    def __init__(self, cassette: 'Cassette', adapter: Optional[BaseAdapter] = None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = HTTPAdapter() if adapter is None else adapter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        params = normalize(request)
+        key = request_key(params)
+        if self.cassette.mode != 'record':
+            response = self.cassette.store.get(key)
+            if response is not None:
+                response.request = request
+                response.url = request.url
+                return response
+            if self.cassette.mode == 'replay':
+                raise CacheMissError(f'{request.method} {request.url} with {params} '
+                                     f'is not in cassette {self.cassette.directory}')
+
+        response = self.adapter.send(request, **kwargs)
+        if not recordable(response):
+            logger.warning(f'Not recording {response.status_code} response for {params}')
+        else:
+            self.cassette.store.store(key, redact(response), params)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class Cassette:
+    """Directory of recorded responses"""
+
+    def __init__(self, directory: str, mode: str = 'replay'):
+        """
+        Parameters
+        ----------
+        directory : str
+        mode : str
+            'record' sends every request and stores its response, 'replay'
+            answers from the cassette only and raises CacheMissError for
+            requests it does not hold, 'auto' replays what it holds and
+            records the rest
+        """
+        if mode not in MODES:
+            raise ValueError(f'Unknown cassette mode {mode}, choose from {", ".join(MODES)}')
+        self.directory = directory
+        self.mode = mode
+        self.store = ResponseCache(directory=directory, ttl=None, negative_ttl=None,
+                                   recent_negative_ttl=None)
+
+    def adapter(self, adapter: Optional[BaseAdapter] = None) -> CassetteAdapter:
+        """
+        Parameters
+        ----------
+        adapter : BaseAdapter, optional
+            transport for the requests that are recorded, a new HTTPAdapter
+            by default
+        """
+        return CassetteAdapter(self, adapter)
+
+    def session(self, session: Optional[requests.Session] = None,
+                adapter: Optional[BaseAdapter] = None) -> requests.Session:
+        """
+        A session whose requests go through the cassette, to pass to
+        EntsoeRawClient, EntsoePandasClient or EntsoeFileClient
+
+        Parameters
+        ----------
+        session : requests.Session, optional
+            mount the cassette on this session instead of a new one
+        adapter : BaseAdapter, optional
+            transport for the requests that are recorded
+        """
+        session = requests.Session() if session is None else session
+        cassette_adapter = self.adapter(adapter)
+        session.mount('https://', cassette_adapter)
+        session.mount('http://', cassette_adapter)
+        return session
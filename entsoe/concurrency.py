@@ -0,0 +1,177 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional, Tuple
+
+from .priority import Priority, WaitQueue
+
+logger = logging.getLogger(__name__)
+
+
+def run_concurrently(tasks: List[Callable[[], Any]],
+                     max_workers: int) -> List[Tuple[Any, Optional[BaseException]]]:
+    """
+    Run independent tasks on a bounded thread pool and wait for all of them.
+
+    A failing task does not stop the others, every task gets an outcome.
+    Tasks run in a copy of the caller's context, so they keep its request
+    priority.
+
+    Parameters
+    ----------
+    tasks : [callable]
+        functions without arguments
+    max_workers : int
+        maximum number of tasks running at the same time
+
+    Returns
+    -------
+    [(result, exception)]
+        one outcome per task in the order of tasks, exception is None if the
+        task succeeded and result is None if it failed
+    """
+    def outcome(task):
+        try:
+            return task(), None
+        except Exception as e:
+            return None, e
+
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [outcome(task) for task in tasks]
+
+    # a context can only be entered by one thread at a time, copy it per task
+    contexts = [contextvars.copy_context() for _ in tasks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        return list(executor.map(lambda context, task: context.run(outcome, task), contexts, tasks))
+
+
+class AdaptiveConcurrency:
+    """
+    Limit on the number of requests in flight that adapts itself (AIMD):
+    every round of healthy responses raises it by one, a throttled (429),
+    failed (5xx) or timed out request cuts it by a factor.
+
+    Share one instance between clients, threads or batches that hit the same
+    API so they back off together. The thread pools of the clients are sized
+    for maximum, the limit decides how many of their threads send a request.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 decrease: float = 0.5, latency_target: Optional[float] = None,
+                 tolerance: float = 2.0):
+        """
+        Parameters
+        ----------
+        initial : int
+            limit to start with
+        minimum : int
+        maximum : int
+        decrease : float
+            factor the limit is multiplied with on an error
+        latency_target : float, optional
+            seconds, slower responses do not raise the limit. If None a
+            response is slow when it takes more than tolerance times the
+            smoothed latency of the previous responses
+        tolerance : float
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.tolerance = tolerance
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._waiting = WaitQueue()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Smoothed latency of the healthy responses in seconds"""
+        return self._latency
+
+    def acquire(self, priority: Optional[Priority] = None) -> float:
+        """
+        Wait for a free slot, returns the time the request starts. Free slots
+        go to the waiting request with the highest priority, by default the
+        priority of the current context.
+        """
+        with self._condition:
+            ticket = self._waiting.join(priority)
+            try:
+                while not (self._waiting.first(ticket) and self._in_flight < self.limit):
+                    self._condition.wait()
+                self._in_flight += 1
+            finally:
+                self._waiting.leave(ticket)
+                self._condition.notify_all()
+        return time.monotonic()
+
+    def release(self, started: float, ok: bool):
+        """
+        Free the slot of a request and adapt the limit to its outcome
+
+        Parameters
+        ----------
+        started : float
+            as returned by acquire
+        ok : bool
+            False for a throttled, failed or timed out request
+        """
+        latency = time.monotonic() - started
+        with self._condition:
+            self._in_flight -= 1
+            if not ok:
+                # requests sent before the previous cut saw the old limit, do
+                # not cut again for them
+                if started >= self._last_decrease:
+                    self._limit = max(self.minimum, self._limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+                    logger.info(f'Request failed, concurrency limit lowered to {self.limit}')
+            else:
+                target = self.latency_target
+                if target is None and self._latency is not None:
+                    target = self._latency * self.tolerance
+                if target is None or latency <= target:
+                    self._limit = min(self.maximum, self._limit + 1 / self._limit)
+                self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Optional[Priority] = None):
+        """
+        Hold a slot while the block runs. An exception counts as a failed
+        request unless it is marked ok with the yielded outcome:
+
+        with concurrency.slot() as outcome:
+            response = session.get(...)
+            outcome.ok = response.status_code < 500
+        """
+        outcome = _Outcome()
+        started = self.acquire(priority)
+        try:
+            yield outcome
+        except BaseException:
+            self.release(started, ok=False)
+            raise
+        self.release(started, ok=outcome.ok)
+
+    def __repr__(self):
+        return f'<AdaptiveConcurrency: limit {self.limit}, {self.in_flight} in flight>'
+
+
+class _Outcome:
+    ok = True
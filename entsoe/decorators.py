@@ -1,4 +1,5 @@
 import logging
+from typing import Any, List, Tuple
 from functools import wraps
 from socket import gaierror
 from time import sleep
@@ -7,10 +8,31 @@ import pandas as pd
 import requests
 
 from .exceptions import NoMatchingDataError, PaginationError
+from .instrumentation import _attempt, _attempts
+from .profiling import stage
 from .misc import day_blocks, year_blocks
 
 logger = logging.getLogger(__name__)
 
+# errors after which retry sends a request again
+RETRYABLE_ERRORS = (requests.ConnectionError, gaierror, RemoteDisconnected)
+# query methods whose results are not indexed by the time they describe
+# (outages and units), so the result for a window is not the result of its
+# blocks truncated to their own interval
+UNTIMED_METHODS = frozenset({
+    'query_unavailability_of_generation_units',
+    'query_unavailability_of_production_units',
+    'query_unavailability_of_offshore_grid',
+    'query_unavailability_transmission',
+    'query_withdrawn_unavailability_of_generation_units',
+    'query_installed_generation_capacity_per_unit',
+})
+
+
+def time_indexed(method: str) -> bool:
+    """Whether the results of a query method are indexed by the time they describe"""
+    return method not in UNTIMED_METHODS
+
 
 def retry(func):
     """Catches connection errors, waits and retries"""
@@ -19,13 +41,15 @@ def retry(func):
     def retry_wrapper(*args, **kwargs):
         self = args[0]
         error = None
-        for _ in range(self.retry_count):
+        for attempt in range(1, self.retry_count + 1):
+            tokens = _attempt.set(attempt), _attempts.set(self.retry_count)
             try:
                 result = func(*args, **kwargs)
             # Apart from common (ConnectionError and gaierror) errors, in certain
             # cases (e.g. with scheduled commercial exchanges), the connection with
             # ENTSO-e's can break with a RemoteDisconnected exception
-            except (requests.ConnectionError, gaierror, RemoteDisconnected) as e:
+            except RETRYABLE_ERRORS as e:
+                # the request layer emits on_retry with the params it sent
                 error = e
                 logger.warning(
                     "Connection Error, "
@@ -35,6 +59,9 @@ def retry(func):
                 continue
             else:
                 return result
+            finally:
+                _attempt.reset(tokens[0])
+                _attempts.reset(tokens[1])
         else:
             raise error
 
@@ -53,7 +80,8 @@ def paginated(func):
             pivot = start + (end - start) / 2
             df1 = pagination_wrapper(*args, start=start, end=pivot, **kwargs)
             df2 = pagination_wrapper(*args, start=pivot, end=end, **kwargs)
-            df = pd.concat([df1, df2])
+            with stage('concat'):
+                df = pd.concat([df1, df2])
         return df
 
     return pagination_wrapper
@@ -66,6 +94,9 @@ def documents_limited(n):
 
         @wraps(func)
         def documents_wrapper(*args, **kwargs):
+            # when planning, every request answers NoMatchingDataError so keep
+            # going until the offset the plan expects to be the last one
+            plan = getattr(args[0], '_plan', None)
             frames = []
             for offset in range(0, 4800 + n, n):
                 try:
@@ -73,29 +104,58 @@ def documents_limited(n):
                     frames.append(frame)
                 except NoMatchingDataError:
                     logger.debug(f"NoMatchingDataError: for offset {offset}")
+                    if plan is not None and offset < plan.last_offset(n):
+                        continue
                     break
 
             if len(frames) == 0:
                 # All the data returned are void
                 raise NoMatchingDataError
 
-            df = pd.concat(
-                [frame for frame in frames if not frame.empty and not frame.isna().all().all()],
-                sort=True)
+            with stage('concat'):
+                df = pd.concat(
+                    [frame for frame in frames if not frame.empty and not frame.isna().all().all()],
+                    sort=True)
             if func.__name__ != '_query_unavailability':
-                # For same indices pick last valid value
+                # For same indices pick last valid value per column, last()
+                # skips missing values like a forward fill of the group would
                 if df.index.has_duplicates:
-                    df = df.groupby(df.index).agg(deduplicate_documents_limited)
+                    with stage('dedup'):
+                        df = df.groupby(level=0).last()
             return df
         return documents_wrapper
     return decorator
 
 
-def deduplicate_documents_limited(group):
-    if group.shape[0] == 1:
-        return group
-    else:
-        return group.ffill().iloc[[-1]]
+def merge_blocks(frames: List[Tuple[pd.Timestamp, Any]], truncate: bool = True):
+    """
+    Stitch the results of consecutive blocks of a query together like
+    year_limited does, for callers that run the blocks themselves
+
+    Parameters
+    ----------
+    frames : [(pd.Timestamp, pd.DataFrame | pd.Series | None)]
+        start of every block and its result, None for blocks without data
+    truncate : bool
+        drop the records of a block at or before its start, which the
+        previous block already holds, pass time_indexed(method)
+
+    Returns
+    -------
+    pd.DataFrame | pd.Series
+    """
+    parts = []
+    for n, (block_start, frame) in enumerate(frames):
+        if frame is None:
+            continue
+        if truncate and n > 0 and isinstance(frame.index, pd.DatetimeIndex):
+            frame = frame.loc[frame.index > block_start]
+        parts.append(frame)
+    if len(parts) == 0:
+        raise NoMatchingDataError
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, sort=True)
 
 
 def year_limited(func):
@@ -136,14 +196,15 @@ def year_limited(func):
                     #
                     # If there are repeating records in a single frame (e.g. due
                     # to corrections) then the result will also have them.
-                    if is_first_frame:
-                        interval_mask = frame.index <= _end
-                    else:
-                        interval_mask = (
-                            (frame.index <= _end)
-                            & (frame.index > _start)
-                        )
-                    frame = frame.loc[interval_mask]
+                    with stage('truncate'):
+                        if is_first_frame:
+                            interval_mask = frame.index <= _end
+                        else:
+                            interval_mask = (
+                                (frame.index <= _end)
+                                & (frame.index > _start)
+                            )
+                        frame = frame.loc[interval_mask]
             except NoMatchingDataError:
                 logger.debug(
                     f"NoMatchingDataError: between {_start} and {_end}"
@@ -156,7 +217,8 @@ def year_limited(func):
             # All the data returned are void
             raise NoMatchingDataError
 
-        df = pd.concat(frames, sort=True)
+        with stage('concat'):
+            df = pd.concat(frames, sort=True)
         return df
 
     return year_wrapper
@@ -184,7 +246,8 @@ def day_limited(func):
             # All the data returned are void
             raise NoMatchingDataError
 
-        df = pd.concat(frames)
+        with stage('concat'):
+            df = pd.concat(frames)
         return df
 
     return day_wrapper
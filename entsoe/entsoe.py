@@ -1,6 +1,7 @@
 import logging
 import os
-from typing import Union, Optional, Dict, List, Literal
+import time
+from typing import Union, Optional, Dict, List, Literal, Tuple
 
 import pandas as pd
 from pandas.tseries.offsets import YearBegin, YearEnd
@@ -10,7 +11,7 @@ from bs4 import BeautifulSoup
 from bs4.builder import XMLParsedAsHTMLWarning
 
 from entsoe.exceptions import InvalidPSRTypeError, InvalidBusinessParameterError, InvalidParameterError
-from .exceptions import NoMatchingDataError, PaginationError
+from .exceptions import NoMatchingDataError, PaginationError, CircuitOpenError
 from .mappings import Area, NEIGHBOURS, lookup_area
 from .parsers import parse_prices, parse_loads, parse_generation, \
     parse_installed_capacity_per_plant, parse_crossborder_flows, \
@@ -18,7 +19,16 @@ from .parsers import parse_prices, parse_loads, parse_generation, \
     parse_imbalance_prices_zip, parse_imbalance_volumes_zip, parse_netpositions, \
     parse_procured_balancing_capacity_zip, parse_water_hydro, parse_aggregated_bids, \
     parse_activated_balancing_energy_prices, parse_offshore_unavailability, parse_imbalance_volumes
-from .decorators import retry, paginated, year_limited, day_limited, documents_limited
+from .decorators import retry, paginated, year_limited, day_limited, documents_limited, RETRYABLE_ERRORS
+from .cache import ResponseCache, request_key
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight
+from .concurrency import AdaptiveConcurrency, run_concurrently
+from .breaker import CircuitBreaker
+from .hedging import HedgingPolicy
+from .instrumentation import Hooks, RequestEvent, instrumented, will_retry
+from .profiling import stage, truncate, tz_convert
+from .planning import RequestPlan, plan_query
 import warnings
 
 logger = logging.getLogger(__name__)
@@ -41,6 +51,9 @@ class EntsoeRawClient:
         Client to perform API calls and return the raw responses API-documentation:
         https://transparency.entsoe.eu/content/static_content/Static%20content/web%20api/Guide.html#_request_methods
 
+        A client holds no per request state and can be shared by the threads
+        of a thread pool.
+
         Attributions: Parts of the code for parsing Entsoe responses were copied
         from https://github.com/tmrowco/electricitymap
         """
@@ -48,12 +61,23 @@ class EntsoeRawClient:
     def __init__(
             self, api_key: str = None, session: Optional[requests.Session] = None,
             retry_count: int = 3, retry_delay: int = 10,
-            proxies: Optional[Dict] = None, timeout: Optional[int] = None):
+            proxies: Optional[Dict] = None, timeout: Optional[int] = None,
+            cache: Optional[ResponseCache] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            coalesce: bool = True, max_workers: int = 4,
+            concurrency: Optional[AdaptiveConcurrency] = None,
+            breaker: Optional[CircuitBreaker] = None,
+            hedging: Optional[HedgingPolicy] = None,
+            hooks: Optional[Hooks] = None, profile: bool = False):
         """
         Parameters
         ----------
         api_key : str
         session : requests.Session
+            shared by all threads using the client. The default session gets
+            a connection pool of at least max_workers connections, pass your
+            own session with a large enough pool when sharing the client
+            between more threads than that
         retry_count : int
             number of times to retry the call if the connection fails
         retry_delay: int
@@ -61,14 +85,45 @@ class EntsoeRawClient:
         proxies : dict
             requests proxies
         timeout : int
+        cache : ResponseCache
+            serve repeated requests from this cache instead of the API
+        rate_limiter : RateLimiter
+            wait for this limiter before every request that goes upstream
+        coalesce : bool
+            let identical requests made at the same time from several threads
+            share a single upstream request and its response
+        max_workers : int
+            maximum number of requests in flight for methods that combine
+            several independent queries
+        concurrency : AdaptiveConcurrency
+            adapt the number of requests in flight to the latency and errors
+            of the API. max_workers is raised to its maximum, the limit it
+            adapts decides how many of the workers send a request
+        breaker : CircuitBreaker
+            fail fast with CircuitOpenError while the API is down, or answer
+            with stale cached responses if there are any
+        hedging : HedgingPolicy
+            send a duplicate of requests that take unusually long and use the
+            first response
+        hooks : Hooks
+            callbacks called before and after every request, on retries and
+            when a response is parsed, see entsoe.instrumentation
+        profile : bool
+            attach the time spent per stage (request, parse, concat, ...) to
+            the results of the pandas client, see entsoe.profiling
         """
         self.api_key = api_key
         if self.api_key is None:
             self.api_key = os.getenv("ENTSOE_API_KEY")
         if self.api_key is None:
             raise TypeError("API key cannot be None")
+        if concurrency is not None:
+            max_workers = max(max_workers, concurrency.maximum)
         if session is None:
             session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, max_workers))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
         self.session = session
         self.session.headers.update({
             'user-agent': f'entsoe-py {__version__} (github.com/EnergieID/entsoe-py)'
@@ -77,6 +132,152 @@ class EntsoeRawClient:
         self.retry_count = retry_count
         self.retry_delay = retry_delay
         self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._inflight = SingleFlight() if coalesce else None
+        self.max_workers = max_workers
+        self.concurrency = concurrency
+        self.breaker = breaker
+        self.hedging = hedging
+        self.hooks = hooks
+        self.profile = profile
+        self._plan: Optional[RequestPlan] = None
+
+    def plan(self, method: str, *args, expected_documents: Optional[int] = None,
+             **kwargs) -> RequestPlan:
+        """
+        List the requests a query would send without sending them, see
+        entsoe.planning.plan_query
+
+        Parameters
+        ----------
+        method : str
+            name of the query method, eg. 'query_day_ahead_prices'
+        expected_documents : int, optional
+            documents expected per block for paginated queries
+
+        Returns
+        -------
+        RequestPlan
+        """
+        return plan_query(self, method, *args, expected_documents=expected_documents, **kwargs)
+
+    def _request(self, params: Dict) -> requests.Response:
+        """
+        Send fully formed params to the API, through the cache and rate limiter
+        if the client has them. Identical requests already in flight are
+        joined instead of sent again. The response is returned as is, without
+        checking it for errors.
+
+        Parameters
+        ----------
+        params : dict
+
+        Returns
+        -------
+        requests.Response
+        """
+        if self.hooks is None:
+            response, _, error = self._lookup(params)
+            if error is not None:
+                raise error
+            return response
+        self.hooks.emit('before_request', RequestEvent.for_params(params))
+        started = time.perf_counter()
+        response, source, error = self._lookup(params)
+        if error is not None:
+            self.hooks.emit('after_response', RequestEvent.for_params(
+                params, latency=time.perf_counter() - started, error=error,
+                coalesced=source == 'coalesced'))
+            if isinstance(error, RETRYABLE_ERRORS) and will_retry():
+                self.hooks.emit('on_retry', RequestEvent.for_params(
+                    params, error=error, coalesced=source == 'coalesced'))
+            raise error
+        self.hooks.emit('after_response', RequestEvent.for_params(
+            params, status=response.status_code, bytes=len(response.content),
+            latency=time.perf_counter() - started, cached=source == 'cache',
+            coalesced=source == 'coalesced'))
+        return response
+
+    def _lookup(self, params: Dict) -> Tuple[Optional[requests.Response], str, Optional[Exception]]:
+        """
+        (response, source, error) of a request: the response from the cache,
+        from an identical request in flight or from upstream, where it came
+        from ('cache', 'coalesced' or 'upstream') and the error if it failed
+        """
+        key = request_key(params)
+        # set when this call sends the request itself rather than joining one in flight
+        led = []
+
+        def fetch():
+            led.append(True)
+            return self._fetch(key, params)
+
+        with stage('request'):
+            try:
+                if self.cache is not None:
+                    response = self.cache.get(key)
+                    if response is not None:
+                        return response, 'cache', None
+                if self._inflight is None:
+                    response = fetch()
+                else:
+                    response = self._inflight.do(key, fetch)
+            except Exception as e:
+                return None, 'upstream' if led or self._inflight is None else 'coalesced', e
+            return response, 'upstream' if led else 'coalesced', None
+
+    @staticmethod
+    def _text(response: requests.Response) -> str:
+        with stage('decode'):
+            return response.text
+
+    @retry
+    def _request_with_retry(self, params: Dict) -> requests.Response:
+        """_request, retried on connection errors like _base_request"""
+        return self._request(params)
+
+    def _send(self, params: Dict) -> requests.Response:
+        def get():
+            return self.session.get(url=URL, params=params,
+                                    proxies=self.proxies, timeout=self.timeout)
+        if self.hedging is None:
+            return get()
+        return self.hedging.send(get, rate_limiter=self.rate_limiter)
+
+    def _fetch(self, key: str, params: Dict) -> requests.Response:
+        if self.breaker is not None and not self.breaker.allow():
+            stale = None if self.cache is None else self.cache.get(key, stale=True)
+            if stale is not None:
+                logger.warning(f'ENTSO-E API unavailable, answering with a stale response for {params}')
+                return stale
+            raise CircuitOpenError(f'ENTSO-E API unavailable, not sending request for {params}')
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        logger.debug(f'Performing request to {URL} with params {params}')
+        try:
+            if self.concurrency is None:
+                response = self._send(params)
+            else:
+                with self.concurrency.slot() as outcome:
+                    response = self._send(params)
+                    # throttling and server errors mean the API is under pressure
+                    outcome.ok = response.status_code != 429 and response.status_code < 500
+        except Exception:
+            if self.breaker is not None:
+                self.breaker.failure()
+            raise
+        if self.breaker is not None:
+            # throttling is the API protecting itself, not an outage
+            if response.status_code >= 500:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+        if self.cache is not None:
+            self.cache.put(key, response, params)
+        return response
 
     @retry
     def _base_request(self, params: Dict, start: pd.Timestamp,
@@ -100,11 +301,16 @@ class EntsoeRawClient:
             'periodStart': start_str,
             'periodEnd': end_str
         }
-        params.update(base_params)
+        # build a new dict, the caller's params may be shared between threads
+        params = {**params, **base_params}
 
-        logger.debug(f'Performing request to {URL} with params {params}')
-        response = self.session.get(url=URL, params=params,
-                                    proxies=self.proxies, timeout=self.timeout)
+        if self._plan is not None:
+            # dry run: record the request and continue as if there is no data
+            cached = self.cache is not None and self.cache.get(request_key(params)) is not None
+            self._plan.add(params, cached=cached)
+            raise NoMatchingDataError
+
+        response = self._request(params)
         try:
             response.raise_for_status()
         except requests.HTTPError as e:
@@ -190,7 +396,7 @@ class EntsoeRawClient:
         if sequence is not None:
             params['classificationSequence_AttributeInstanceComponent.position'] = sequence
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
 
 
@@ -219,7 +425,7 @@ class EntsoeRawClient:
         if sequence is not None:
             params['classificationSequence_AttributeInstanceComponent.position'] = sequence
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
 
     def query_aggregated_bids(self, country_code: Union[Area, str],
@@ -247,7 +453,7 @@ class EntsoeRawClient:
             'processType': process_type
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_net_position(self, country_code: Union[Area, str],
                            start: pd.Timestamp, end: pd.Timestamp, dayahead: bool = True) -> str:
@@ -275,7 +481,7 @@ class EntsoeRawClient:
             params.update({'Contract_MarketAgreement.Type': "A07"})
 
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_load(self, country_code: Union[Area, str], start: pd.Timestamp,
                    end: pd.Timestamp) -> str:
@@ -299,7 +505,7 @@ class EntsoeRawClient:
             'out_Domain': area.code
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_load_forecast(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -324,7 +530,7 @@ class EntsoeRawClient:
             # 'out_Domain': domain
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_generation_forecast(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -348,7 +554,7 @@ class EntsoeRawClient:
             'in_Domain': area.code,
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_wind_and_solar_forecast(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -377,7 +583,7 @@ class EntsoeRawClient:
         if psr_type:
             params.update({'psrType': psr_type})
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_intraday_wind_and_solar_forecast(
             self, country_code: Union[Area, str], start: pd.Timestamp, end: pd.Timestamp, psr_type: Optional[str] = None) -> str:
@@ -412,7 +618,7 @@ class EntsoeRawClient:
         if psr_type:
             params.update({'psrType': psr_type})
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_generation_per_plant(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -444,7 +650,7 @@ class EntsoeRawClient:
         if eic_code:
             params.update({'registeredResource': eic_code})
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_installed_generation_capacity(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -471,7 +677,7 @@ class EntsoeRawClient:
         if psr_type:
             params.update({'psrType': psr_type})
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_installed_generation_capacity_per_unit(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -498,7 +704,7 @@ class EntsoeRawClient:
         if psr_type:
             params.update({'psrType': psr_type})
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_aggregate_water_reservoirs_and_hydro_storage(self, country_code: Union[Area, str], start: pd.Timestamp,
             end: pd.Timestamp) -> str:
@@ -522,7 +728,7 @@ class EntsoeRawClient:
             'in_Domain': area.code
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_crossborder_flows(
             self, country_code_from: Union[Area, str],
@@ -790,7 +996,7 @@ class EntsoeRawClient:
             params['ClassificationSequence_AttributeInstanceComponent.Position'] = classification_sequence
 
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_activated_balancing_energy_prices(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -911,7 +1117,7 @@ class EntsoeRawClient:
             'area_Domain': area.code,
         }
         response = self._base_request(params=params, start=start, end=end)
-        return response.text
+        return self._text(response)
 
     def query_procured_balancing_capacity(
             self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -1195,7 +1401,19 @@ class EntsoeRawClient:
             doctype="A80", docstatus='A13', mRID=mRID)
         return content
 
+@instrumented
 class EntsoePandasClient(EntsoeRawClient):
+    def _gather(self, *queries):
+        """
+        Run independent queries concurrently and return their results in
+        order. All queries run to completion, then the first error is raised.
+        """
+        outcomes = run_concurrently(list(queries), max_workers=self.max_workers)
+        for _, error in outcomes:
+            if error is not None:
+                raise error
+        return [result for result, _ in outcomes]
+
     @year_limited
     def query_net_position(self, country_code: Union[Area, str],
                             start: pd.Timestamp, end: pd.Timestamp, dayahead: bool = True,
@@ -1239,8 +1457,8 @@ class EntsoePandasClient(EntsoeRawClient):
                     series_15min
                 ]).sort_index()
 
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1267,8 +1485,8 @@ class EntsoePandasClient(EntsoeRawClient):
         text = super(EntsoePandasClient, self).query_aggregated_bids(
             country_code=area, process_type=process_type, start=start, end=end)
         df = parse_aggregated_bids(text)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     # we need to do offset, but we also want to pad the days so wrap it in an internal call
@@ -1300,8 +1518,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start-pd.Timedelta(days=1),
             end=end+pd.Timedelta(days=1)
         )
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1343,8 +1561,8 @@ class EntsoePandasClient(EntsoeRawClient):
                 series_15min
             ]).sort_index()
 
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1378,8 +1596,8 @@ class EntsoePandasClient(EntsoeRawClient):
             end=end+pd.Timedelta(days=1),
             sequence=sequence
         )
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1401,8 +1619,8 @@ class EntsoePandasClient(EntsoeRawClient):
             sequence=sequence
         )
         series = parse_prices(text)['15min']
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1436,8 +1654,8 @@ class EntsoePandasClient(EntsoeRawClient):
             end=end+pd.Timedelta(days=1),
             resolution=resolution
         )
-        series = series.tz_convert(area.tz).sort_index()
-        series = series.truncate(before=start, after=end)
+        series = tz_convert(series, area.tz).sort_index()
+        series = truncate(series, before=start, after=end)
         # because of the above fix we need to check again if any valid data exists after truncating
         if len(series) == 0:
             raise NoMatchingDataError
@@ -1484,8 +1702,8 @@ class EntsoePandasClient(EntsoeRawClient):
             country_code=area, start=start, end=end)
 
         df = parse_loads(text, process_type='A16')
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -1509,8 +1727,8 @@ class EntsoePandasClient(EntsoeRawClient):
             country_code=area, start=start, end=end, process_type=process_type)
 
         df = parse_loads(text, process_type=process_type)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     def query_load_and_forecast(
@@ -1530,8 +1748,10 @@ class EntsoePandasClient(EntsoeRawClient):
         -------
         pd.DataFrame
         """
-        df_load_forecast_da = self.query_load_forecast(country_code, start=start, end=end)
-        df_load = self.query_load(country_code, start=start, end=end)
+        df_load_forecast_da, df_load = self._gather(
+            lambda: self.query_load_forecast(country_code, start=start, end=end),
+            lambda: self.query_load(country_code, start=start, end=end)
+        )
         return df_load_forecast_da.join(df_load, sort=True, how='outer')
 
 
@@ -1560,8 +1780,8 @@ class EntsoePandasClient(EntsoeRawClient):
         df = parse_generation(text, nett=nett)
         if isinstance(df, pd.DataFrame):
             df = df.rename(columns=lambda c: c.replace('Actual', 'Scheduled'))
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -1588,8 +1808,8 @@ class EntsoePandasClient(EntsoeRawClient):
             country_code=area, start=start, end=end, psr_type=psr_type,
             process_type=process_type)
         df = parse_generation(text, nett=True)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     def query_intraday_wind_and_solar_forecast(
@@ -1626,8 +1846,8 @@ class EntsoePandasClient(EntsoeRawClient):
         text = super(EntsoePandasClient, self).query_generation(
             country_code=area, start=start, end=end, psr_type=psr_type)
         df = parse_generation(text, nett=nett)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -1653,9 +1873,9 @@ class EntsoePandasClient(EntsoeRawClient):
             EntsoePandasClient, self).query_installed_generation_capacity(
             country_code=area, start=start, end=end, psr_type=psr_type)
         df = parse_generation(text)
-        df = df.tz_convert(area.tz)
+        df = tz_convert(df, area.tz)
         # Truncate to YearBegin and YearEnd, because answer is always year-based
-        df = df.truncate(before=start - YearBegin(), after=end + YearEnd())
+        df = truncate(df, before=start - YearBegin(), after=end + YearEnd())
         return df
 
     @year_limited
@@ -1725,8 +1945,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1761,8 +1981,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1792,8 +2012,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1823,8 +2043,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1854,8 +2074,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1885,8 +2105,8 @@ class EntsoePandasClient(EntsoeRawClient):
             start=start,
             end=end)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1933,8 +2153,8 @@ class EntsoePandasClient(EntsoeRawClient):
             implicit=implicit,
             id_type=id_type)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -1978,8 +2198,8 @@ class EntsoePandasClient(EntsoeRawClient):
             implicit=implicit,
             offset=offset)
         ts = parse_crossborder_flows(text)
-        ts = ts.tz_convert(area_from.tz)
-        ts = ts.truncate(before=start, after=end)
+        ts = tz_convert(ts, area_from.tz)
+        ts = truncate(ts, before=start, after=end)
         return ts
 
     @year_limited
@@ -2020,8 +2240,8 @@ class EntsoePandasClient(EntsoeRawClient):
             standard_market_product=standard_market_product,
             original_market_product=original_market_product)
         df = parse_activated_balancing_energy_prices(text)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
     
     @year_limited
@@ -2046,8 +2266,8 @@ class EntsoePandasClient(EntsoeRawClient):
         archive = super(EntsoePandasClient, self).query_imbalance_prices(
             country_code=area, start=start, end=end, psr_type=psr_type)
         df = parse_imbalance_prices_zip(zip_contents=archive)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
 
         return df
 
@@ -2073,8 +2293,8 @@ class EntsoePandasClient(EntsoeRawClient):
         archive = super(EntsoePandasClient, self).query_imbalance_volumes(
             country_code=area, start=start, end=end, psr_type=psr_type)
         df = parse_imbalance_volumes_zip(zip_contents=archive, include_resolution=include_resolution)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -2095,8 +2315,8 @@ class EntsoePandasClient(EntsoeRawClient):
         text = super(EntsoePandasClient, self).query_current_balancing_state(
             country_code=area, start=start, end=end)
         df = -1*parse_imbalance_volumes(text)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -2134,8 +2354,8 @@ class EntsoePandasClient(EntsoeRawClient):
             offset=offset
         )
         df = parse_procured_balancing_capacity_zip(zip_contents, area.tz)
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -2164,8 +2384,8 @@ class EntsoePandasClient(EntsoeRawClient):
             country_code=area, start=start, end=end,
             business_type=business_type, psr_type=psr_type)
         df = parse_contracted_reserve(text, area.tz, "quantity")
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -2204,8 +2424,8 @@ class EntsoePandasClient(EntsoeRawClient):
             psr_type=psr_type, offset=offset)
         df = parse_contracted_reserve_zip(zip_contents, area.tz, "procurement_price.amount")
         df.columns = df.columns.droplevel()
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
     
     @year_limited
@@ -2254,8 +2474,8 @@ class EntsoePandasClient(EntsoeRawClient):
             left_index=True, right_index=True, suffixes=(' Quantity', ' Prices')
         )
 
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df    
 
     @year_limited
@@ -2296,8 +2516,8 @@ class EntsoePandasClient(EntsoeRawClient):
             psr_type=psr_type, offset=offset)
         df = parse_contracted_reserve_zip(zip_contents, area.tz, "quantity")
         df.columns = df.columns.droplevel()
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         return df
 
     @year_limited
@@ -2332,7 +2552,7 @@ class EntsoePandasClient(EntsoeRawClient):
             docstatus=docstatus, periodstartupdate=periodstartupdate,
             periodendupdate=periodendupdate, mRID=mRID, offset=offset)
         df = parse_unavailabilities(content, doctype)
-        df = df.tz_convert(area.tz)
+        df = tz_convert(df, area.tz)
         df['start'] = df['start'].apply(lambda x: x.tz_convert(area.tz))
         df['end'] = df['end'].apply(lambda x: x.tz_convert(area.tz))
         df = df[(df['start'] < end) | (df['end'] > start)]
@@ -2432,7 +2652,7 @@ class EntsoePandasClient(EntsoeRawClient):
             area_from, area_to, start, end, docstatus, periodstartupdate,
             periodendupdate, offset=offset)
         df = parse_unavailabilities(content, "A78")
-        df = df.tz_convert(area_from.tz)
+        df = tz_convert(df, area_from.tz)
         df['start'] = df['start'].apply(lambda x: x.tz_convert(area_from.tz))
         df['end'] = df['end'].apply(lambda x: x.tz_convert(area_from.tz))
         df = df[(df['start'] < end) | (df['end'] > start)]
@@ -2488,14 +2708,14 @@ class EntsoePandasClient(EntsoeRawClient):
         )
         df = parse_generation(text, per_plant=True, include_eic=include_eic)
         df.columns = df.columns.set_levels(df.columns.levels[0].str.encode('latin-1').str.decode('utf-8'), level=0)
-        df = df.tz_convert(area.tz)
+        df = tz_convert(df, area.tz)
         # Truncation will fail if data is not sorted along the index in rare
         # cases. Ensure the dataframe is sorted:
         df = df.sort_index(axis=0)
 
         if df.columns.nlevels == 2:
             df = df.assign(newlevel='Actual Aggregated').set_index('newlevel', append=True).unstack('newlevel')
-        df = df.truncate(before=start, after=end)
+        df = truncate(df, before=start, after=end)
         return df
 
     def query_physical_crossborder_allborders(self, country_code: Union[Area, str], start: pd.Timestamp,
@@ -2509,36 +2729,88 @@ class EntsoePandasClient(EntsoeRawClient):
         it will then thake the mean
         """
         area = lookup_area(country_code)
+
+        def query_border(neighbour):
+            if export:
+                return self.query_crossborder_flows(country_code_from=country_code,
+                                                    country_code_to=neighbour,
+                                                    end=end,
+                                                    start=start,
+                                                    lookup_bzones=True)
+            return self.query_crossborder_flows(country_code_from=neighbour,
+                                                country_code_to=country_code,
+                                                end=end,
+                                                start=start,
+                                                lookup_bzones=True)
+
+        neighbours = NEIGHBOURS[area.name]
+        outcomes = run_concurrently([lambda n=n: query_border(n) for n in neighbours],
+                                    max_workers=self.max_workers)
         imports = []
-        for neighbour in NEIGHBOURS[area.name]:
-            try:
-                if export:
-                    im = self.query_crossborder_flows(country_code_from=country_code,
-                                                      country_code_to=neighbour,
-                                                      end=end,
-                                                      start=start,
-                                                      lookup_bzones=True)
-                else:
-                    im = self.query_crossborder_flows(country_code_from=neighbour,
-                                                      country_code_to=country_code,
-                                                      end=end,
-                                                      start=start,
-                                                      lookup_bzones=True)
-            except NoMatchingDataError:
+        for neighbour, (im, error) in zip(neighbours, outcomes):
+            if isinstance(error, NoMatchingDataError):
                 continue
+            if error is not None:
+                raise error
             im.name = neighbour
             imports.append(im)
         df = pd.concat(imports, axis=1, sort=True)
         # drop columns that contain only zero's
         df = df.loc[:, (df != 0).any(axis=0)]
-        df = df.tz_convert(area.tz)
-        df = df.truncate(before=start, after=end)
+        df = tz_convert(df, area.tz)
+        df = truncate(df, before=start, after=end)
         df['sum'] = df.sum(axis=1)
         if per_hour:
             df = df.resample('h').first()
 
         return df
 
+    def query_crossborder_flow_matrix(self, start: pd.Timestamp, end: pd.Timestamp,
+                                      areas: Optional[List[Union[Area, str]]] = None) -> pd.DataFrame:
+        """
+        Physical flows over all borders of the NEIGHBOURS mapping between the
+        given areas, all of Europe if None. Every directed border is fetched
+        only once and the borders are fetched concurrently.
+
+        Use entsoe.grid.flow_totals for per zone import and export sums and
+        entsoe.grid.flow_array for a (time x from x to) array.
+
+        Parameters
+        ----------
+        start : pd.Timestamp
+        end : pd.Timestamp
+        areas : [Area|str], optional
+
+        Returns
+        -------
+        pd.DataFrame
+            indexed in UTC, one column per directed border with a (from, to)
+            MultiIndex
+        """
+        names = None if areas is None else {lookup_area(a).name for a in areas}
+        borders = sorted({
+            (area, neighbour) for area, neighbours in NEIGHBOURS.items() for neighbour in neighbours
+            if names is None or (area in names and neighbour in names)
+        })
+        outcomes = run_concurrently(
+            [lambda border=border: self.query_crossborder_flows(
+                country_code_from=border[0], country_code_to=border[1],
+                start=start, end=end, lookup_bzones=True) for border in borders],
+            max_workers=self.max_workers)
+
+        flows = {}
+        for border, (series, error) in zip(borders, outcomes):
+            if isinstance(error, NoMatchingDataError):
+                continue
+            if error is not None:
+                raise error
+            flows[border] = series.tz_convert('UTC')
+        if len(flows) == 0:
+            raise NoMatchingDataError
+        df = pd.concat(flows, axis=1, sort=True)
+        df.columns.names = ['from', 'to']
+        return df
+
     def query_import(self, country_code: Union[Area, str], start: pd.Timestamp,
                      end: pd.Timestamp) -> pd.DataFrame:
         """
@@ -2553,15 +2825,17 @@ class EntsoePandasClient(EntsoeRawClient):
             self, country_code: Union[Area, str], start: pd.Timestamp,
             end: pd.Timestamp) -> pd.DataFrame:
         """Query the combination of both domestic generation and imports"""
-        generation = self.query_generation(country_code=country_code, end=end,
-                                           start=start, nett=True)
+        generation, imports = self._gather(
+            lambda: self.query_generation(country_code=country_code, end=end,
+                                          start=start, nett=True),
+            lambda: self.query_import(country_code=country_code, start=start,
+                                      end=end)
+        )
         generation = generation.loc[:, (generation != 0).any(
             axis=0)]  # drop columns that contain only zero's
-        imports = self.query_import(country_code=country_code, start=start,
-                                    end=end)
 
         data = {f'Generation': generation, f'Import': imports}
         df = pd.concat(data.values(), axis=1, keys=data.keys())
         df = df.ffill()
-        df = df.truncate(before=start, after=end)
+        df = truncate(df, before=start, after=end)
         return df
@@ -15,4 +15,11 @@ class InvalidBusinessParameterError(Exception):
 
 
 class InvalidParameterError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class CacheMissError(Exception):
+    pass
+
+class CircuitOpenError(Exception):
+    pass
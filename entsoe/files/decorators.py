@@ -8,7 +8,10 @@ def check_expired(func):
         self = args[0]
 
         if pd.Timestamp.now(tz='Europe/Amsterdam') >= self.expire:
-            self._update_token()
+            with self._token_lock:
+                # another thread may have refreshed the token while this one waited
+                if pd.Timestamp.now(tz='Europe/Amsterdam') >= self.expire:
+                    self._update_token()
 
         return func(*args, **kwargs)
 
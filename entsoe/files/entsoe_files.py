@@ -7,6 +7,7 @@ from io import BytesIO
 import zipfile
 from .decorators import check_expired
 import os
+import threading
 
 # DOCS for entsoe file library: https://transparencyplatform.zendesk.com/hc/en-us/articles/35960137882129-File-Library-Guide
 # postman description: https://documenter.getpostman.com/view/28274243/2sB2qgfz3W
@@ -39,6 +40,8 @@ class EntsoeFileClient:
 
         self.access_token = None
         self.expire = None
+        # the client may be shared between threads, only one of them refreshes the token
+        self._token_lock = threading.Lock()
 
         self._update_token()
 
@@ -55,8 +58,9 @@ class EntsoeFileClient:
         )
         r.raise_for_status()
         data = r.json()
-        self.expire = pd.Timestamp.now(tz='Europe/Amsterdam') + pd.Timedelta(seconds=data['expires_in'])
+        # set the token before the expiry, threads that see the new expiry use the new token
         self.access_token = data['access_token']
+        self.expire = pd.Timestamp.now(tz='Europe/Amsterdam') + pd.Timedelta(seconds=data['expires_in'])
 
     @check_expired
     def list_folder(self, folder: str) -> dict:
@@ -0,0 +1,53 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def flow_totals(matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    Total import and export per zone of a flow matrix as returned by
+    EntsoePandasClient.query_crossborder_flow_matrix
+
+    Parameters
+    ----------
+    matrix : pd.DataFrame
+        columns with a (from, to) MultiIndex
+
+    Returns
+    -------
+    pd.DataFrame
+        columns with a (direction, zone) MultiIndex, direction being
+        'import' or 'export'
+    """
+    transposed = matrix.T
+    exports = transposed.groupby(level='from').sum(min_count=1).T
+    imports = transposed.groupby(level='to').sum(min_count=1).T
+    df = pd.concat({'import': imports, 'export': exports}, axis=1)
+    df.columns.names = ['direction', 'zone']
+    return df
+
+
+def flow_array(matrix: pd.DataFrame) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """
+    Flow matrix as a dense 3-D array
+
+    Parameters
+    ----------
+    matrix : pd.DataFrame
+        columns with a (from, to) MultiIndex
+
+    Returns
+    -------
+    (pd.DatetimeIndex, [str], np.ndarray)
+        the time index, the zones and an array of shape (time, zones, zones)
+        where [t, i, j] is the flow from zone i to zone j, NaN for pairs
+        without a border
+    """
+    zones = pd.Index(sorted(set(matrix.columns.get_level_values('from'))
+                            | set(matrix.columns.get_level_values('to'))))
+    i = zones.get_indexer(matrix.columns.get_level_values('from'))
+    j = zones.get_indexer(matrix.columns.get_level_values('to'))
+    array = np.full((len(matrix), len(zones), len(zones)), np.nan)
+    array[:, i, j] = matrix.to_numpy(dtype=float)
+    return matrix.index, list(zones), array
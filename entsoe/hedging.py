@@ -0,0 +1,158 @@
+import collections
+import contextvars
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import requests
+
+from .priority import Priority, current_priority
+from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Sends a duplicate of a request that takes longer than most (the p95 of
+    the latencies seen so far) and uses whichever response arrives first.
+    Requests to the API are idempotent GETs, so the slower one is discarded.
+
+    A duplicate takes a token from the client's rate limiter if one is free
+    right away and is not sent otherwise, so hedging never exceeds the
+    budget or overtakes waiting requests. Bulk requests are not hedged by
+    default, nor are requests while all max_workers threads are busy.
+    """
+
+    def __init__(self, quantile: float = 0.95, min_samples: int = 20, window: int = 500,
+                 min_delay: float = 0.2, max_priority: Priority = Priority.ROUTINE,
+                 max_workers: int = 16):
+        """
+        Parameters
+        ----------
+        quantile : float
+            latency quantile after which a duplicate is sent
+        min_samples : int
+            latencies to observe before hedging starts
+        window : int
+            number of recent latencies the quantile is taken from
+        min_delay : float
+            seconds to wait at least before sending a duplicate
+        max_priority : Priority
+            lowest priority class that is hedged
+        max_workers : int
+            threads sending hedged requests
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_priority = max_priority
+        self.max_workers = max_workers
+        self.hedged = 0
+        self.won = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._busy = 0
+
+    def record(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """Seconds after which a duplicate is sent, None until enough latencies are known"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, math.ceil(self.quantile * len(latencies)) - 1)
+        return max(self.min_delay, latencies[index])
+
+    def _reserve(self) -> bool:
+        """Claim a free worker for a request, False if all of them are busy"""
+        with self._lock:
+            if self._busy >= self.max_workers:
+                return False
+            self._busy += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='entsoe-hedge')
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._busy -= 1
+
+    def _submit(self, send: Callable[[], requests.Response], started: Optional[threading.Event] = None):
+        """Run send on a worker claimed with _reserve"""
+        def run():
+            try:
+                if started is not None:
+                    started.set()
+                return self._timed(send)
+            finally:
+                self._release()
+        return self._executor.submit(contextvars.copy_context().run, run)
+
+    def _timed(self, send: Callable[[], requests.Response]) -> requests.Response:
+        # every request counts, also the slow one that lost, or the
+        # quantile would only ever go down
+        started = time.monotonic()
+        response = send()
+        self.record(time.monotonic() - started)
+        return response
+
+    def send(self, send: Callable[[], requests.Response],
+             rate_limiter: Optional[RateLimiter] = None) -> requests.Response:
+        """
+        Call send, and call it once more if it takes longer than delay()
+
+        Parameters
+        ----------
+        send : callable
+            sends the request and returns the response
+        rate_limiter : RateLimiter, optional
+            limiter the duplicate takes a token from
+
+        Returns
+        -------
+        requests.Response
+        """
+        delay = self.delay() if current_priority() <= self.max_priority else None
+        # with every worker busy the request is sent unhedged on this thread,
+        # queueing it would stretch its latency past the delay and hedge it
+        if delay is None or not self._reserve():
+            return self._timed(send)
+
+        started = threading.Event()
+        futures = [self._submit(send, started)]
+        # the delay counts from when the request is actually sent
+        started.wait()
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._reserve():
+            if rate_limiter is None or rate_limiter.try_acquire():
+                logger.debug(f'No response after {delay:.2f}s, sending a duplicate request')
+                with self._lock:
+                    self.hedged += 1
+                futures.append(self._submit(send))
+            else:
+                self._release()
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        with self._lock:
+                            self.won += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def __repr__(self):
+        return f'<HedgingPolicy: p{self.quantile * 100:g} {self.delay()}s, {self.hedged} hedged, {self.won} won>'
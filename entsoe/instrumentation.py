@@ -0,0 +1,272 @@
+"""
+Hooks to observe what a client does.
+
+    hooks = Hooks()
+    hooks.register('after_response', lambda event: print(event.endpoint, event.latency))
+    client = EntsoePandasClient(api_key, hooks=hooks)
+
+Events:
+
+- before_request(RequestEvent): a request is about to be looked up in the
+  cache or sent upstream, only endpoint and params are set
+- after_response(RequestEvent): a response was received or the request failed,
+  cached if it came from the cache and coalesced if it joined an identical
+  request in flight, which emits its own event for going upstream
+- on_retry(RequestEvent): a request failed with a connection error and is
+  retried, error and attempt are set, params are those the failed request
+  was sent with
+- on_parse_done(ParseEvent): a parser turned a response into a pandas object
+
+Callbacks run in the thread making the request and must be quick, an
+exception in a callback is logged and otherwise ignored.
+"""
+import contextvars
+import logging
+import time
+from functools import wraps
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .profiling import current_profile, profiling, stage
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ('before_request', 'after_response', 'on_retry', 'on_parse_done')
+
+
+def endpoint(params: Dict) -> str:
+    """Name of the API endpoint of a request: the documentType, and processType if given"""
+    name = str(params.get('documentType', ''))
+    if 'processType' in params:
+        name += f'/{params["processType"]}'
+    return name
+
+
+class RequestEvent(NamedTuple):
+    endpoint: str
+    params: Dict
+    status: Optional[int] = None
+    bytes: Optional[int] = None
+    latency: Optional[float] = None
+    attempt: int = 1
+    cached: bool = False
+    coalesced: bool = False
+    error: Optional[BaseException] = None
+
+    @classmethod
+    def for_params(cls, params: Dict, **kwargs) -> 'RequestEvent':
+        params = {k: v for k, v in params.items() if k != 'securityToken'}
+        return cls(endpoint=endpoint(params), params=params, attempt=current_attempt(), **kwargs)
+
+
+class ParseEvent(NamedTuple):
+    parser: str
+    duration: float
+    rows: Optional[int] = None
+
+
+class Hooks:
+    """Callbacks for the events of one or more clients"""
+
+    def __init__(self):
+        self._callbacks: Dict[str, List[Callable]] = {event: [] for event in EVENTS}
+
+    def register(self, event: str, callback: Callable) -> Callable:
+        """
+        Parameters
+        ----------
+        event : str
+            one of before_request, after_response, on_retry, on_parse_done
+        callback : callable
+            called with the RequestEvent or ParseEvent
+
+        Returns
+        -------
+        callable
+            the callback
+        """
+        if event not in self._callbacks:
+            raise ValueError(f'Unknown event {event}, choose from {", ".join(EVENTS)}')
+        self._callbacks[event].append(callback)
+        return callback
+
+    def emit(self, event: str, payload):
+        for callback in self._callbacks[event]:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception(f'{event} hook {callback} failed')
+
+
+# hooks of the client whose query is running, for events raised outside the
+# request path like parsing
+_active: contextvars.ContextVar = contextvars.ContextVar('entsoe_hooks', default=None)
+# attempt number of the request being sent, set by the retry decorator
+_attempt: contextvars.ContextVar = contextvars.ContextVar('entsoe_attempt', default=1)
+# attempts the retry decorator makes in total, a request outside of it is tried once
+_attempts: contextvars.ContextVar = contextvars.ContextVar('entsoe_attempts', default=1)
+_parsing: contextvars.ContextVar = contextvars.ContextVar('entsoe_parsing', default=False)
+
+
+def current_attempt() -> int:
+    return _attempt.get()
+
+
+def will_retry() -> bool:
+    """Whether the retry decorator tries the request being sent again if it fails with a connection error"""
+    return _attempt.get() < _attempts.get()
+
+
+def instrumented(cls):
+    """
+    Class decorator making the hooks of a client active while its query
+    methods run, including in the worker threads they start, and attaching
+    the stage profile to the result of clients with profile=True
+    """
+    for name, func in list(vars(cls).items()):
+        if name.startswith('query_') and callable(func):
+            setattr(cls, name, _activating(func))
+    return cls
+
+
+def _activating(func):
+    @wraps(func)
+    def activating_wrapper(self, *args, **kwargs):
+        token = None
+        if self.hooks is not None and _active.get() is not self.hooks:
+            token = _active.set(self.hooks)
+        try:
+            with profiling(self.profile) as profile:
+                result = func(self, *args, **kwargs)
+        finally:
+            if token is not None:
+                _active.reset(token)
+        if profile is not None and hasattr(result, 'attrs'):
+            result.attrs['entsoe_profile'] = profile.to_dict()
+        return result
+
+    return activating_wrapper
+
+
+def timed_parser(func):
+    """Emits on_parse_done when the decorated parser finishes and records the parse stage"""
+
+    @wraps(func)
+    def timed_parser_wrapper(*args, **kwargs):
+        hooks = _active.get()
+        # parsers of zipped responses call the parser of every file in them
+        if (hooks is None and current_profile() is None) or _parsing.get():
+            return func(*args, **kwargs)
+        token = _parsing.set(True)
+        started = time.perf_counter()
+        try:
+            with stage('parse'):
+                result = func(*args, **kwargs)
+        finally:
+            _parsing.reset(token)
+        if hooks is not None:
+            rows = len(result) if hasattr(result, '__len__') else None
+            hooks.emit('on_parse_done', ParseEvent(func.__name__, time.perf_counter() - started, rows))
+        return result
+
+    return timed_parser_wrapper
+
+
+def prometheus_hooks(registry=None, hooks: Optional[Hooks] = None, concurrency=None) -> Hooks:
+    """
+    Hooks exporting request counts, latencies, response sizes, retries and
+    parse durations as Prometheus metrics. Needs prometheus_client
+    (pip install entsoe-py[prometheus]).
+
+    Parameters
+    ----------
+    registry : prometheus_client.CollectorRegistry, optional
+        defaults to the global registry
+    hooks : Hooks, optional
+        add the metrics to these hooks instead of new ones
+    concurrency : AdaptiveConcurrency, optional
+        also export its current limit
+    """
+    try:
+        from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+    except ImportError as e:
+        raise ImportError('prometheus_hooks needs prometheus_client, '
+                          'install it with pip install entsoe-py[prometheus]') from e
+    registry = REGISTRY if registry is None else registry
+    hooks = Hooks() if hooks is None else hooks
+
+    requests_total = Counter('entsoe_requests_total', 'Requests to the ENTSO-E API',
+                             ['endpoint', 'status', 'cached'], registry=registry)
+    latency = Histogram('entsoe_request_seconds', 'Latency of ENTSO-E requests',
+                        ['endpoint'], registry=registry)
+    size = Counter('entsoe_response_bytes_total', 'Bytes received from the ENTSO-E API',
+                   ['endpoint'], registry=registry)
+    retries = Counter('entsoe_retries_total', 'Retried ENTSO-E requests',
+                      ['endpoint'], registry=registry)
+    parsing = Histogram('entsoe_parse_seconds', 'Time spent parsing ENTSO-E responses',
+                        ['parser'], registry=registry)
+    if concurrency is not None:
+        Gauge('entsoe_concurrency_limit', 'Requests allowed in flight by the adaptive limit',
+              registry=registry).set_function(lambda: concurrency.limit)
+
+    def after_response(event: RequestEvent):
+        if event.coalesced:
+            # counted with the request it joined
+            return
+        status = 'error' if event.status is None else str(event.status)
+        requests_total.labels(event.endpoint, status, str(event.cached).lower()).inc()
+        if event.latency is not None and not event.cached:
+            latency.labels(event.endpoint).observe(event.latency)
+        if event.bytes is not None and not event.cached:
+            size.labels(event.endpoint).inc(event.bytes)
+
+    hooks.register('after_response', after_response)
+    hooks.register('on_retry', lambda event: retries.labels(event.endpoint).inc())
+    hooks.register('on_parse_done', lambda event: parsing.labels(event.parser).observe(event.duration))
+    return hooks
+
+
+def opentelemetry_hooks(meter=None, hooks: Optional[Hooks] = None) -> Hooks:
+    """
+    Hooks recording the same metrics as prometheus_hooks with OpenTelemetry.
+    Needs opentelemetry-api (pip install entsoe-py[opentelemetry]).
+
+    Parameters
+    ----------
+    meter : opentelemetry.metrics.Meter, optional
+        defaults to a meter of the global meter provider
+    hooks : Hooks, optional
+        add the metrics to these hooks instead of new ones
+    """
+    try:
+        from opentelemetry import metrics
+    except ImportError as e:
+        raise ImportError('opentelemetry_hooks needs opentelemetry-api, '
+                          'install it with pip install entsoe-py[opentelemetry]') from e
+    meter = metrics.get_meter('entsoe') if meter is None else meter
+    hooks = Hooks() if hooks is None else hooks
+
+    requests_total = meter.create_counter('entsoe.requests', description='Requests to the ENTSO-E API')
+    latency = meter.create_histogram('entsoe.request.duration', unit='s',
+                                     description='Latency of ENTSO-E requests')
+    size = meter.create_counter('entsoe.response.size', unit='By',
+                                description='Bytes received from the ENTSO-E API')
+    retries = meter.create_counter('entsoe.retries', description='Retried ENTSO-E requests')
+    parsing = meter.create_histogram('entsoe.parse.duration', unit='s',
+                                     description='Time spent parsing ENTSO-E responses')
+
+    def after_response(event: RequestEvent):
+        if event.coalesced:
+            # counted with the request it joined
+            return
+        attributes = {'endpoint': event.endpoint, 'cached': event.cached,
+                      'status': -1 if event.status is None else event.status}
+        requests_total.add(1, attributes)
+        if event.latency is not None and not event.cached:
+            latency.record(event.latency, {'endpoint': event.endpoint})
+        if event.bytes is not None and not event.cached:
+            size.add(event.bytes, {'endpoint': event.endpoint})
+
+    hooks.register('after_response', after_response)
+    hooks.register('on_retry', lambda event: retries.add(1, {'endpoint': event.endpoint}))
+    hooks.register('on_parse_done', lambda event: parsing.record(event.duration, {'parser': event.parser}))
+    return hooks
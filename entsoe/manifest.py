@@ -0,0 +1,184 @@
+"""
+Separate planning, downloading and parsing of large backfills.
+
+1. write_manifest turns RequestPlans into a JSON lines manifest of fully
+   formed requests without the security token
+2. fetch_manifest (or python -m entsoe.manifest) downloads a manifest, or a
+   shard of it, with several processes into a content addressed directory
+3. offline_client returns a client that answers its queries from that
+   directory only, so the parsers run without network access
+
+    python -m entsoe.manifest manifest.jsonl store --processes 8 --shard 0/2
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
+
+from .cache import ResponseCache
+from .entsoe import EntsoePandasClient, EntsoeRawClient
+from .exceptions import CacheMissError
+from .planning import RequestPlan
+from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def write_manifest(path: str, *plans: RequestPlan) -> int:
+    """
+    Write the requests of one or more plans to a JSON lines manifest,
+    requests that occur more than once are written once
+
+    Returns
+    -------
+    int
+        number of requests written
+    """
+    seen = set()
+    with open(path, 'w') as stream:
+        for plan in plans:
+            for request in plan:
+                if request.key in seen:
+                    continue
+                seen.add(request.key)
+                params = {k: str(v) for k, v in request.params.items()}
+                stream.write(json.dumps({'key': request.key, 'params': params}) + '\n')
+    return len(seen)
+
+
+def read_manifest(path: str) -> List[Dict]:
+    with open(path, 'r') as stream:
+        return [json.loads(line) for line in stream if line.strip()]
+
+
+def _store(directory: str, max_memory_entries: Optional[int] = 1024) -> ResponseCache:
+    # a manifest store never expires, whatever is in it is what gets parsed
+    return ResponseCache(directory=directory, ttl=None, negative_ttl=None,
+                         recent_negative_ttl=None, max_memory_entries=max_memory_entries)
+
+
+_worker_client = None
+
+
+def _init_worker(api_key: Optional[str], directory: str, rate: float, per: float):
+    global _worker_client
+    # downloaders only write to the store, there is no point keeping bodies in memory
+    _worker_client = EntsoeRawClient(api_key=api_key, cache=_store(directory, max_memory_entries=0),
+                                     rate_limiter=RateLimiter(rate=rate, per=per))
+
+
+def _download(entry: Dict) -> Dict:
+    params = dict(entry['params'], securityToken=_worker_client.api_key)
+    cached = _worker_client.cache.get(entry['key']) is not None
+    try:
+        response = _worker_client._request_with_retry(params)
+    except Exception as e:
+        return {'key': entry['key'], 'status': None, 'cached': False, 'error': repr(e)}
+    stored = cached or _worker_client.cache.get(entry['key']) is not None
+    return {
+        'key': entry['key'],
+        'status': response.status_code,
+        'cached': cached,
+        'error': None if stored else f'{response.status_code}: {response.text[:200]}'
+    }
+
+
+def fetch_manifest(manifest: str, directory: str, api_key: Optional[str] = None,
+                   processes: int = 4, rate: float = 400, per: float = 60,
+                   shard: int = 0, shards: int = 1) -> pd.DataFrame:
+    """
+    Download the requests of a manifest into a content addressed directory,
+    skipping the ones already there.
+
+    Parameters
+    ----------
+    manifest : str
+        path of the manifest
+    directory : str
+        store to download into, see ResponseCache for its layout
+    api_key : str, optional
+        defaults to the ENTSOE_API_KEY environment variable
+    processes : int
+        number of download processes
+    rate : float
+        upstream requests per period for all processes together
+    per : float
+        length of the rate limiting period in seconds
+    shard, shards : int
+        only download every shards-th request starting at shard, to spread
+        one manifest over several machines
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per request with its status, whether it was already stored
+        and the error if it could not be stored
+    """
+    entries = [e for i, e in enumerate(read_manifest(manifest)) if i % shards == shard]
+    # every process gets its own share of the rate limit
+    init_args = (api_key, directory, rate / max(1, processes), per)
+    if processes <= 1:
+        _init_worker(*init_args)
+        results = [_download(entry) for entry in entries]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=init_args) as pool:
+            results = pool.map(_download, entries, chunksize=1)
+    report = pd.DataFrame(results, columns=['key', 'status', 'cached', 'error'])
+    failed = report['error'].notna().sum()
+    logger.info(f'Fetched {len(report) - failed} of {len(report)} requests, {report["cached"].sum()} were already stored')
+    return report
+
+
+class OfflineSession(requests.Session):
+    """Session that refuses to go to the network"""
+
+    def request(self, method, url, *args, **kwargs):
+        raise CacheMissError(f'{url} with {kwargs.get("params")} is not in the offline store')
+
+
+def offline_client(directory: str, cls=EntsoePandasClient, **kwargs):
+    """
+    Client answering all queries from a directory filled by fetch_manifest
+    (or any persistent ResponseCache) without network access. Queries that
+    need a request that is not in the directory raise CacheMissError.
+
+    Parameters
+    ----------
+    directory : str
+    cls : type
+        client class, EntsoePandasClient or EntsoeRawClient
+    kwargs
+        passed on to the client
+    """
+    return cls(api_key='offline', session=OfflineSession(), cache=_store(directory),
+               coalesce=False, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Download an ENTSO-E request manifest')
+    parser.add_argument('manifest')
+    parser.add_argument('directory')
+    parser.add_argument('--api-key', default=None)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=400)
+    parser.add_argument('--per', type=float, default=60)
+    parser.add_argument('--shard', default='0/1', help='i/n: download the i-th of n shards')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    shard, shards = (int(x) for x in args.shard.split('/'))
+    report = fetch_manifest(args.manifest, args.directory, api_key=args.api_key,
+                            processes=args.processes, rate=args.rate, per=args.per,
+                            shard=shard, shards=shards)
+    failed = report[report['error'].notna()]
+    for _, row in failed.iterrows():
+        logger.warning(f'{row["key"]}: {row["error"]}')
+    return 1 if len(failed) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+"""
+Local stand-in for the ENTSO-E API, for load and integration tests without
+a network.
+
+Replays fixture documents for the query parameters the raw client sends and
+can simulate the ways the real API misbehaves: latency, No matching data
+acknowledgements, pagination limit errors, offset exhaustion, throttling
+(429), unavailability (503) and dropped connections. Point
+ENTSOE_ENDPOINT_URL at it:
+
+    python -m entsoe.mockserver --fixtures tests/fixtures --port 8081 --latency 0.2 --unavailable 0.05
+    ENTSOE_ENDPOINT_URL=http://localhost:8081/api
+
+The fixtures directory holds an index.json listing the documents and the
+request parameters they answer (see tests/fixtures). A document is served
+for every period, the client truncates it to the period it asked for.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlparse
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NO_MATCHING_DATA = 'No matching data found for Data item ENTSO-E mock server and interval.'
+# documents per offset of the outage documents, other documents are paged per 100
+PAGE_SIZES = {'A77': 200, 'A78': 200, 'A79': 200, 'A80': 200}
+
+
+def acknowledgement(text: str, code: int = 999) -> bytes:
+    """Acknowledgement document the API answers with instead of data"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Acknowledgement_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0">'
+        f'<mRID>mock</mRID><createdDateTime>{pd.Timestamp.now(tz="UTC"):%Y-%m-%dT%H:%M:%SZ}</createdDateTime>'
+        f'<Reason><code>{code}</code><text>{text}</text></Reason>'
+        '</Acknowledgement_MarketDocument>'
+    ).encode()
+
+
+class Route(NamedTuple):
+    """A document and the request parameters it answers"""
+    request: Dict[str, str]
+    content: bytes
+    content_type: str
+
+    def matches(self, params: Dict[str, str]) -> bool:
+        return all(params.get(key) == value for key, value in self.request.items())
+
+
+def load_routes(directory: str) -> List[Route]:
+    """Routes of the fixtures listed in the index.json of a directory"""
+    with open(os.path.join(directory, 'index.json')) as stream:
+        entries = json.load(stream)
+    routes = []
+    for entry in entries:
+        # entries without a request only exist to benchmark a parser
+        if 'request' not in entry:
+            continue
+        with open(os.path.join(directory, entry['file']), 'rb') as stream:
+            content = stream.read()
+        content_type = 'application/zip' if entry['file'].endswith('.zip') else 'text/xml'
+        routes.append(Route(entry['request'], content, content_type))
+    return routes
+
+
+class Scenario:
+    """How the mock server misbehaves, the probabilities are per request"""
+
+    def __init__(self, latency: float = 0, jitter: float = 0, no_data: float = 0,
+                 throttle: float = 0, unavailable: float = 0, disconnect: float = 0,
+                 page_size: Optional[int] = None, max_offset: int = 4800,
+                 max_period: Optional[pd.Timedelta] = None, seed: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        latency : float
+            seconds every response is delayed
+        jitter : float
+            up to this many seconds are added to the latency at random
+        no_data : float
+            probability of answering No matching data
+        throttle : float
+            probability of answering 429 Too Many Requests
+        unavailable : float
+            probability of answering 503 Service Unavailable
+        disconnect : float
+            probability of closing the connection without an answer
+        page_size : int, optional
+            documents per offset of zipped responses, by default 200 for
+            outages and 100 otherwise like the API. The offsets after the last
+            page answer No matching data
+        max_offset : int
+            larger offsets answer the offset limit error
+        max_period : pd.Timedelta, optional
+            longer periods answer the pagination limit error
+        seed : int, optional
+            seed of the random draws, for reproducible runs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.no_data = no_data
+        self.throttle = throttle
+        self.unavailable = unavailable
+        self.disconnect = disconnect
+        self.page_size = page_size
+        self.max_offset = max_offset
+        self.max_period = max_period
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def delay(self) -> float:
+        return self.latency + (self.jitter * self.draw() if self.jitter else 0)
+
+    def page_size_of(self, params: Dict[str, str]) -> int:
+        if self.page_size is not None:
+            return self.page_size
+        return PAGE_SIZES.get(params.get('documentType'), 100)
+
+    def fault(self) -> Optional[str]:
+        """The fault to simulate for a request, if any"""
+        for fault in ('disconnect', 'unavailable', 'throttle', 'no_data'):
+            probability = getattr(self, fault)
+            if probability and self.draw() < probability:
+                return fault
+        return None
+
+
+def page(content: bytes, offset: int, size: int) -> Optional[bytes]:
+    """The documents of a zip archive starting at offset, None if there are none"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        members = [info for info in archive.infolist() if info.filename.endswith('xml')]
+        members = members[offset:offset + size]
+        if len(members) == 0:
+            return None
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as paged:
+            for info in members:
+                paged.writestr(info, archive.read(info))
+    return buffer.getvalue()
+
+
+class MockEntsoeHandler(BaseHTTPRequestHandler):
+    server: 'MockEntsoeServer'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/api':
+            self._reply(404, b'Not found', 'text/plain')
+            return
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        if not params.pop('securityToken', None):
+            self._reply(401, b'Unauthorized', 'text/plain')
+            return
+        self.server.record(params)
+
+        scenario = self.server.scenario
+        delay = scenario.delay()
+        if delay:
+            time.sleep(delay)
+        fault = scenario.fault()
+        if fault == 'disconnect':
+            # drop the connection before sending a status line
+            self.close_connection = True
+            return
+        if fault == 'unavailable':
+            self._reply(503, b'Service Unavailable', 'text/plain')
+            return
+        if fault == 'throttle':
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if fault == 'no_data':
+            self._reply(200, acknowledgement(NO_MATCHING_DATA), 'text/xml')
+            return
+        status, content, content_type = self.server.answer(params)
+        self._reply(status, content, content_type)
+
+    def _reply(self, status: int, content: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class MockEntsoeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, routes: Iterable[Route], scenario: Optional[Scenario] = None):
+        """
+        Parameters
+        ----------
+        server_address : (str, int)
+        routes : [Route]
+            documents to replay, the route matching most parameters of a
+            request answers it
+        scenario : Scenario, optional
+            faults to simulate, none by default
+        """
+        super().__init__(server_address, MockEntsoeHandler)
+        self.routes = sorted(routes, key=lambda route: len(route.request), reverse=True)
+        self.scenario = Scenario() if scenario is None else scenario
+        self.requests: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/api'
+
+    def record(self, params: Dict[str, str]):
+        with self._lock:
+            self.requests.append(params)
+
+    def answer(self, params: Dict[str, str]):
+        """(status, content, content type) of the documents matching a request"""
+        scenario = self.scenario
+        if scenario.max_period is not None and 'periodStart' in params and 'periodEnd' in params:
+            period = (pd.to_datetime(params['periodEnd'], format='%Y%m%d%H%M')
+                      - pd.to_datetime(params['periodStart'], format='%Y%m%d%H%M'))
+            if period > scenario.max_period:
+                text = (f'The amount of requested data exceeds allowed limit. '
+                        f'Allowed: {scenario.max_period.days} days, requested: {period.days} days.')
+                return 400, acknowledgement(text), 'text/xml'
+
+        offset = int(params.get('offset', 0))
+        size = scenario.page_size_of(params)
+        if offset > scenario.max_offset:
+            requested = offset + size
+            text = (f'The amount of requested data to be gathered via the offset parameter exceeds the allowed limit '
+                    f'(allowed: {scenario.max_offset + size}). Offset and page size of this request add up '
+                    f'to more documents than allowed in total, the request asks for {requested} documents, '
+                    f'please narrow down the time interval instead.')
+            return 400, acknowledgement(text), 'text/xml'
+
+        route = next((route for route in self.routes if route.matches(params)), None)
+        if route is None:
+            return 200, acknowledgement(NO_MATCHING_DATA), 'text/xml'
+        if route.content_type == 'application/zip':
+            content = page(route.content, offset, size)
+        else:
+            content = route.content if offset == 0 else None
+        if content is None:
+            # offset past the last document
+            return 200, acknowledgement(NO_MATCHING_DATA), 'text/xml'
+        return 200, content, route.content_type
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in for the ENTSO-E API')
+    parser.add_argument('--fixtures', required=True,
+                        help='folder with the documents to replay and their index.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0, help='seconds every response is delayed')
+    parser.add_argument('--jitter', type=float, default=0, help='random extra latency up to this many seconds')
+    parser.add_argument('--no-data', type=float, default=0, help='probability of answering No matching data')
+    parser.add_argument('--throttle', type=float, default=0, help='probability of answering 429')
+    parser.add_argument('--unavailable', type=float, default=0, help='probability of answering 503')
+    parser.add_argument('--disconnect', type=float, default=0, help='probability of dropping the connection')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='documents per offset of zipped responses, 200 for outages and 100 otherwise by default')
+    parser.add_argument('--max-offset', type=int, default=4800, help='larger offsets answer the offset limit error')
+    parser.add_argument('--max-days', type=float, default=None,
+                        help='longer periods answer the pagination limit error')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scenario = Scenario(
+        latency=args.latency, jitter=args.jitter, no_data=args.no_data, throttle=args.throttle,
+        unavailable=args.unavailable, disconnect=args.disconnect, page_size=args.page_size,
+        max_offset=args.max_offset, seed=args.seed,
+        max_period=None if args.max_days is None else pd.Timedelta(days=args.max_days)
+    )
+    server = MockEntsoeServer((args.host, args.port), load_routes(args.fixtures), scenario)
+    logger.info(f'Serving mock ENTSO-E API on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
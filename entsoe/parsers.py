@@ -8,6 +8,7 @@ from bs4.builder import XMLParsedAsHTMLWarning
 import pandas as pd
 
 from .mappings import PSRTYPE_MAPPINGS, DOCSTATUS, BSNTYPE, Area
+from .instrumentation import timed_parser
 from .series_parsers import _extract_timeseries, _resolution_to_timedelta, _parse_datetimeindex, _parse_timeseries_generic,\
     _parse_timeseries_generic_whole
 
@@ -17,6 +18,7 @@ GENERATION_ELEMENT = "inBiddingZone_Domain.mRID"
 CONSUMPTION_ELEMENT = "outBiddingZone_Domain.mRID"
 
 
+@timed_parser
 def parse_prices(xml_text):
     """
     Parameters
@@ -45,6 +47,7 @@ def parse_prices(xml_text):
     return series
 
 
+@timed_parser
 def parse_netpositions(xml_text):
     """
 
@@ -76,6 +79,7 @@ def parse_netpositions(xml_text):
 
 
 
+@timed_parser
 def parse_loads(xml_text, process_type='A01'):
     """
     Parameters
@@ -112,6 +116,7 @@ def parse_loads(xml_text, process_type='A01'):
         })
 
 
+@timed_parser
 def parse_generation(
         xml_text: str,
         per_plant: bool = False,
@@ -197,6 +202,7 @@ def _calc_nett_and_drop_redundant_columns(
     return df
 
 
+@timed_parser
 def parse_installed_capacity_per_plant(xml_text):
     """
     Parameters
@@ -229,6 +235,7 @@ def parse_installed_capacity_per_plant(xml_text):
     return df
 
 
+@timed_parser
 def parse_water_hydro(xml_text):
     """
     Parameters
@@ -243,6 +250,7 @@ def parse_water_hydro(xml_text):
     return _parse_timeseries_generic_whole(xml_text)
 
 
+@timed_parser
 def parse_crossborder_flows(xml_text):
     """
     Parameters
@@ -256,6 +264,7 @@ def parse_crossborder_flows(xml_text):
     return _parse_timeseries_generic_whole(xml_text, to_float=True)
 
     
+@timed_parser
 def parse_activated_balancing_energy_prices(xml_text):
     """
     Parameters
@@ -274,6 +283,7 @@ def parse_activated_balancing_energy_prices(xml_text):
     df.sort_index(inplace=True)
     return df
 
+@timed_parser
 def parse_imbalance_prices(xml_text):
     """
     Parameters
@@ -293,6 +303,7 @@ def parse_imbalance_prices(xml_text):
     return df
 
 
+@timed_parser
 def parse_imbalance_volumes(xml_text, include_resolution=False):
     """
     Parameters
@@ -312,6 +323,7 @@ def parse_imbalance_volumes(xml_text, include_resolution=False):
     return df
 
 
+@timed_parser
 def parse_procured_balancing_capacity_zip(zip_contents: bytes, tz: str) -> pd.DataFrame:
     """
     Parameters
@@ -341,6 +353,7 @@ def parse_procured_balancing_capacity_zip(zip_contents: bytes, tz: str) -> pd.Da
     return df
 
 
+@timed_parser
 def parse_procured_balancing_capacity(xml_text, tz):
     """
     Parameters
@@ -361,6 +374,7 @@ def parse_procured_balancing_capacity(xml_text, tz):
     df.sort_index(axis=1, inplace=True)
     return df
 
+@timed_parser
 def parse_aggregated_bids(xml_text):
     """
 
@@ -459,6 +473,7 @@ def _parse_procured_balancing_capacity(soup, tz):
     return df
 
 
+@timed_parser
 def parse_contracted_reserve_zip(zip_contents: bytes, tz: str, label: str) -> pd.DataFrame:
     """
     Parse contracted reserve data from a ZIP archive containing XML files.
@@ -490,6 +505,7 @@ def parse_contracted_reserve_zip(zip_contents: bytes, tz: str, label: str) -> pd
     return df
 
 
+@timed_parser
 def parse_contracted_reserve(xml_text, tz, label):
     """
     Parameters
@@ -588,6 +604,7 @@ def _parse_contracted_reserve_series(soup, tz, label):
     df.columns = pd.MultiIndex.from_product([df.columns, [direction]])
     return df
 
+@timed_parser
 def parse_imbalance_prices_zip(zip_contents: bytes) -> pd.DataFrame:
     """
     Parameters
@@ -675,6 +692,7 @@ def _parse_imbalance_prices_timeseries(soup) -> pd.DataFrame:
 
     return df
 
+@timed_parser
 def parse_imbalance_volumes_zip(zip_contents: bytes, include_resolution:bool = False) -> pd.DataFrame:
     """
     Parameters
@@ -993,6 +1011,7 @@ _UNAVAIL_PARSE_CFG = {'A77': (HEADERS_UNAVAIL_GEN, _unavailability_gen_ts),
                       'A80': (HEADERS_UNAVAIL_GEN, _unavailability_gen_ts)}
 
 
+@timed_parser
 def parse_unavailabilities(response: bytes, doctype: str) -> pd.DataFrame:
     """
     Response for Unavailability of Generation Units is ZIP folder
@@ -1016,6 +1035,7 @@ def parse_unavailabilities(response: bytes, doctype: str) -> pd.DataFrame:
     return df
 
 
+@timed_parser
 def parse_offshore_unavailability(response: bytes) -> pd.DataFrame:
     """
     offshore has slightly different structure so use seperate parser. this also enables using the new generic parsers as well
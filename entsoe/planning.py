@@ -0,0 +1,132 @@
+import copy
+import logging
+import math
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from .cache import request_key
+from .exceptions import NoMatchingDataError
+
+logger = logging.getLogger(__name__)
+
+# documents_limited never goes beyond this offset
+MAX_OFFSET = 4800
+
+
+class PlannedRequest(NamedTuple):
+    params: Dict
+    start: pd.Timestamp
+    end: pd.Timestamp
+    key: str
+    cached: bool
+
+
+class RequestPlan:
+    """
+    The requests a query would send, collected by running it against a
+    client that records requests instead of sending them.
+    """
+
+    def __init__(self, expected_documents: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        expected_documents : int, optional
+            number of documents expected per block for paginated
+            (documents_limited) queries, one page is assumed if None
+        """
+        self.expected_documents = expected_documents
+        self.requests: List[PlannedRequest] = []
+        self.rate_limiter = None
+
+    def add(self, params: Dict, cached: bool = False):
+        params = {k: v for k, v in params.items() if k != 'securityToken'}
+        self.requests.append(PlannedRequest(
+            params=params,
+            start=pd.Timestamp(params['periodStart'], tz='UTC'),
+            end=pd.Timestamp(params['periodEnd'], tz='UTC'),
+            key=request_key(params),
+            cached=cached
+        ))
+
+    def last_offset(self, n: int) -> int:
+        """
+        Offset of the empty page that ends a paginated query of n documents
+        per page, given the expected number of documents
+        """
+        pages = max(1, math.ceil((self.expected_documents or 1) / n))
+        return min(pages * n, MAX_OFFSET)
+
+    @property
+    def count(self) -> int:
+        """Number of requests that would be sent upstream"""
+        return len([r for r in self.requests if not r.cached])
+
+    def __len__(self):
+        return len(self.requests)
+
+    def __iter__(self):
+        return iter(self.requests)
+
+    def estimated_duration(self, latency: pd.Timedelta = pd.Timedelta(seconds=1),
+                           concurrency: int = 1) -> pd.Timedelta:
+        """
+        Rough estimate of how long the query takes: the larger of the time
+        the requests take at the given latency and concurrency and the time
+        the rate limiter of the client needs to let them all through.
+        """
+        duration = latency * self.count / max(1, concurrency)
+        if self.rate_limiter is not None:
+            limited = pd.Timedelta(seconds=max(0, self.count - self.rate_limiter.burst) * self.rate_limiter.interval)
+            duration = max(duration, limited)
+        return duration
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([dict(r.params, start=r.start, end=r.end, cached=r.cached) for r in self.requests])
+
+    def __repr__(self):
+        return f'<RequestPlan: {self.count} requests, {len(self) - self.count} cached>'
+
+
+def plan_query(client, method: str, *args, expected_documents: Optional[int] = None,
+               **kwargs) -> RequestPlan:
+    """
+    List the requests a query method of a client would send, without sending
+    any: block boundaries from year_limited/day_limited, the offsets of
+    documents_limited and paddings added by the method itself.
+
+    The query runs against a copy of the client on which every request is
+    recorded and answered with NoMatchingDataError, so paginated queries are
+    planned for expected_documents and splits caused by PaginationError are
+    not known beforehand.
+
+    Parameters
+    ----------
+    client : EntsoeRawClient | EntsoePandasClient
+    method : str
+        name of the query method, eg. 'query_unavailability_of_generation_units'
+    expected_documents : int, optional
+        documents expected per block for paginated queries
+    args, kwargs
+        passed on to the query method
+
+    Returns
+    -------
+    RequestPlan
+    """
+    plan = RequestPlan(expected_documents=expected_documents)
+    plan.rate_limiter = client.rate_limiter
+    planner = copy.copy(client)
+    planner._plan = plan
+    try:
+        getattr(planner, method)(*args, **kwargs)
+    except NoMatchingDataError:
+        pass
+    except ValueError:
+        # combined queries fail to concatenate when none of their parts has
+        # data, a ValueError before any request is an invalid argument
+        if len(plan.requests) == 0:
+            raise
+        logger.debug(f'Planning {method} ended with no data to combine')
+    return plan
@@ -0,0 +1,76 @@
+import contextvars
+import heapq
+import itertools
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import List, Optional, Tuple, Union
+
+
+class Priority(IntEnum):
+    """
+    Priority classes of requests, lower goes first. Interactive requests
+    overtake routine ones waiting for the rate limiter or a concurrency slot,
+    routine requests overtake bulk ones.
+    """
+    INTERACTIVE = 0
+    ROUTINE = 1
+    BULK = 2
+
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('entsoe_priority', default=Priority.ROUTINE)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+def lookup_priority(value: Union[Priority, str, int]) -> Priority:
+    if isinstance(value, str):
+        return Priority[value.upper()]
+    return Priority(value)
+
+
+@contextmanager
+def request_priority(value: Union[Priority, str, int]):
+    """
+    Send the requests made in this block, including those of the workers of
+    combined and batch queries, with the given priority
+
+    with request_priority(Priority.BULK):
+        client.query_generation(...)
+    """
+    token = _priority.set(lookup_priority(value))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class WaitQueue:
+    """
+    Order of the threads waiting for a shared resource: by priority, then
+    by arrival. Callers hold the lock of the condition they wait on.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+
+    def join(self, level: Optional[Priority] = None) -> Tuple[int, int]:
+        """Queue up with the given priority or the one of the current context"""
+        ticket = (int(current_priority() if level is None else level), next(self._counter))
+        heapq.heappush(self._heap, ticket)
+        return ticket
+
+    def first(self, ticket: Tuple[int, int]) -> bool:
+        return self._heap[0] == ticket
+
+    def leave(self, ticket: Tuple[int, int]):
+        if self._heap and self._heap[0] == ticket:
+            heapq.heappop(self._heap)
+        elif ticket in self._heap:
+            self._heap.remove(ticket)
+            heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
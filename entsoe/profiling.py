@@ -0,0 +1,135 @@
+"""
+Time spent per stage of a query: request, decode, parse, concat, dedup,
+tz_convert and truncate, summed over all blocks and offsets.
+
+    client = EntsoePandasClient(api_key, profile=True)
+    df = client.query_generation_per_plant(...)
+    print(profile_report(df))
+
+Memory is recorded as well when tracemalloc is tracing (tracemalloc.start()).
+Stages of queries running in several threads add up, so their sum can exceed
+the wall clock time of the query. Memory is measured for the whole process
+and is only accurate for stages that do not run at the same time.
+"""
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pandas as pd
+
+STAGES = ('request', 'decode', 'parse', 'concat', 'dedup', 'tz_convert', 'truncate')
+
+
+class Profile:
+    """Calls, seconds and peak memory per stage"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.total: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, memory: Optional[int] = None):
+        with self._lock:
+            record = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'memory': None})
+            record['calls'] += 1
+            record['seconds'] += seconds
+            if memory is not None:
+                record['memory'] = max(record['memory'] or 0, memory)
+
+    def to_dict(self) -> Dict:
+        return {'total': self.total, 'stages': {k: dict(v) for k, v in self.stages.items()}}
+
+    def to_frame(self) -> pd.DataFrame:
+        return report_frame(self.to_dict())
+
+
+_profile: contextvars.ContextVar = contextvars.ContextVar('entsoe_profile', default=None)
+
+
+def current_profile() -> Optional[Profile]:
+    return _profile.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Record the time (and memory) of the block in the profile of the running query, if any"""
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[1] - before if tracing else None
+        profile.add(name, seconds, memory)
+
+
+@contextmanager
+def profiling(enabled: bool = True):
+    """
+    Collect the stages of everything run in the block in a new profile,
+    unless a profile is already being collected
+
+    Yields
+    ------
+    Profile | None
+        the new profile, None if there is none or it belongs to a caller
+    """
+    if not enabled or _profile.get() is not None:
+        yield None
+        return
+    profile = Profile()
+    token = _profile.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total = time.perf_counter() - started
+        _profile.reset(token)
+
+
+def tz_convert(obj, tz):
+    """obj.tz_convert(tz), recorded as the tz_convert stage"""
+    with stage('tz_convert'):
+        return obj.tz_convert(tz)
+
+
+def truncate(obj, before, after):
+    """obj.truncate(before, after), recorded as the truncate stage"""
+    with stage('truncate'):
+        return obj.truncate(before=before, after=after)
+
+
+def report_frame(profile: Dict) -> pd.DataFrame:
+    frame = pd.DataFrame.from_dict(profile['stages'], orient='index',
+                                   columns=['calls', 'seconds', 'memory'])
+    order = [s for s in STAGES if s in frame.index] + [s for s in frame.index if s not in STAGES]
+    frame = frame.loc[order]
+    if profile['total']:
+        frame['share'] = frame['seconds'] / profile['total']
+    return frame
+
+
+def profile_report(result) -> pd.DataFrame:
+    """
+    Stage breakdown of a query result of a client created with profile=True
+
+    Returns
+    -------
+    pd.DataFrame
+        calls, seconds, memory (peak bytes, if traced) and share of the total
+        time per stage
+    """
+    profile = getattr(result, 'attrs', {}).get('entsoe_profile')
+    if profile is None:
+        raise ValueError('result has no profile, create the client with profile=True')
+    return report_frame(profile)
@@ -0,0 +1,169 @@
+"""
+Caching proxy for the ENTSO-E API.
+
+Serves the same query API as https://web-api.tp.entsoe.eu/api so clients only
+need ENTSOE_ENDPOINT_URL pointed at it. Every request is answered from the
+shared response cache when possible and otherwise sent upstream with the
+proxy's own API key, under one rate limiter for all consumers. Consumers can
+set the priority of their requests with an X-Entsoe-Priority header
+(interactive, routine or bulk). Recent windows of revised data are refreshed
+upstream while finalized history is served from the cache, see
+response_cache.
+
+    python -m entsoe.proxy --port 8080 --cache-dir /var/cache/entsoe
+"""
+import argparse
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socket import gaierror
+from http.client import RemoteDisconnected
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlparse
+
+import pandas as pd
+import requests
+
+from .breaker import CircuitBreaker
+from .cache import FreshnessPolicy, ResponseCache
+from .concurrency import AdaptiveConcurrency
+from .entsoe import EntsoeRawClient
+from .exceptions import CircuitOpenError
+from .priority import Priority, lookup_priority, request_priority
+from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class EntsoeProxyHandler(BaseHTTPRequestHandler):
+    server: 'EntsoeProxyServer'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/api':
+            self._reply(404, b'Not found', 'text/plain')
+            return
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        token = params.pop('securityToken', None)
+        if self.server.allowed_tokens is not None and token not in self.server.allowed_tokens:
+            self._reply(401, b'Unauthorized', 'text/plain')
+            return
+        params['securityToken'] = self.server.client.api_key
+        try:
+            level = lookup_priority(self.headers.get('X-Entsoe-Priority', Priority.ROUTINE))
+        except (KeyError, ValueError):
+            self._reply(400, b'Unknown priority', 'text/plain')
+            return
+
+        try:
+            with request_priority(level):
+                response = self.server.client._request_with_retry(params)
+        except CircuitOpenError:
+            self._reply(503, b'Upstream unavailable', 'text/plain')
+            return
+        except (requests.RequestException, gaierror, RemoteDisconnected) as e:
+            logger.warning(f'Upstream request failed: {e}')
+            self._reply(502, b'Bad gateway', 'text/plain')
+            return
+        self._reply(response.status_code, response.content,
+                    response.headers.get('content-type', 'application/octet-stream'))
+
+    def _reply(self, status: int, content: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class EntsoeProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, client: EntsoeRawClient,
+                 allowed_tokens: Optional[Iterable[str]] = None):
+        """
+        Parameters
+        ----------
+        server_address : (str, int)
+        client : EntsoeRawClient
+            client used for upstream requests, its cache and rate limiter are
+            shared by all consumers of the proxy
+        allowed_tokens : [str], optional
+            securityTokens consumers must present, any token is accepted if None
+        """
+        super().__init__(server_address, EntsoeProxyHandler)
+        self.client = client
+        self.allowed_tokens = None if allowed_tokens is None else set(allowed_tokens)
+
+
+def response_cache(directory: Optional[str] = None, ttl: Optional[float] = None,
+                   forever: bool = False) -> ResponseCache:
+    """
+    The cache shared by the consumers of the proxy. By default a
+    FreshnessPolicy refreshes recent and revised windows while finalized
+    history is kept, as consumers cannot choose how fresh their answers are.
+
+    Parameters
+    ----------
+    directory : str, optional
+        persist the cache in this folder
+    ttl : float, optional
+        seconds every response stays fresh instead
+    forever : bool
+        never refresh a response instead
+    """
+    if forever:
+        return ResponseCache(directory=directory, ttl=None)
+    if ttl is not None:
+        return ResponseCache(directory=directory, ttl=pd.Timedelta(seconds=ttl))
+    return ResponseCache(directory=directory, ttl=None, policy=FreshnessPolicy())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Caching proxy for the ENTSO-E API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--api-key', default=None,
+                        help='upstream API key, defaults to the ENTSOE_API_KEY environment variable')
+    parser.add_argument('--cache-dir', default=None,
+                        help='persist the response cache in this folder')
+    lifetime = parser.add_mutually_exclusive_group()
+    lifetime.add_argument('--ttl', type=float, default=None,
+                          help='seconds every cached response stays fresh, instead of deriving it from '
+                               'the endpoint and window of the request')
+    lifetime.add_argument('--cache-forever', action='store_true',
+                          help='never refresh cached responses, also those of recent and revised data')
+    parser.add_argument('--rate', type=float, default=400,
+                        help='upstream requests allowed per --per seconds')
+    parser.add_argument('--per', type=float, default=60)
+    parser.add_argument('--token', action='append', dest='tokens', default=None,
+                        help='securityToken consumers must use, can be repeated')
+    parser.add_argument('--max-concurrency', type=int, default=None,
+                        help='adapt the number of upstream requests in flight up to this maximum')
+    parser.add_argument('--failure-threshold', type=int, default=None,
+                        help='stop sending upstream after this many consecutive failures, '
+                             'answering from the cache (stale if needed) until the API is back')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = EntsoeRawClient(
+        api_key=args.api_key,
+        cache=response_cache(args.cache_dir, ttl=args.ttl, forever=args.cache_forever),
+        rate_limiter=RateLimiter(rate=args.rate, per=args.per),
+        concurrency=None if args.max_concurrency is None else AdaptiveConcurrency(maximum=args.max_concurrency),
+        breaker=None if args.failure_threshold is None else CircuitBreaker(failure_threshold=args.failure_threshold)
+    )
+    server = EntsoeProxyServer((args.host, args.port), client, allowed_tokens=args.tokens)
+    logger.info(f'Serving ENTSO-E proxy on http://{args.host}:{args.port}/api')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Optional
+
+from .priority import Priority, WaitQueue
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the number of requests sent upstream.
+
+    One limiter can be shared by several clients, threads or (through the
+    proxy) consumers so they all stay within a single API budget. ENTSO-E
+    allows 400 requests per minute per user.
+
+    Requests waiting for a token get it in order of priority (see
+    entsoe.priority), so interactive requests are sent before queued bulk
+    requests without exceeding the budget.
+    """
+
+    def __init__(self, rate: float = 400, per: float = 60, burst: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        rate : float
+            number of requests allowed per period
+        per : float
+            length of the period in seconds
+        burst : int, optional
+            maximum number of requests that can be sent at once after an idle
+            period, defaults to rate
+        """
+        self.rate = rate
+        self.per = per
+        self.burst = rate if burst is None else burst
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+        self._waiting = WaitQueue()
+
+    @property
+    def interval(self) -> float:
+        """Seconds between two requests at the sustained rate"""
+        return self.per / self.rate
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available and nobody is waiting for it"""
+        with self._condition:
+            self._refill(time.monotonic())
+            if self._tokens >= 1 and len(self._waiting) == 0:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, priority: Optional[Priority] = None):
+        """
+        Wait until a request may be sent and take a token for it
+
+        Parameters
+        ----------
+        priority : Priority, optional
+            defaults to the priority of the current context
+        """
+        with self._condition:
+            ticket = self._waiting.join(priority)
+            try:
+                while True:
+                    self._refill(time.monotonic())
+                    if not self._waiting.first(ticket):
+                        # woken up when the request in front is through
+                        self._condition.wait()
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    else:
+                        self._condition.wait((1 - self._tokens) * self.interval)
+            finally:
+                self._waiting.leave(ticket)
+                self._condition.notify_all()
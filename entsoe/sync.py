@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .exceptions import NoMatchingDataError
+from .mappings import Area
+
+logger = logging.getLogger(__name__)
+
+
+class CoverageIndex:
+    """
+    Sorted set of non-overlapping, closed time intervals that are already
+    present in the local store for one (endpoint, area, params) combination
+    """
+
+    def __init__(self, intervals: Optional[List[Tuple[pd.Timestamp, pd.Timestamp]]] = None):
+        self.intervals = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def add(self, start: pd.Timestamp, end: pd.Timestamp):
+        """Mark [start, end] as covered, merging touching or overlapping intervals"""
+        if end <= start:
+            return
+        merged = []
+        for _start, _end in self.intervals:
+            if _end < start or _start > end:
+                merged.append((_start, _end))
+            else:
+                start = min(start, _start)
+                end = max(end, _end)
+        merged.append((start, end))
+        self.intervals = sorted(merged)
+
+    def gaps(self, start: pd.Timestamp, end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the parts of [start, end] that are not covered"""
+        gaps = []
+        cursor = start
+        for _start, _end in self.intervals:
+            if _end <= cursor:
+                continue
+            if _start >= end:
+                break
+            if _start > cursor:
+                gaps.append((cursor, _start))
+            cursor = max(cursor, _end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def covers(self, start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        return len(self.gaps(start, end)) == 0
+
+    def to_json(self) -> list:
+        return [[s.tz_convert('UTC').isoformat(), e.tz_convert('UTC').isoformat()] for s, e in self.intervals]
+
+    @classmethod
+    def from_json(cls, data: list) -> 'CoverageIndex':
+        return cls([(pd.Timestamp(s), pd.Timestamp(e)) for s, e in data])
+
+
+class EntsoeSync:
+    """
+    Incremental synchronisation of EntsoePandasClient queries into a local
+    directory store.
+
+    For every (method, positional arguments, keyword arguments) combination the
+    store keeps the data fetched so far together with a CoverageIndex of the
+    time intervals it holds. A sync call only requests the gaps in that
+    coverage, plus the recent tail that ENTSO-E may still revise, and merges
+    the answers into the stored frame.
+
+    Only queries returning data indexed by a DatetimeIndex are supported.
+    """
+
+    INDEX_FILE = 'coverage.json'
+
+    def __init__(self, client, directory: str,
+                 mutable_window: pd.Timedelta = pd.Timedelta(days=7)):
+        """
+        Parameters
+        ----------
+        client : EntsoePandasClient
+        directory : str
+            folder that holds the stored frames and the coverage index
+        mutable_window : pd.Timedelta
+            data younger than this (relative to the moment it was fetched) is
+            considered still mutable and is fetched again on the next sync
+        """
+        self.client = client
+        self.directory = directory
+        self.mutable_window = mutable_window
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict:
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as stream:
+            return json.load(stream)
+
+    def _save_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as stream:
+            json.dump(self._index, stream, indent=1)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _normalize(value) -> str:
+        if isinstance(value, Area):
+            return value.name
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+        return str(value)
+
+    def _key(self, method: str, args: tuple, kwargs: dict) -> Tuple[str, Dict]:
+        description = {
+            'method': method,
+            'args': [self._normalize(a) for a in args],
+            'kwargs': {k: self._normalize(v) for k, v in sorted(kwargs.items())}
+        }
+        key = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:32]
+        return key, description
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def coverage(self, method: str, *args, **kwargs) -> CoverageIndex:
+        """Return the CoverageIndex for a query, empty if nothing is stored yet"""
+        key, _ = self._key(method, args, kwargs)
+        entry = self._index.get(key)
+        if entry is None:
+            return CoverageIndex()
+        return CoverageIndex.from_json(entry['intervals'])
+
+    def missing(self, method: str, *args, start: pd.Timestamp, end: pd.Timestamp,
+                **kwargs) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Compute the windows a sync of [start, end] would request: the gaps in
+        the coverage (which never includes the still mutable tail), aligned on
+        whole hours since the API does not accept finer period boundaries.
+
+        Returns
+        -------
+        [(pd.Timestamp, pd.Timestamp)]
+        """
+        coverage = self.coverage(method, *args, **kwargs)
+        gaps = []
+        for _start, _end in coverage.gaps(start, end):
+            # the index is stored in UTC, hand out windows in the caller's timezone
+            _start = max(_start.tz_convert('UTC').floor('h').tz_convert(start.tz), start)
+            _end = min(_end.tz_convert('UTC').ceil('h').tz_convert(start.tz), end)
+            if gaps and gaps[-1][1] >= _start:
+                gaps[-1] = (gaps[-1][0], _end)
+            else:
+                gaps.append((_start, _end))
+        return gaps
+
+    def load(self, method: str, *args, start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None,
+             **kwargs) -> Optional[Union[pd.DataFrame, pd.Series]]:
+        """Return the stored data for a query without touching the API"""
+        key, _ = self._key(method, args, kwargs)
+        path = self._data_path(key)
+        if not os.path.exists(path):
+            return None
+        df = pd.read_pickle(path)
+        return df.truncate(before=start, after=end)
+
+    def sync(self, method: str, *args, start: pd.Timestamp, end: pd.Timestamp,
+             **kwargs) -> Union[pd.DataFrame, pd.Series]:
+        """
+        Bring the local store up to date for [start, end] and return the
+        stored data for that window.
+
+        Parameters
+        ----------
+        method : str
+            name of a query method of the client, eg. 'query_load'
+        start : pd.Timestamp
+        end : pd.Timestamp
+        args, kwargs
+            passed on to the query method
+
+        Returns
+        -------
+        pd.DataFrame | pd.Series
+        """
+        key, description = self._key(method, args, kwargs)
+        query = getattr(self.client, method)
+        now = pd.Timestamp.now(tz='UTC')
+
+        gaps = self.missing(method, *args, start=start, end=end, **kwargs)
+        stored = self.load(method, *args, **kwargs)
+        coverage = self.coverage(method, *args, **kwargs)
+
+        mutable_from = now - self.mutable_window
+        for _start, _end in gaps:
+            logger.debug(f'Syncing {method} {description["args"]} between {_start} and {_end}')
+            try:
+                frame = query(*args, start=_start, end=_end, **kwargs)
+            except NoMatchingDataError:
+                frame = None
+            if frame is not None and not isinstance(frame.index, pd.DatetimeIndex):
+                raise TypeError(f'{method} does not return time indexed data and cannot be synced')
+            stored = self._merge(stored, frame, _start, _end)
+            # only the part that ENTSO-E is not expected to revise anymore counts as covered
+            coverage.add(_start, min(_end, mutable_from))
+
+        with self._lock:
+            if stored is not None:
+                stored.to_pickle(self._data_path(key))
+            self._index[key] = dict(description, intervals=coverage.to_json())
+            self._save_index()
+
+        if stored is None:
+            raise NoMatchingDataError
+        result = stored.truncate(before=start, after=end)
+        if len(result) == 0:
+            raise NoMatchingDataError
+        return result
+
+    @staticmethod
+    def _merge(stored, frame, start: pd.Timestamp, end: pd.Timestamp):
+        """Replace everything stored within [start, end] by the newly fetched frame"""
+        if stored is None:
+            return frame
+        if frame is None:
+            # the window has no data (anymore), drop what was stored for it
+            return stored[(stored.index < start) | (stored.index > end)]
+        stored = stored[(stored.index < start) | (stored.index > end)]
+        return pd.concat([stored, frame.tz_convert(stored.index.tz)], sort=True).sort_index()
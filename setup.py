@@ -70,6 +70,12 @@ setup(
     # your project is installed.
     install_requires=['requests', 'pytz', 'beautifulsoup4>=4.11.1', 'pandas>=2.2.0'],
 
+    # Optional exporters for the metrics of entsoe.instrumentation
+    extras_require={
+        'prometheus': ['prometheus_client'],
+        'opentelemetry': ['opentelemetry-api'],
+    },
+
     include_package_data=True,
     package_data={"entsoe": ["py.typed"]}
 )
@@ -0,0 +1,164 @@
+"""
+Performance regression gate: compares a pytest-benchmark run of the offline
+suite with a stored baseline and fails when a hot path got slower or uses
+more memory.
+
+    pytest tests/benchmarks --benchmark-json run.json
+    python -m tests.benchmarks.compare run.json --save     # store run.json as the baseline
+    python -m tests.benchmarks.compare run.json            # exit 1 if a hot path regressed
+
+A benchmark regressed when its median time grew by more than the tolerance
+and by more than noise times the larger interquartile range of the two runs,
+so benchmarks that are noisy need a larger change to count. Memory is the
+peak traced by corpus.measure and has its own tolerance. Timings only
+compare between runs on the same machine, the baseline records which one.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# benchmarks that fail the gate, other regressions are only reported
+HOT_PATHS = (r'test_hot_paths\.py', r'test_parser\[unavailability_generation_units\]')
+# memory differences below this many bytes are never a regression
+MEMORY_FLOOR = 64 * 1024
+
+
+def summarize(run: Dict) -> Dict:
+    """The baseline of a pytest-benchmark json report"""
+    machine = run.get('machine_info', {})
+    return {
+        'machine': {
+            'cpu': machine.get('cpu', {}).get('brand_raw'),
+            'system': machine.get('system'),
+            'python': machine.get('python_version'),
+        },
+        'datetime': run.get('datetime'),
+        'benchmarks': {
+            benchmark['fullname']: {
+                'group': benchmark.get('group'),
+                'median': benchmark['stats']['median'],
+                'iqr': benchmark['stats']['iqr'],
+                'rounds': benchmark['stats']['rounds'],
+                'memory': benchmark.get('extra_info', {}).get('memory'),
+            }
+            for benchmark in run['benchmarks']
+        }
+    }
+
+
+def load(path: str) -> Dict:
+    """A baseline, or the baseline of a pytest-benchmark report"""
+    with open(path) as stream:
+        data = json.load(stream)
+    if isinstance(data.get('benchmarks'), list):
+        data = summarize(data)
+    return data
+
+
+def _status(base: Optional[float], new: Optional[float], limit: float) -> str:
+    if base is None or new is None:
+        return 'unknown'
+    if new - base > limit:
+        return 'regressed'
+    if base - new > limit:
+        return 'improved'
+    return 'unchanged'
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.1, noise: float = 3.0,
+            memory_tolerance: float = 0.1) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    baseline, current : dict
+        as returned by summarize
+    tolerance : float
+        relative change of the median time that is always accepted
+    noise : float
+        changes within this many interquartile ranges are accepted as well
+    memory_tolerance : float
+        relative change of the peak memory that is accepted
+
+    Returns
+    -------
+    pd.DataFrame
+        per benchmark the median times, their ratio, the status of the time
+        and of the memory: regressed, improved, unchanged, new or missing
+    """
+    rows = []
+    names = list(baseline['benchmarks']) + [name for name in current['benchmarks'] if name not in baseline['benchmarks']]
+    for name in names:
+        base = baseline['benchmarks'].get(name)
+        new = current['benchmarks'].get(name)
+        row = {'benchmark': name, 'group': (new or base).get('group'),
+               'baseline': base and base['median'], 'current': new and new['median'],
+               'memory baseline': base and base.get('memory'), 'memory current': new and new.get('memory')}
+        if base is None or new is None:
+            row['ratio'] = None
+            row['time'] = row['memory'] = 'new' if base is None else 'missing'
+        else:
+            row['ratio'] = new['median'] / base['median']
+            limit = max(tolerance * base['median'], noise * max(base['iqr'], new['iqr']))
+            row['time'] = _status(base['median'], new['median'], limit)
+            memory = base.get('memory')
+            row['memory'] = _status(memory, new.get('memory'),
+                                    max(memory_tolerance * (memory or 0), MEMORY_FLOOR))
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['benchmark', 'group', 'baseline', 'current', 'ratio', 'time',
+                                       'memory baseline', 'memory current', 'memory'])
+
+
+def regressions(frame: pd.DataFrame, hot: Iterable[str] = HOT_PATHS) -> pd.DataFrame:
+    """The rows of hot path benchmarks whose time or memory regressed"""
+    pattern = re.compile('|'.join(hot))
+    regressed = (frame['time'] == 'regressed') | (frame['memory'] == 'regressed')
+    is_hot = frame['benchmark'].map(lambda name: pattern.search(name) is not None)
+    return frame[regressed & is_hot]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Compare a benchmark run with the baseline')
+    parser.add_argument('run', help='json report of pytest --benchmark-json')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='store the run as the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative slow down that is accepted')
+    parser.add_argument('--noise', type=float, default=3.0, help='slow down in interquartile ranges that is accepted')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1)
+    parser.add_argument('--hot', action='append', default=None,
+                        help='regex of the benchmarks that fail the gate, can be repeated, all with --hot .')
+    args = parser.parse_args(argv)
+
+    current = load(args.run)
+    if args.save:
+        with open(args.baseline, 'w') as stream:
+            json.dump(current, stream, indent=2, sort_keys=True)
+            stream.write('\n')
+        print(f'Stored {len(current["benchmarks"])} benchmarks as the baseline in {args.baseline}')
+        return 0
+
+    baseline = load(args.baseline)
+    if baseline['machine'] != current['machine']:
+        print(f'Warning: the baseline was measured on {baseline["machine"]}, '
+              f'this run on {current["machine"]}, timings may not compare')
+    frame = compare(baseline, current, tolerance=args.tolerance, noise=args.noise,
+                    memory_tolerance=args.memory_tolerance)
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_colwidth', 80):
+        print(frame.drop(columns=['group']).to_string(index=False))
+    failed = regressions(frame, args.hot or HOT_PATHS)
+    if len(failed):
+        print(f'\n{len(failed)} hot path(s) regressed:')
+        for _, row in failed.iterrows():
+            print(f'  {row["benchmark"]}: time {row["time"]} ({row["ratio"]:.2f}x), memory {row["memory"]}')
+        return 1
+    print('\nNo hot path regressed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+The recorded fixture corpus in tests/fixtures, described by index.json.
+
+Every entry names a response document, the parser that reads it and, for
+entries with a query, the pandas client call that receives it. The
+documents are anonymised but keep the structure of real ENTSO-E responses.
+"""
+import json
+import os
+import tracemalloc
+import zipfile
+from io import BytesIO
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+from entsoe import EntsoePandasClient, parsers
+
+from ..fakes import NO_DATA, FakeAdapter, fake_client
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+TZ = 'Europe/Brussels'
+
+
+def entries() -> List[Dict]:
+    with open(os.path.join(FIXTURES, 'index.json')) as stream:
+        return json.load(stream)
+
+
+def queries() -> List[Dict]:
+    return [entry for entry in entries() if 'query' in entry]
+
+
+def content(entry: Dict) -> bytes:
+    """Response body of an entry, or the single document in the archive it names"""
+    with open(os.path.join(FIXTURES, entry['file']), 'rb') as stream:
+        data = stream.read()
+    if 'member' in entry:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            data = archive.read(entry['member'])
+    return data
+
+
+def parse(entry: Dict, data: bytes, backend=parsers):
+    """Parse the content of an entry with its parser from a backend, entsoe.parsers by default"""
+    parser = getattr(backend, entry['parser'])
+    if data[:2] != b'PK':
+        data = data.decode()
+    return parser(data, **entry.get('parser_kwargs', {}))
+
+
+class FixtureAdapter(FakeAdapter):
+    """Answers with the fixture of an entry, and no data for further offsets"""
+
+    def __init__(self, entry: Dict):
+        super().__init__(content(entry))
+        self.zipped = entry['file'].endswith('.zip')
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        offset = parse_qs(urlparse(request.url).query).get('offset', ['0'])[0]
+        if offset != '0':
+            response._content = NO_DATA
+            response.headers['content-type'] = 'text/xml'
+        else:
+            response._content = self.content
+            response.headers['content-type'] = 'application/zip' if self.zipped else 'text/xml'
+        return response
+
+
+def client(entry: Dict, **kwargs) -> EntsoePandasClient:
+    return fake_client(FixtureAdapter(entry), cls=EntsoePandasClient, **kwargs)
+
+
+def query(client: EntsoePandasClient, entry: Dict):
+    spec = entry['query']
+    method = getattr(client, spec['method'])
+    return method(*spec['args'], start=pd.Timestamp(spec['start'], tz=TZ),
+                  end=pd.Timestamp(spec['end'], tz=TZ), **spec.get('kwargs', {}))
+
+
+def measure(benchmark, func, *args):
+    """
+    Benchmark func and record the peak memory traced during one more call as
+    the memory extra info, which tests.benchmarks.compare checks as well
+    """
+    result = benchmark(func, *args)
+    if not benchmark.disabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        try:
+            func(*args)
+            benchmark.extra_info['memory'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
@@ -0,0 +1,177 @@
+"""
+Differential test of a new parser backend against entsoe.parsers: runs
+every parse_* function of both over the fixture corpus and synthetic
+documents, checks that they return the same frames and reports the speedup
+per parser.
+
+    python -m tests.benchmarks.parity mypackage.fast_parsers --output parity.csv
+    ENTSOE_PARSER_BACKEND=mypackage.fast_parsers pytest tests/benchmarks/test_parity.py
+
+A backend is a module (or any object) with parse_* functions taking the same
+arguments as those of entsoe.parsers. Functions it does not have are
+reported as missing. Results are equal when they have the same type, index,
+columns (including the levels of a MultiIndex), dtypes, values and missing
+values; dicts are compared per key.
+"""
+import argparse
+import importlib
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from entsoe import parsers
+
+from . import corpus, synthetic
+
+
+class Case(NamedTuple):
+    """A document and the parser call that reads it"""
+    name: str
+    parser: str
+    content: Union[str, bytes]
+    kwargs: Dict
+
+    def parse(self, backend=parsers):
+        return getattr(backend, self.parser)(self.content, **self.kwargs)
+
+
+def corpus_cases() -> List[Case]:
+    cases = []
+    for entry in corpus.entries():
+        data = corpus.content(entry)
+        if data[:2] != b'PK':
+            data = data.decode()
+        cases.append(Case(entry['name'], entry['parser'], data, entry.get('parser_kwargs', {})))
+    return cases
+
+
+def synthetic_cases(series: int = 3, periods: int = 2, documents: int = 2) -> List[Case]:
+    """Every synthetic kind as A01 and A03 curve, across the spring daylight saving time change"""
+    cases = []
+    for kind, (_, _, parser, kwargs) in synthetic.KINDS.items():
+        for curve_type in ('A01', 'A03'):
+            content = synthetic.generate(kind, series=min(series, 2) if kind == 'imbalance_prices' else series,
+                                         periods=periods, documents=documents, curve_type=curve_type,
+                                         start=synthetic.DST_SPRING)
+            cases.append(Case(f'synthetic_{kind}_{curve_type}', parser, content, kwargs))
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return corpus_cases() + synthetic_cases()
+
+
+def load_backend(name: str):
+    """The backend module with this dotted name"""
+    return importlib.import_module(name)
+
+
+def assert_same(expected, actual, path: str = 'result'):
+    """Raise an AssertionError describing the first difference between two parse results"""
+    assert type(actual) is type(expected), f'{path}: {type(actual).__name__} instead of {type(expected).__name__}'
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected), f'{path}: keys {list(actual)} instead of {list(expected)}'
+        for key in expected:
+            assert_same(expected[key], actual[key], f'{path}[{key!r}]')
+    elif isinstance(expected, pd.DataFrame):
+        pd.testing.assert_index_equal(actual.columns, expected.columns, exact=True, obj=f'{path}.columns')
+        pd.testing.assert_series_equal(actual.dtypes, expected.dtypes, obj=f'{path}.dtypes')
+        pd.testing.assert_frame_equal(actual.isna(), expected.isna(), obj=f'{path} missing values')
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True, check_index_type=True,
+                                      check_column_type=True, obj=path)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(actual.isna(), expected.isna(), obj=f'{path} missing values')
+        pd.testing.assert_series_equal(actual, expected, check_exact=True, check_index_type=True, obj=path)
+    else:
+        assert actual == expected, f'{path}: {actual!r} instead of {expected!r}'
+
+
+def _timed(case: Case, backend, repeat: int):
+    """(result, best time in seconds) of parsing a case"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = case.parse(backend)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def run(backend, cases: Optional[List[Case]] = None, repeat: int = 3,
+        reference=parsers) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    backend
+        module with the parse_* functions to check
+    cases : [Case], optional
+        the corpus and synthetic cases by default
+    repeat : int
+        the best of this many runs is the time
+    reference
+        module to compare with, entsoe.parsers by default
+
+    Returns
+    -------
+    pd.DataFrame
+        per case the parser, the times of both backends, the speedup, the
+        status (equal, different, error or missing) and the difference found
+    """
+    rows = []
+    for case in all_cases() if cases is None else cases:
+        row = {'case': case.name, 'parser': case.parser, 'reference': None, 'backend': None,
+               'speedup': None, 'status': 'equal', 'difference': ''}
+        expected, row['reference'] = _timed(case, reference, repeat)
+        if not hasattr(backend, case.parser):
+            row['status'] = 'missing'
+        else:
+            try:
+                actual, row['backend'] = _timed(case, backend, repeat)
+                row['speedup'] = row['reference'] / row['backend']
+                assert_same(expected, actual)
+            except AssertionError as e:
+                row['status'], row['difference'] = 'different', str(e).strip()
+            except Exception as e:
+                row['status'], row['difference'] = 'error', f'{type(e).__name__}: {e}'
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['case', 'parser', 'reference', 'backend', 'speedup', 'status', 'difference'])
+
+
+def report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per parser the cases, the equal ones and the speedup over their total time"""
+    grouped = df.groupby('parser')
+    summary = pd.DataFrame({
+        'cases': grouped.size(),
+        'equal': grouped['status'].apply(lambda status: (status == 'equal').sum()),
+        'reference': grouped['reference'].sum(),
+        'backend': grouped['backend'].sum(min_count=1),
+    })
+    summary['speedup'] = summary['reference'] / summary['backend']
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Compare a parser backend with entsoe.parsers')
+    parser.add_argument('backend', help='dotted name of the module with the parse_* functions to check')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='write the results per case to this csv file')
+    args = parser.parse_args(argv)
+
+    df = run(load_backend(args.backend), repeat=args.repeat)
+    if args.output is not None:
+        df.to_csv(args.output, index=False)
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print(report(df).to_string(float_format=lambda x: f'{x:.4f}'))
+    failed = df[df['status'].isin(['different', 'error'])]
+    for _, row in failed.iterrows():
+        print(f'\n{row["case"]} ({row["parser"]}) {row["status"]}:\n{row["difference"]}')
+    missing = df.loc[df['status'] == 'missing', 'parser'].unique()
+    if len(missing):
+        print(f'\nNot in {args.backend}: {", ".join(missing)}')
+    return 1 if len(failed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Parse time and peak memory of the parsers against the size of synthetic
+documents, to find where they stop scaling linearly.
+
+    python -m tests.benchmarks.scaling --sizes 1 4 16 64 256 --output scaling.csv --plot scaling.png
+
+The size multiplies the series of xml documents and the documents of
+zipped ones (or the axis given with --axis). The slope column is the
+exponent between two sizes on a log-log scale: about 1 is linear, clearly
+above 1 is a complexity cliff. Plotting needs matplotlib.
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import synthetic
+
+
+def measure(kind: str, content, repeat: int = 3):
+    """(best time in seconds, peak traced memory in bytes) of parsing content"""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        synthetic.parse(kind, content)
+        seconds.append(time.perf_counter() - started)
+    # tracing slows parsing down, so memory is measured in a separate run
+    tracemalloc.start()
+    try:
+        synthetic.parse(kind, content)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(seconds), peak
+
+
+def scaling(kinds: Iterable[str], sizes: Iterable[int], axis: Optional[str] = None,
+            repeat: int = 3, **kwargs) -> pd.DataFrame:
+    """
+    Parameters
+    ----------
+    kinds : [str]
+        kinds of synthetic.KINDS
+    sizes : [int]
+    axis : str, optional
+        series, periods or documents, by default documents for zipped kinds
+        and series otherwise
+    repeat : int
+        the best of this many runs is the time
+    kwargs
+        passed on to synthetic.generate
+
+    Returns
+    -------
+    pd.DataFrame
+        kind, size, bytes (of uncompressed xml), seconds, memory and slope
+        per run
+    """
+    rows = []
+    for kind in kinds:
+        zipped = synthetic.KINDS[kind][1]
+        dimension = axis or ('documents' if zipped else 'series')
+        for size in sizes:
+            content = synthetic.generate(kind, **{**kwargs, dimension: size})
+            seconds, memory = measure(kind, content, repeat=repeat)
+            length = synthetic.size(content)
+            rows.append({'kind': kind, 'size': size, 'bytes': length,
+                         'seconds': seconds, 'memory': memory})
+            print(f'{kind:<24}{size:>8}{length:>14,} bytes{seconds:>10.3f} s{memory / 2 ** 20:>10.1f} MiB')
+    df = pd.DataFrame(rows)
+    log = np.log(df[['bytes', 'seconds']])
+    df['slope'] = log.groupby(df['kind'])['seconds'].diff() / log.groupby(df['kind'])['bytes'].diff()
+    return df
+
+
+def plot(df: pd.DataFrame, path: str):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError as e:
+        raise ImportError('plotting needs matplotlib, install it with pip install matplotlib') from e
+    figure, (time_axis, memory_axis) = plt.subplots(1, 2, figsize=(12, 5))
+    for kind, runs in df.groupby('kind'):
+        time_axis.plot(runs['bytes'], runs['seconds'], marker='o', label=kind)
+        memory_axis.plot(runs['bytes'], runs['memory'] / 2 ** 20, marker='o', label=kind)
+    for axis, label in [(time_axis, 'parse time [s]'), (memory_axis, 'peak memory [MiB]')]:
+        axis.set_xscale('log')
+        axis.set_yscale('log')
+        axis.set_xlabel('xml size [bytes]')
+        axis.set_ylabel(label)
+        axis.grid(True, which='both', alpha=0.3)
+    time_axis.legend(fontsize='small')
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scaling of the parsers with the document size')
+    parser.add_argument('--kinds', nargs='+', default=list(synthetic.KINDS), choices=list(synthetic.KINDS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 4, 16, 64])
+    parser.add_argument('--axis', choices=['series', 'periods', 'documents'], default=None)
+    parser.add_argument('--periods', type=int, default=1, help='days per series, unless it is the axis')
+    parser.add_argument('--resolution', choices=list(synthetic.RESOLUTIONS), default='PT15M')
+    parser.add_argument('--curve-type', choices=['A01', 'A03'], default='A01')
+    parser.add_argument('--dst', action='store_true', help='start at a daylight saving time change')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='write the measurements to this csv file')
+    parser.add_argument('--plot', default=None, help='plot the measurements to this image file')
+    args = parser.parse_args(argv)
+
+    kwargs = {'resolution': args.resolution, 'curve_type': args.curve_type,
+              'start': synthetic.DST_SPRING if args.dst else '2023-01-02'}
+    if args.axis != 'periods':
+        kwargs['periods'] = args.periods
+    df = scaling(args.kinds, args.sizes, axis=args.axis, repeat=args.repeat, **kwargs)
+    steep = df[df['slope'] > 1.2]
+    for _, row in steep.iterrows():
+        print(f'{row["kind"]} grows with exponent {row["slope"]:.2f} up to size {row["size"]}')
+    if args.output is not None:
+        df.to_csv(args.output, index=False)
+    if args.plot is not None:
+        plot(df, args.plot)
+
+
+if __name__ == '__main__':
+    main()
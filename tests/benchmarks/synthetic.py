@@ -0,0 +1,259 @@
+"""
+Synthetic ENTSO-E documents of any size, to find where the parsers stop
+scaling linearly.
+
+    content = generate('generation_per_plant', series=500, periods=7, resolution='PT15M')
+    parse('generation_per_plant', content)
+
+Every period covers one day in Europe/Brussels, so periods crossing a
+daylight saving time change have 23 or 25 hours (start at DST_SPRING or
+DST_AUTUMN). With curve type A03 only the points where the value changes
+are written, as the API does, and the values repeat for a few positions on
+purpose. Zipped kinds hold one document per `documents`, each covering its
+own days.
+
+overlapping_pages and query_pages stand in for the offset pages a
+documents_limited query merges.
+"""
+import io
+import random
+import zipfile
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from entsoe import parsers
+from entsoe.decorators import documents_limited
+from entsoe.exceptions import NoMatchingDataError
+
+TZ = 'Europe/Brussels'
+AREA = '10YBE----------2'
+DST_SPRING = '2023-03-25'
+DST_AUTUMN = '2023-10-28'
+RESOLUTIONS = {'PT15M': pd.Timedelta(minutes=15), 'PT30M': pd.Timedelta(minutes=30),
+               'PT60M': pd.Timedelta(minutes=60)}
+PSR_TYPES = ['B01', 'B04', 'B05', 'B10', 'B11', 'B12', 'B14', 'B16', 'B17', 'B18', 'B19', 'B20']
+RESERVES = [('A95', 'A03'), ('A96', 'A01'), ('A96', 'A02'), ('A97', 'A01'), ('A97', 'A02')]
+FORMAT = '%Y-%m-%dT%H:%MZ'
+
+
+def days(start: str, count: int) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    first = pd.Timestamp(start, tz=TZ)
+    bounds = [first + pd.DateOffset(days=i) for i in range(count + 1)]
+    return [(s.tz_convert('UTC'), e.tz_convert('UTC')) for s, e in zip(bounds[:-1], bounds[1:])]
+
+
+class Builder:
+    """Writes the parts of documents, drawing values from a seeded generator"""
+
+    def __init__(self, resolution: str = 'PT15M', curve_type: str = 'A01', seed: int = 0):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f'Unknown resolution {resolution}, choose from {", ".join(RESOLUTIONS)}')
+        if curve_type not in ('A01', 'A03'):
+            raise ValueError('curve_type must be A01 or A03')
+        self.resolution = resolution
+        self.curve_type = curve_type
+        self.random = random.Random(seed)
+
+    def values(self, count: int, low: float, high: float) -> List[float]:
+        """Values that stay the same for one to four positions at a time"""
+        values = []
+        while len(values) < count:
+            values += [round(self.random.uniform(low, high), 2)] * self.random.randint(1, 4)
+        return values[:count]
+
+    def period(self, start: pd.Timestamp, end: pd.Timestamp, label: str = 'quantity',
+               low: float = 0, high: float = 1000, extra: str = '', name: str = 'Period') -> str:
+        count = int((end - start) / RESOLUTIONS[self.resolution])
+        points = []
+        previous = None
+        for position, value in enumerate(self.values(count, low, high), start=1):
+            # A03 leaves out the positions that repeat the previous value
+            if self.curve_type == 'A03' and value == previous:
+                continue
+            previous = value
+            points.append(f'<Point><position>{position}</position><{label}>{value}</{label}>{extra}</Point>')
+        return (f'<{name}><timeInterval><start>{start.strftime(FORMAT)}</start><end>{end.strftime(FORMAT)}</end></timeInterval>'
+                f'<resolution>{self.resolution}</resolution>{"".join(points)}</{name}>')
+
+    def series(self, number: int, header: str, periods: str) -> str:
+        return (f'<TimeSeries><mRID>{number}</mRID>{header}<curveType>{self.curve_type}</curveType>'
+                f'{periods}</TimeSeries>')
+
+
+def market_document(root: str, body: str, header: str = '') -> str:
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<{root} xmlns="urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3">'
+            f'<mRID>synthetic</mRID><revisionNumber>1</revisionNumber><createdDateTime>2023-01-01T00:00:00Z</createdDateTime>'
+            f'{header}{body}</{root}>')
+
+
+def archive(documents: List[str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipped:
+        for i, document in enumerate(documents):
+            zipped.writestr(f'document_{i:05d}.xml', document)
+    return buffer.getvalue()
+
+
+def _load(builder: Builder, windows, series: int) -> str:
+    header = (f'<businessType>A04</businessType><outBiddingZone_Domain.mRID codingScheme="A01">{AREA}</outBiddingZone_Domain.mRID>'
+              '<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>')
+    body = ''.join(builder.series(n + 1, header, ''.join(builder.period(s, e, low=5000, high=12000) for s, e in windows))
+                   for n in range(series))
+    return market_document('GL_MarketDocument', body)
+
+
+def _generation(builder: Builder, windows, series: int, per_plant: bool = False) -> str:
+    body = []
+    for n in range(series):
+        psr = PSR_TYPES[n % len(PSR_TYPES)]
+        resource = (f'<PowerSystemResources><mRID codingScheme="A01">22WSYNTH{n:08d}X</mRID><name>Unit {n:05d}</name></PowerSystemResources>'
+                    if per_plant else '')
+        header = (f'<businessType>A01</businessType><inBiddingZone_Domain.mRID codingScheme="A01">{AREA}</inBiddingZone_Domain.mRID>'
+                  f'<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name><MktPSRType><psrType>{psr}</psrType>{resource}</MktPSRType>')
+        body.append(builder.series(n + 1, header, ''.join(builder.period(s, e) for s, e in windows)))
+    return market_document('GL_MarketDocument', ''.join(body))
+
+
+def _flows(builder: Builder, windows, series: int, label: str = 'quantity') -> str:
+    header = (f'<in_Domain.mRID codingScheme="A01">{AREA}</in_Domain.mRID><out_Domain.mRID codingScheme="A01">{AREA}</out_Domain.mRID>'
+              '<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>')
+    body = ''.join(builder.series(n + 1, header, ''.join(builder.period(s, e, label=label) for s, e in windows))
+                   for n in range(series))
+    return market_document('Publication_MarketDocument', body)
+
+
+def _imbalance_prices(builder: Builder, windows, series: int) -> str:
+    if series > 2:
+        raise ValueError('imbalance price documents have one series per category, at most 2')
+    body = ''.join(
+        builder.series(n + 1, '<businessType>A19</businessType>', ''.join(
+            builder.period(s, e, label='imbalance_Price.amount', low=-100, high=300,
+                           extra=f'<imbalance_Price.category>{category}</imbalance_Price.category>')
+            for s, e in windows))
+        for n, category in enumerate(['A04', 'A05'][:series]))
+    return market_document('Balancing_MarketDocument', body)
+
+
+def _contracted_reserve(builder: Builder, windows, series: int) -> str:
+    body = []
+    for n in range(series):
+        business, direction = RESERVES[n % len(RESERVES)]
+        header = (f'<businessType>{business}</businessType><type_MarketAgreement.type>A01</type_MarketAgreement.type>'
+                  f'<flowDirection.direction>{direction}</flowDirection.direction>')
+        body.append(builder.series(n + 1, header, ''.join(
+            builder.period(s, e, label='procurement_Price.amount', high=50) for s, e in windows)))
+    return market_document('Balancing_MarketDocument', ''.join(body))
+
+
+def _unavailability(builder: Builder, windows, series: int, number: int = 0) -> str:
+    body = []
+    for n in range(series):
+        header = (f'<businessType>A53</businessType><biddingZone_Domain.mRID codingScheme="A01">{AREA}</biddingZone_Domain.mRID>'
+                  '<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>'
+                  f'<production_RegisteredResource.mRID codingScheme="A01">22WPROD{number:08d}X</production_RegisteredResource.mRID>'
+                  f'<production_RegisteredResource.name>Plant {number}</production_RegisteredResource.name>'
+                  f'<production_RegisteredResource.pSRType.psrType>{PSR_TYPES[n % len(PSR_TYPES)]}</production_RegisteredResource.pSRType.psrType>'
+                  '<production_RegisteredResource.pSRType.powerSystemResources.nominalP unit="MAW">500</production_RegisteredResource.pSRType.powerSystemResources.nominalP>')
+        body.append(builder.series(n + 1, header, ''.join(
+            builder.period(s, e, high=500, name='Available_Period') for s, e in windows)))
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<Unavailability_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-6:outagedocument:3:0">'
+            f'<mRID>SYNTH{number:08d}</mRID><revisionNumber>1</revisionNumber><createdDateTime>2023-01-01T00:00:00Z</createdDateTime>'
+            f'<docStatus><value>A05</value></docStatus>{"".join(body)}</Unavailability_MarketDocument>')
+
+
+# kind: (document builder, zipped, parser name, parser keyword arguments)
+KINDS: Dict[str, Tuple[Callable, bool, str, Dict]] = {
+    'load': (_load, False, 'parse_loads', {'process_type': 'A16'}),
+    'generation': (_generation, False, 'parse_generation', {}),
+    'generation_per_plant': (lambda b, w, s: _generation(b, w, s, per_plant=True), False,
+                             'parse_generation', {'per_plant': True, 'include_eic': True}),
+    'prices': (lambda b, w, s: _flows(b, w, s, label='price.amount'), False, 'parse_prices', {}),
+    'crossborder_flows': (_flows, False, 'parse_crossborder_flows', {}),
+    'netpositions': (_flows, False, 'parse_netpositions', {}),
+    'imbalance_prices': (_imbalance_prices, True, 'parse_imbalance_prices_zip', {}),
+    'contracted_reserve': (_contracted_reserve, True, 'parse_contracted_reserve_zip',
+                           {'tz': TZ, 'label': 'procurement_price.amount'}),
+    'unavailability': (_unavailability, True, 'parse_unavailabilities', {'doctype': 'A80'}),
+}
+
+
+def generate(kind: str, series: int = 1, periods: int = 1, documents: int = 1,
+             resolution: str = 'PT15M', curve_type: str = 'A01',
+             start: str = '2023-01-02', seed: int = 0) -> Union[str, bytes]:
+    """
+    Parameters
+    ----------
+    kind : str
+        one of KINDS
+    series : int
+        TimeSeries per document
+    periods : int
+        days per TimeSeries, one Period each
+    documents : int
+        documents in the archive of zipped kinds, each covering the next
+        periods days
+    resolution : str
+        PT15M, PT30M or PT60M
+    curve_type : str
+        A01 or A03
+    start : str
+        first day, DST_SPRING or DST_AUTUMN to cross a daylight saving time change
+    seed : int
+
+    Returns
+    -------
+    str | bytes
+        the xml document, or the zip archive for zipped kinds
+    """
+    build, zipped, _, _ = KINDS[kind]
+    builder = Builder(resolution=resolution, curve_type=curve_type, seed=seed)
+    windows = days(start, periods * (documents if zipped else 1))
+    if not zipped:
+        return build(builder, windows, series)
+    chunks = [windows[i * periods:(i + 1) * periods] for i in range(documents)]
+    if kind == 'unavailability':
+        return archive([build(builder, chunk, series, number=i) for i, chunk in enumerate(chunks)])
+    return archive([build(builder, chunk, series) for chunk in chunks])
+
+
+def size(content: Union[str, bytes]) -> int:
+    """Bytes of xml in a document or, uncompressed, in an archive"""
+    if isinstance(content, str):
+        return len(content.encode())
+    with zipfile.ZipFile(io.BytesIO(content)) as zipped:
+        return sum(info.file_size for info in zipped.infolist())
+
+
+def parse(kind: str, content: Union[str, bytes], backend=parsers):
+    """Parse content with the parser of its kind from a backend, entsoe.parsers by default"""
+    _, _, name, kwargs = KINDS[kind]
+    return getattr(backend, name)(content, **kwargs)
+
+
+def overlapping_pages(days: int, columns: int = 10, pages: int = 4, seed: int = 0) -> List[pd.DataFrame]:
+    """Pages of quarter hourly data that overlap by a day and miss some values"""
+    random = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-01', periods=days * 96, freq='15min', tz=TZ)
+    frames = []
+    for page in range(pages):
+        first = max(0, page * len(index) // pages - 96)
+        last = min(len(index), (page + 1) * len(index) // pages + 96)
+        frame = pd.DataFrame(random.random((last - first, columns)), index=index[first:last],
+                             columns=[f'column {i}' for i in range(columns)])
+        frames.append(frame.mask(random.random(frame.shape) < 0.1))
+    return frames
+
+
+class PageClient:
+    """Stands in for a client that is not planning, as query_pages needs one"""
+    _plan = None
+
+
+@documents_limited(100)
+def query_pages(client, pages, offset):
+    """documents_limited merging the given pages as if they were answers to offsets 0, 100, ..."""
+    if offset // 100 >= len(pages):
+        raise NoMatchingDataError
+    return pages[offset // 100]
@@ -0,0 +1,48 @@
+import json
+
+from . import compare
+
+
+def run(**medians):
+    """A pytest-benchmark report with the given medians, the iqr is 1% of them"""
+    return {
+        'machine_info': {'cpu': {'brand_raw': 'cpu'}, 'system': 'Linux', 'python_version': '3.11'},
+        'datetime': '2023-01-01T00:00:00',
+        'benchmarks': [
+            {'group': None, 'name': name, 'fullname': f'tests/benchmarks/test_hot_paths.py::{name}',
+             'stats': {'median': median, 'iqr': median / 100, 'rounds': 5},
+             'extra_info': {'memory': 10 ** 6}}
+            for name, median in medians.items()
+        ]
+    }
+
+
+def test_within_tolerance_and_noise():
+    baseline = compare.summarize(run(parse=1.0, merge=1.0))
+    current = compare.summarize(run(parse=1.05, merge=0.5))
+    frame = compare.compare(baseline, current)
+    assert list(frame['time']) == ['unchanged', 'improved']
+    assert len(compare.regressions(frame)) == 0
+
+    # a noisy baseline needs a larger change to count
+    baseline['benchmarks']['tests/benchmarks/test_hot_paths.py::parse']['iqr'] = 0.2
+    frame = compare.compare(baseline, compare.summarize(run(parse=1.5, merge=1.0)))
+    assert frame['time'][0] == 'unchanged'
+
+
+def test_hot_path_regression_fails(tmp_path):
+    baseline, current = tmp_path / 'baseline.json', tmp_path / 'run.json'
+    baseline.write_text(json.dumps(run(parse=1.0, merge=1.0)))
+    assert compare.main([str(baseline), '--baseline', str(baseline), '--save']) == 0
+    assert compare.load(str(baseline))['benchmarks']['tests/benchmarks/test_hot_paths.py::parse']['median'] == 1.0
+
+    slow = run(parse=1.3, merge=1.0)
+    slow['benchmarks'][1]['extra_info']['memory'] = 2 * 10 ** 6
+    current.write_text(json.dumps(slow))
+    frame = compare.compare(compare.load(str(baseline)), compare.load(str(current)))
+    frame.index = frame['benchmark'].str.split('::').str[-1]
+    assert frame.loc['parse', ['time', 'memory']].tolist() == ['regressed', 'unchanged']
+    assert frame.loc['merge', ['time', 'memory']].tolist() == ['unchanged', 'regressed']
+    assert compare.main([str(current), '--baseline', str(baseline)]) == 1
+    # only hot paths fail the gate
+    assert compare.main([str(current), '--baseline', str(baseline), '--hot', 'test_parsers']) == 0
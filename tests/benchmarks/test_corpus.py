@@ -0,0 +1,30 @@
+import inspect
+
+import pytest
+
+from entsoe import parsers
+
+from . import corpus
+
+
+def test_every_parser_has_a_fixture():
+    covered = {entry['parser'] for entry in corpus.entries()}
+    public = {name for name, func in inspect.getmembers(parsers, inspect.isfunction)
+              if name.startswith('parse_') and func.__module__ == parsers.__name__}
+    assert public - covered == set()
+
+
+@pytest.mark.parametrize('entry', corpus.entries(), ids=lambda entry: entry['name'])
+def test_fixture_parses(entry):
+    result = corpus.parse(entry, corpus.content(entry))
+    if isinstance(result, dict):
+        result = result['60min']
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize('entry', corpus.queries(), ids=lambda entry: entry['name'])
+def test_fixture_answers_query(entry):
+    client = corpus.client(entry)
+    result = corpus.query(client, entry)
+    assert len(result) > 0
+    assert len(client.session.get_adapter('https://').requests) > 0
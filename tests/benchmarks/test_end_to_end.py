@@ -0,0 +1,33 @@
+"""Queries over HTTP to the mock server, with its latency and pagination"""
+import threading
+
+import pytest
+
+from entsoe import EntsoePandasClient
+from entsoe.mockserver import MockEntsoeServer, Scenario, load_routes
+
+from . import corpus
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = MockEntsoeServer(('127.0.0.1', 0), load_routes(corpus.FIXTURES),
+                              Scenario(latency=0.01, jitter=0.01, seed=1))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('name', ['day_ahead_prices', 'unavailability_generation_units', 'imbalance_prices'])
+def test_end_to_end(benchmark, server, monkeypatch, name):
+    monkeypatch.setattr('entsoe.entsoe.URL', server.url)
+    entry = next(entry for entry in corpus.queries() if entry['name'] == name)
+    client = EntsoePandasClient(api_key='key')
+    benchmark.group = 'end to end'
+    benchmark.pedantic(corpus.query, args=(client, entry), rounds=5)
@@ -0,0 +1,33 @@
+"""
+The code most queries spend their time in, benchmarked on their own so a
+regression shows up even when it is small compared to a whole query
+"""
+import pytest
+
+from entsoe import parsers
+from entsoe.series_parsers import _extract_timeseries, _parse_timeseries_generic
+
+from . import corpus, synthetic
+
+pytest.importorskip('pytest_benchmark')
+
+
+def test_parse_timeseries_generic(benchmark):
+    # a month of quarter hours in daily periods
+    soup = next(_extract_timeseries(synthetic.generate('load', periods=31)))
+    benchmark.group = 'hot paths'
+    corpus.measure(benchmark, _parse_timeseries_generic, soup, 'quantity', True, True)
+
+
+def test_parse_unavailabilities(benchmark):
+    # a full page of outage documents
+    content = synthetic.generate('unavailability', documents=200, resolution='PT60M')
+    benchmark.group = 'hot paths'
+    corpus.measure(benchmark, parsers.parse_unavailabilities, content, 'A80')
+
+
+def test_documents_limited_merge(benchmark):
+    # a year of quarter hours
+    pages = synthetic.overlapping_pages(days=365)
+    benchmark.group = 'hot paths'
+    corpus.measure(benchmark, synthetic.query_pages, synthetic.PageClient(), pages)
@@ -0,0 +1,52 @@
+import os
+import types
+
+import pandas as pd
+import pytest
+
+from entsoe import parsers
+
+from . import parity
+
+# the backend to check, set it to a module with faster parse_* functions
+BACKEND = os.environ.get('ENTSOE_PARSER_BACKEND', 'entsoe.parsers')
+
+
+@pytest.mark.parametrize('case', parity.all_cases(), ids=lambda case: case.name)
+def test_backend_matches(case):
+    backend = parity.load_backend(BACKEND)
+    if not hasattr(backend, case.parser):
+        pytest.skip(f'{BACKEND} has no {case.parser}')
+    parity.assert_same(case.parse(parsers), case.parse(backend))
+
+
+def test_every_parser_has_a_case():
+    public = {name for name in dir(parsers) if name.startswith('parse_')}
+    assert public <= {case.parser for case in parity.all_cases()}
+
+
+def test_differences_are_found():
+    index = pd.date_range('2023-01-01', periods=4, freq='h', tz='Europe/Brussels')
+    columns = pd.MultiIndex.from_tuples([('Solar', 'Actual Aggregated'), ('Solar', 'Actual Consumption')])
+    expected = pd.DataFrame([[1.0, None], [2.0, 0.0], [3.0, 0.0], [4.0, 0.0]], index=index, columns=columns)
+    parity.assert_same(expected, expected.copy())
+    for actual in [expected.astype('float32'), expected.fillna(0), expected.droplevel(0, axis=1),
+                   expected.tz_convert('UTC'), expected['Solar']]:
+        with pytest.raises(AssertionError):
+            parity.assert_same(expected, actual)
+    with pytest.raises(AssertionError):
+        parity.assert_same({'15min': expected}, {'60min': expected})
+
+
+def test_run_reports_per_parser():
+    cases = [case for case in parity.corpus_cases() if case.parser in ('parse_prices', 'parse_loads', 'parse_water_hydro')]
+    backend = types.SimpleNamespace(
+        parse_prices=parsers.parse_prices,
+        parse_loads=lambda *args, **kwargs: parsers.parse_loads(*args, **kwargs).astype('float32'),
+    )
+    df = parity.run(backend, cases, repeat=1)
+    assert dict(zip(df['parser'], df['status'])) == {
+        'parse_prices': 'equal', 'parse_loads': 'different', 'parse_water_hydro': 'missing'}
+    summary = parity.report(df)
+    assert summary.loc['parse_prices', 'speedup'] > 0
+    assert pd.isna(summary.loc['parse_water_hydro', 'speedup'])
@@ -0,0 +1,14 @@
+"""Time of every parser on its fixture, run with pytest tests/benchmarks"""
+import pytest
+
+from . import corpus
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('entry', corpus.entries(), ids=lambda entry: entry['name'])
+def test_parser(benchmark, entry):
+    data = corpus.content(entry)
+    benchmark.group = 'parsers'
+    benchmark.extra_info['bytes'] = len(data)
+    corpus.measure(benchmark, corpus.parse, entry, data)
@@ -0,0 +1,17 @@
+"""
+Time of the pandas client methods on their fixture: the request to a fake
+transport, parsing and the post-processing (concatenation, deduplication,
+timezone conversion and truncation)
+"""
+import pytest
+
+from . import corpus
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('entry', corpus.queries(), ids=lambda entry: entry['name'])
+def test_query(benchmark, entry):
+    client = corpus.client(entry)
+    benchmark.group = 'queries'
+    corpus.measure(benchmark, corpus.query, client, entry)
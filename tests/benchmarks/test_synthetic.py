@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from . import scaling, synthetic
+
+
+@pytest.mark.parametrize('kind', list(synthetic.KINDS))
+def test_documents_parse(kind):
+    content = synthetic.generate(kind, series=2, periods=2, documents=2)
+    result = synthetic.parse(kind, content)
+    if isinstance(result, dict):
+        result = result['15min']
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize('start, points', [(synthetic.DST_SPRING, 96 + 92), (synthetic.DST_AUTUMN, 96 + 100)])
+def test_daylight_saving_days(start, points):
+    df = synthetic.parse('generation_per_plant', synthetic.generate('generation_per_plant', series=3, periods=2, start=start))
+    assert df.shape == (points, 3)
+    assert df.notna().all().all()
+
+
+def test_curve_types_agree():
+    # A03 leaves out repeated values which the parser fills in again
+    full = synthetic.generate('generation', series=4, periods=3, resolution='PT30M', curve_type='A01', seed=5)
+    compact = synthetic.generate('generation', series=4, periods=3, resolution='PT30M', curve_type='A03', seed=5)
+    assert len(compact) < len(full)
+    pd.testing.assert_frame_equal(synthetic.parse('generation', compact), synthetic.parse('generation', full),
+                                  check_freq=False)
+
+
+def test_scaling():
+    df = scaling.scaling(['load', 'unavailability'], [1, 2], repeat=1)
+    assert list(df['kind']) == ['load', 'load', 'unavailability', 'unavailability']
+    assert (df.groupby('kind')['bytes'].diff().dropna() > 0).all()
+    assert df['slope'].notna().sum() == 2
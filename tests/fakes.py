@@ -0,0 +1,77 @@
+import json
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+from entsoe import EntsoeRawClient
+
+PRICES = b'<Publication_MarketDocument><TimeSeries></TimeSeries></Publication_MarketDocument>'
+LOAD = b'''<GL_MarketDocument>
+<TimeSeries><outBiddingZone_Domain.mRID>10YBE----------2</outBiddingZone_Domain.mRID><curveType>A01</curveType>
+<Period><timeInterval><start>2023-01-01T00:00Z</start><end>2023-01-01T02:00Z</end></timeInterval>
+<resolution>PT60M</resolution>
+<Point><position>1</position><quantity>100</quantity></Point>
+<Point><position>2</position><quantity>200</quantity></Point>
+</Period></TimeSeries></GL_MarketDocument>'''
+NO_DATA = b'<Acknowledgement_MarketDocument><Reason><text>No matching data found</text></Reason></Acknowledgement_MarketDocument>'
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers every request with the same document and counts the calls"""
+
+    def __init__(self, content=PRICES, status_code=200):
+        super().__init__()
+        self.content = content
+        self.status_code = status_code
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response._content = self.content
+        response.status_code = self.status_code
+        response.headers['content-type'] = 'text/xml'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class FileLibraryAdapter(BaseAdapter):
+    """Token endpoint and a folder listing of the file library, counting token refreshes"""
+
+    def __init__(self, files=None, delay=0):
+        super().__init__()
+        self.files = [] if files is None else files
+        self.delay = delay
+        self.tokens = 0
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.status_code = 200
+        if 'token' in request.url:
+            self.tokens += 1
+            time.sleep(self.delay)
+            body = {'access_token': f'token-{self.tokens}', 'expires_in': 3600}
+        else:
+            body = {'contentItemList': self.files}
+        response._content = json.dumps(body).encode()
+        response.headers['content-type'] = 'application/json'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def fake_client(adapter, cls=EntsoeRawClient, **kwargs):
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return cls(api_key='key', session=session, **kwargs)
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from entsoe.backfill import Backfill
+
+START = pd.Timestamp('20230101', tz='Europe/Brussels')
+END = pd.Timestamp('20230401', tz='Europe/Brussels')
+
+
+class StubClient:
+    """Returns an hourly series per block and fails once on a chosen block"""
+
+    def __init__(self, fail_on=None):
+        self.cache = None
+        self.fail_on = {fail_on}
+        self.calls = []
+
+    def query_load(self, country_code, start, end):
+        self.calls.append(start)
+        if start in self.fail_on:
+            self.fail_on.discard(start)
+            raise ConnectionError('connection reset')
+        index = pd.date_range(start, end, freq='h', tz=start.tz)
+        return pd.Series(1.0, index=index)
+
+
+def test_backfill_resumes_after_failure(tmp_path):
+    client = StubClient(fail_on=pd.Timestamp('20230201', tz='Europe/Brussels'))
+    backfill = Backfill(client, 'query_load', 'BE', start=START, end=END, directory=str(tmp_path))
+    assert backfill.progress == (0, 3)
+
+    progress = []
+    with pytest.raises(ConnectionError):
+        backfill.run(on_progress=lambda done, total: progress.append(done))
+    assert progress == [1, 2]
+    assert not backfill.finished
+
+    # a new runner picks up the journal and only runs the failed block
+    resumed = Backfill(client, 'query_load', 'BE', start=START, end=END, directory=str(tmp_path))
+    assert resumed.progress == (2, 3)
+    series = resumed.run()
+    assert resumed.finished
+    assert client.calls.count(pd.Timestamp('20230101', tz='Europe/Brussels')) == 1
+    assert series.index.is_unique
+    assert series.index[0] == START and series.index[-1] == END
+
+
+def test_backfill_refuses_other_journal(tmp_path):
+    Backfill(StubClient(), 'query_load', 'BE', start=START, end=END, directory=str(tmp_path))
+    with pytest.raises(ValueError):
+        Backfill(StubClient(), 'query_load', 'NL', start=START, end=END, directory=str(tmp_path))
+
+
+def test_backfill_resumes_from_torn_journal(tmp_path, caplog):
+    client = StubClient()
+    Backfill(client, 'query_load', 'BE', start=START, end=END, directory=str(tmp_path)).run()
+    journal = tmp_path / Backfill.JOURNAL
+    lines = journal.read_text().splitlines(keepends=True)
+    # crash halfway through appending the record of the last block
+    journal.write_text(''.join(lines[:-1]) + lines[-1][:len(lines[-1]) // 2])
+
+    resumed = Backfill(client, 'query_load', 'BE', start=START, end=END, directory=str(tmp_path))
+    assert 'incomplete last line' in caplog.text
+    assert resumed.progress == (2, 3)
+    resumed.run()
+    assert resumed.finished
+    assert journal.read_text().splitlines()[:-1] == [line.rstrip('\n') for line in lines[:-1]]
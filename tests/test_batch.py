@@ -0,0 +1,53 @@
+import pandas as pd
+import requests
+
+from entsoe.batch import BatchJob, plan_batch, run_batch
+from entsoe.exceptions import NoMatchingDataError
+
+
+class FakeClient:
+    def query_load(self, country_code, start, end):
+        if country_code == 'FR':
+            raise requests.HTTPError('503 Server Error')
+        if country_code == 'NL':
+            raise NoMatchingDataError
+        return pd.Series(1.0, index=pd.date_range(start, end, freq='h'))
+
+    def query_crossborder_flows(self, country_code_from, country_code_to, start, end):
+        return pd.Series(2.0, index=pd.date_range(start, end, freq='h'))
+
+
+START = pd.Timestamp('20220101', tz='Europe/Brussels')
+END = pd.Timestamp('20240101', tz='Europe/Brussels')
+
+
+def test_plan_batch_splits_per_year():
+    units = plan_batch([BatchJob('query_load', 'BE'), BatchJob('query_unavailability_of_generation_units', 'BE')],
+                       START, END)
+    assert [u[0] for u in units] == [0, 0, 1]
+
+    # only the listed methods are kept whole, not any name mentioning outages
+    units = plan_batch([BatchJob('query_installed_generation_capacity_per_unit', 'BE'),
+                        BatchJob('query_unavailability_statistics', 'BE')], START, END)
+    assert [u[0] for u in units] == [0, 1, 1]
+
+
+def test_run_batch():
+    jobs = [
+        ('query_load', 'BE', {}),
+        ('query_load', 'FR', {}),
+        ('query_load', 'NL', {}),
+        BatchJob('query_crossborder_flows', ('BE', 'NL'), {'end': START + pd.Timedelta(days=1)}),
+    ]
+    result = run_batch(FakeClient(), jobs, start=START, end=END, max_workers=4)
+
+    be = result[0]
+    assert be.index.is_unique and be.index.is_monotonic_increasing
+    assert be.index[0] == START and be.index[-1] == END
+    assert result[1] is None and result[2] is None
+    assert len(result[3]) == 25
+
+    report = result.failure_report()
+    assert list(report['area']) == ['FR', 'NL']
+    assert list(report['error']) == ['HTTPError', 'NoMatchingDataError']
+    assert not result.ok
@@ -0,0 +1,68 @@
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from entsoe.breaker import CircuitBreaker
+from entsoe.cache import ResponseCache
+from entsoe.exceptions import CircuitOpenError
+
+from .fakes import FakeAdapter, PRICES, fake_client
+
+START = pd.Timestamp('20230101', tz='UTC')
+END = pd.Timestamp('20230102', tz='UTC')
+PARAMS = {'documentType': 'A44', 'in_Domain': '10YBE----------2', 'out_Domain': '10YBE----------2'}
+
+
+class DownAdapter(FakeAdapter):
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        raise requests.ConnectionError('connection refused')
+
+
+def test_breaker_states():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.failure()
+    assert breaker.state == 'closed'
+    breaker.failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    # one probe is let through, the rest waits for its outcome
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == 'open'
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_client_fails_fast_while_open():
+    adapter = DownAdapter()
+    client = fake_client(adapter, breaker=CircuitBreaker(failure_threshold=2), retry_delay=0)
+    with pytest.raises(CircuitOpenError):
+        client._base_request(PARAMS, start=START, end=END)
+    # the third attempt of the retry loop was not sent
+    assert len(adapter.requests) == 2
+
+
+def test_client_serves_stale_while_open():
+    adapter = FakeAdapter()
+    client = fake_client(adapter, breaker=CircuitBreaker(failure_threshold=1),
+                         cache=ResponseCache(ttl=pd.Timedelta(0)))
+    client._base_request(PARAMS, start=START, end=END)
+
+    adapter.status_code = 503
+    with pytest.raises(requests.HTTPError):
+        client._base_request(PARAMS, start=START, end=END)
+    assert client.breaker.state == 'open'
+
+    response = client._base_request(PARAMS, start=START, end=END)
+    assert response.content == PRICES
+    assert len(adapter.requests) == 2
@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from entsoe import EntsoeRawClient
+from entsoe.cache import CacheEntry, FreshnessPolicy, ResponseCache, TTLRule, request_key
+from entsoe.exceptions import NoMatchingDataError
+from entsoe.instrumentation import Hooks
+from entsoe.proxy import EntsoeProxyServer, response_cache
+from entsoe.ratelimit import RateLimiter
+from tests.fakes import NO_DATA, PRICES, FakeAdapter, fake_client
+
+START = pd.Timestamp('20230101', tz='Europe/Brussels')
+END = pd.Timestamp('20230102', tz='Europe/Brussels')
+
+
+def test_request_key_ignores_token_and_order():
+    assert request_key({'a': 1, 'b': 'x', 'securityToken': 'one'}) == \
+        request_key({'b': 'x', 'a': '1', 'securityToken': 'two'})
+    assert request_key({'a': 1}) != request_key({'a': 2})
+
+
+@pytest.mark.parametrize('persist', [False, True])
+def test_client_cache(tmp_path, persist):
+    adapter = FakeAdapter()
+    directory = str(tmp_path) if persist else None
+    client = fake_client(adapter, cache=ResponseCache(directory=directory))
+    assert client.query_day_ahead_prices('BE', START, END) == PRICES.decode()
+    assert client.query_day_ahead_prices('BE', START, END) == PRICES.decode()
+    assert len(adapter.requests) == 1
+    if persist:
+        client = fake_client(adapter, cache=ResponseCache(directory=directory))
+        assert client.query_day_ahead_prices('BE', START, END) == PRICES.decode()
+        assert len(adapter.requests) == 1
+
+
+def test_cache_skips_errors_and_stale_entries():
+    adapter = FakeAdapter(content=b'<html>Service unavailable</html>', status_code=503)
+    client = fake_client(adapter, cache=ResponseCache(ttl=pd.Timedelta(0)))
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.query_day_ahead_prices('BE', START, END)
+    assert len(adapter.requests) == 2
+
+    adapter.content, adapter.status_code = PRICES, 200
+    client.query_day_ahead_prices('BE', START, END)
+    client.query_day_ahead_prices('BE', START, END)
+    assert len(adapter.requests) == 4
+
+
+@pytest.mark.parametrize('status_code', [200, 400])
+def test_negative_cache(status_code):
+    adapter = FakeAdapter(content=NO_DATA, status_code=status_code)
+    client = fake_client(adapter, cache=ResponseCache(recent_negative_ttl=pd.Timedelta(0)))
+    for _ in range(2):
+        with pytest.raises(NoMatchingDataError):
+            client.query_day_ahead_prices('BE', START, END)
+    assert len(adapter.requests) == 1
+
+    # empty results for recent windows are not kept as long
+    recent_end = pd.Timestamp.now(tz='Europe/Brussels').floor('h')
+    for _ in range(2):
+        with pytest.raises(NoMatchingDataError):
+            client.query_day_ahead_prices('BE', recent_end - pd.Timedelta(days=1), recent_end)
+    assert len(adapter.requests) == 3
+
+    client = fake_client(adapter, cache=ResponseCache(negative_ttl=pd.Timedelta(0)))
+    for _ in range(2):
+        with pytest.raises(NoMatchingDataError):
+            client.query_day_ahead_prices('BE', START, END)
+    assert len(adapter.requests) == 5
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=2, per=1, burst=2)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.acquire()
+    assert not limiter.try_acquire()
+
+
+def test_proxy(monkeypatch):
+    adapter = FakeAdapter()
+    upstream = fake_client(adapter, cache=ResponseCache())
+    server = EntsoeProxyServer(('127.0.0.1', 0), upstream, allowed_tokens=['consumer'])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.setattr('entsoe.entsoe.URL', f'http://127.0.0.1:{server.server_address[1]}/api')
+        client = EntsoeRawClient(api_key='consumer')
+        assert client.query_day_ahead_prices('BE', START, END) == PRICES.decode()
+        assert client.query_day_ahead_prices('BE', START, END) == PRICES.decode()
+        assert len(adapter.requests) == 1
+        assert 'securityToken=key' in adapter.requests[0].url
+
+        with pytest.raises(requests.HTTPError):
+            EntsoeRawClient(api_key='other').query_day_ahead_prices('BE', START, END)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_proxy_cache_lifetime():
+    assert isinstance(response_cache().policy, FreshnessPolicy)
+    fixed = response_cache(ttl=60)
+    assert fixed.policy is None and fixed.ttl == pd.Timedelta(minutes=1)
+    forever = response_cache(forever=True)
+    assert forever.policy is None and forever.ttl is None
+
+
+def test_coalescing():
+    class SlowAdapter(FakeAdapter):
+        def send(self, request, **kwargs):
+            release.wait(5)
+            return super().send(request, **kwargs)
+
+    release = threading.Event()
+    adapter = SlowAdapter()
+    client = fake_client(adapter)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.query_day_ahead_prices('BE', START, END)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    # wait until one request is in flight and the other four joined it
+    while sum(call.waiters for call in list(client._inflight._calls.values())) < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [PRICES.decode()] * 5
+    assert len(adapter.requests) == 1
+
+
+def test_coalesced_events():
+    class SlowAdapter(FakeAdapter):
+        def send(self, request, **kwargs):
+            release.wait(5)
+            return super().send(request, **kwargs)
+
+    release = threading.Event()
+    hooks = Hooks()
+    events = []
+    hooks.register('after_response', events.append)
+    client = fake_client(SlowAdapter(), hooks=hooks)
+    threads = [threading.Thread(target=client.query_day_ahead_prices, args=('BE', START, END)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while sum(call.waiters for call in list(client._inflight._calls.values())) < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    # one event per caller, only one of them went upstream
+    assert len(events) == 5
+    assert sorted(event.coalesced for event in events) == [False] + [True] * 4
+    assert not any(event.cached for event in events)
+
+
+def test_freshness_policy():
+    now = pd.Timestamp.now(tz='UTC')
+
+    def ttl(params, period_end, policy=FreshnessPolicy()):
+        params = dict(params, periodEnd=period_end.strftime('%Y%m%d%H00'))
+        return policy.ttl(CacheEntry(b'', 200, 'text/xml', params, stored_at=now.timestamp()))
+
+    prices = {'documentType': 'A44'}
+    assert ttl(prices, now - pd.Timedelta(days=1)) is None
+    assert ttl(prices, now + pd.Timedelta(days=1)) == pd.Timedelta(minutes=15)
+
+    actual_load = {'documentType': 'A65', 'processType': 'A16'}
+    assert ttl(actual_load, now - pd.Timedelta(days=2)) == pd.Timedelta(minutes=15)
+    assert ttl(actual_load, now - pd.Timedelta(days=30)) is None
+    assert ttl({'documentType': 'A65', 'processType': 'A01'}, now - pd.Timedelta(days=2)) is None
+
+    outages = {'documentType': 'A80'}
+    assert ttl(outages, now - pd.Timedelta(days=30)) == pd.Timedelta(minutes=10)
+
+    custom = FreshnessPolicy(rules={'A44': TTLRule(final_after=None, recent_ttl=pd.Timedelta(0))})
+    assert ttl(prices, now - pd.Timedelta(days=100), policy=custom) == pd.Timedelta(0)
@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from entsoe import EntsoePandasClient, EntsoeRawClient
+from entsoe.cassette import Cassette
+from entsoe.exceptions import CacheMissError, NoMatchingDataError, PaginationError
+from entsoe.files import EntsoeFileClient
+from entsoe.manifest import offline_client
+from entsoe.mockserver import acknowledgement
+
+from .fakes import LOAD, NO_DATA, FakeAdapter, FileLibraryAdapter
+
+START = pd.Timestamp('2023-01-01', tz='Europe/Brussels')
+END = pd.Timestamp('2023-01-02', tz='Europe/Brussels')
+
+
+def read_cassette(directory):
+    contents = b''
+    for folder in ['entries', 'objects']:
+        for name in os.listdir(os.path.join(directory, folder)):
+            with open(os.path.join(directory, folder, name), 'rb') as stream:
+                contents += stream.read()
+    return contents
+
+
+def test_record_and_replay(tmp_path):
+    directory = str(tmp_path / 'cassette')
+    adapter = FakeAdapter(LOAD)
+    recording = EntsoePandasClient(api_key='secret-key', session=Cassette(directory, mode='record').session(adapter=adapter))
+    expected = recording.query_load('BE', start=START, end=END)
+    assert len(adapter.requests) == 1
+    assert b'secret-key' not in read_cassette(directory)
+
+    replaying = EntsoePandasClient(api_key='other', session=Cassette(directory).session())
+    pd.testing.assert_frame_equal(replaying.query_load('BE', start=START, end=END), expected)
+    # API requests have the key of the response cache
+    pd.testing.assert_frame_equal(offline_client(directory).query_load('BE', start=START, end=END), expected)
+    with pytest.raises(CacheMissError):
+        replaying.query_load('NL', start=START, end=END)
+
+
+def test_auto_records_misses_and_not_failures(tmp_path):
+    directory = str(tmp_path / 'cassette')
+    adapter = FakeAdapter(NO_DATA)
+    client = EntsoeRawClient(api_key='key', session=Cassette(directory, mode='auto').session(adapter=adapter))
+    for _ in range(2):
+        with pytest.raises(NoMatchingDataError):
+            client.query_load('BE', start=START, end=END)
+    assert len(adapter.requests) == 1
+
+    adapter.content, adapter.status_code = b'Service Unavailable', 503
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.query_load('NL', start=START, end=END)
+    assert len(adapter.requests) == 3
+
+    # a wrong key is not an answer to replay
+    adapter.content, adapter.status_code = b'Unauthorized', 401
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.query_load('DE_LU', start=START, end=END)
+    assert len(adapter.requests) == 5
+
+    adapter.content = acknowledgement('The amount of requested data exceeds allowed limit. '
+                                      'Allowed: 100 documents, requested: 150 documents.')
+    adapter.status_code = 400
+    for _ in range(2):
+        with pytest.raises(PaginationError):
+            client.query_load('FR', start=START, end=END)
+    assert len(adapter.requests) == 6
+
+
+def test_file_client(tmp_path):
+    directory = str(tmp_path / 'cassette')
+    adapter = FileLibraryAdapter(files=[{'name': 'file.csv', 'fileId': 1}])
+    session = Cassette(directory, mode='record').session(adapter=adapter)
+    files = EntsoeFileClient(username='user', pwd='secret-password', session=session).list_folder('folder')
+    contents = read_cassette(directory)
+    assert b'token-1' not in contents and b'secret-password' not in contents
+
+    replaying = EntsoeFileClient(username='other', pwd='other', session=Cassette(directory).session())
+    assert replaying.list_folder('folder') == files
+    assert replaying.access_token == 'redacted'
+    assert len(adapter.requests) == 2
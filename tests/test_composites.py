@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from entsoe import EntsoePandasClient
+from entsoe.exceptions import NoMatchingDataError
+
+START = pd.Timestamp('20230101', tz='Europe/Brussels')
+END = pd.Timestamp('20230102', tz='Europe/Brussels')
+DELAY = 0.3
+
+
+class SlowClient(EntsoePandasClient):
+    """Every leg takes DELAY seconds, the number of concurrent legs is tracked"""
+
+    def __init__(self, **kwargs):
+        super().__init__(api_key='key', **kwargs)
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def _leg(self, name, start, end):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(DELAY)
+        with self._lock:
+            self.running -= 1
+        return pd.DataFrame({name: 1.0}, index=pd.date_range(start, end, freq='h'))
+
+    def query_load(self, country_code, start, end):
+        return self._leg('Actual Load', start, end)
+
+    def query_load_forecast(self, country_code, start, end, process_type='A01'):
+        return self._leg('Forecasted Load', start, end)
+
+    def query_generation(self, country_code, start, end, psr_type=None, **kwargs):
+        return self._leg('Nuclear', start, end)
+
+    def query_crossborder_flows(self, country_code_from, country_code_to, start, end, **kwargs):
+        if country_code_from == 'GB':
+            raise NoMatchingDataError
+        return self._leg(country_code_from, start, end)[country_code_from]
+
+
+def test_load_and_forecast_runs_concurrently():
+    client = SlowClient()
+    began = time.perf_counter()
+    df = client.query_load_and_forecast('BE', start=START, end=END)
+    assert time.perf_counter() - began < 2 * DELAY
+    assert list(df.columns) == ['Forecasted Load', 'Actual Load']
+    assert client.max_running == 2
+
+
+def test_generation_import_runs_concurrently():
+    client = SlowClient(max_workers=8)
+    df = client.query_generation_import('BE', start=START, end=END)
+    assert client.max_running > 2
+    assert 'GB' not in df['Import'].columns
+    assert 'NL' in df['Import'].columns
+
+
+def test_sequential_with_one_worker():
+    client = SlowClient(max_workers=1)
+    client.query_load_and_forecast('BE', start=START, end=END)
+    assert client.max_running == 1
+
+
+def test_errors_are_raised_after_all_legs():
+    class FailingClient(SlowClient):
+        def query_load(self, country_code, start, end):
+            raise NoMatchingDataError
+
+    client = FailingClient()
+    with pytest.raises(NoMatchingDataError):
+        client.query_load_and_forecast('BE', start=START, end=END)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from entsoe.concurrency import AdaptiveConcurrency, run_concurrently
+
+from .fakes import FakeAdapter, fake_client
+
+
+def test_additive_increase_multiplicative_decrease():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=6, latency_target=1)
+    for _ in range(5):
+        concurrency.release(concurrency.acquire(), ok=True)
+    # about one round of limit healthy responses adds one
+    assert concurrency.limit == 5
+
+    concurrency.release(concurrency.acquire(), ok=False)
+    assert concurrency.limit == 2
+
+    for _ in range(50):
+        concurrency.release(concurrency.acquire(), ok=True)
+    assert concurrency.limit == 6
+
+    slow = AdaptiveConcurrency(initial=4, latency_target=0)
+    for _ in range(10):
+        slow.release(slow.acquire(), ok=True)
+    assert slow.limit == 4
+
+
+def test_one_cut_per_congestion():
+    concurrency = AdaptiveConcurrency(initial=8)
+    started = [concurrency.acquire() for _ in range(4)]
+    for s in started:
+        concurrency.release(s, ok=False)
+    # the requests were all sent before the first cut
+    assert concurrency.limit == 4
+
+
+def test_limit_bounds_requests_in_flight():
+    concurrency = AdaptiveConcurrency(initial=2, maximum=2)
+    peak = []
+    lock = threading.Lock()
+
+    def task():
+        with concurrency.slot():
+            with lock:
+                peak.append(concurrency.in_flight)
+            time.sleep(0.02)
+
+    run_concurrently([task] * 8, max_workers=8)
+    assert max(peak) == 2
+
+
+def test_client_backs_off_on_throttling():
+    concurrency = AdaptiveConcurrency(initial=8)
+    client = fake_client(FakeAdapter(status_code=429), concurrency=concurrency, retry_count=1)
+    assert client.max_workers == concurrency.maximum
+    client._request({'documentType': 'A44'})
+    assert concurrency.limit == 4
+    assert concurrency.in_flight == 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from entsoe.decorators import merge_blocks, time_indexed
+
+from .benchmarks.synthetic import PageClient, query_pages
+
+
+def deduplicate(group):
+    # the per group implementation documents_limited used before
+    if group.shape[0] == 1:
+        return group
+    return group.ffill().iloc[[-1]]
+
+
+def test_documents_limited_keeps_last_valid_value():
+    random = np.random.default_rng(0)
+    index = pd.date_range('2023-03-25', periods=4 * 96, freq='15min', tz='Europe/Brussels')
+    columns = pd.MultiIndex.from_tuples([('Solar', 'Actual Aggregated'), ('Solar', 'Actual Consumption'), ('Wind', '')])
+    pages = []
+    for first, last in [(0, 150), (100, 250), (200, 384), (300, 384)]:
+        page = pd.DataFrame(random.random((last - first, 3)), index=index[first:last], columns=columns)
+        pages.append(page.mask(random.random(page.shape) < 0.3))
+    pages[2][('Wind', '')] = np.nan
+
+    df = query_pages(PageClient(), pages)
+    expected = pd.concat(pages, sort=True)
+    expected = expected.groupby(expected.index).agg(deduplicate)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.index.is_unique and len(df) == len(index)
+
+    series = query_pages(PageClient(), [page[('Solar', 'Actual Aggregated')] for page in pages])
+    pd.testing.assert_series_equal(series, df[('Solar', 'Actual Aggregated')])
+
+
+def test_merge_blocks():
+    index = pd.date_range('2023-01-01', periods=3, freq='D', tz='Europe/Brussels')
+    first = pd.Series([1.0, 2.0], index=index[:2])
+    second = pd.Series([3.0, 4.0], index=index[1:])
+    merged = merge_blocks([(index[0], first), (index[1], None), (index[1], second)])
+    assert merged.tolist() == [1.0, 2.0, 4.0]
+
+    assert not time_indexed('query_unavailability_of_generation_units')
+    assert time_indexed('query_load')
+    assert len(merge_blocks([(index[0], first), (index[1], second)], truncate=False)) == 4
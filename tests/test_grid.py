@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from entsoe import EntsoePandasClient
+from entsoe.exceptions import NoMatchingDataError
+from entsoe.grid import flow_array, flow_totals
+
+START = pd.Timestamp('20230101', tz='Europe/Brussels')
+END = pd.Timestamp('20230102', tz='Europe/Brussels')
+
+
+class FakeFlowsClient(EntsoePandasClient):
+    def __init__(self):
+        super().__init__(api_key='key')
+        self.borders = []
+
+    def query_crossborder_flows(self, country_code_from, country_code_to, start, end, **kwargs):
+        self.borders.append((country_code_from, country_code_to))
+        if 'DE_AT_LU' in (country_code_from, country_code_to):
+            raise NoMatchingDataError
+        value = 1.0 if country_code_from < country_code_to else 2.0
+        return pd.Series(value, index=pd.date_range(start, end, freq='h', tz='Europe/Brussels'))
+
+
+def test_flow_matrix():
+    client = FakeFlowsClient()
+    matrix = client.query_crossborder_flow_matrix(START, END, areas=['BE', 'NL', 'FR', 'DE_AT_LU'])
+    assert len(client.borders) == len(set(client.borders))
+    assert ('BE', 'NL') in client.borders and ('NL', 'BE') in client.borders
+    assert str(matrix.index.tz) == 'UTC'
+    assert matrix[('BE', 'NL')].iloc[0] == 1.0
+    assert matrix[('NL', 'BE')].iloc[0] == 2.0
+
+    totals = flow_totals(matrix)
+    # BE exports 1 to both FR and NL, NL exports 2 to BE
+    assert totals[('export', 'BE')].iloc[0] == 2.0
+    assert totals[('import', 'BE')].iloc[0] == 4.0
+
+    index, zones, array = flow_array(matrix)
+    assert array.shape == (len(index), len(zones), len(zones))
+    assert array[0, zones.index('NL'), zones.index('BE')] == 2.0
+    assert np.isnan(array[0, zones.index('NL'), zones.index('FR')])
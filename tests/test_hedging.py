@@ -0,0 +1,83 @@
+import time
+
+from entsoe.concurrency import run_concurrently
+from entsoe.hedging import HedgingPolicy
+from entsoe.priority import request_priority
+from entsoe.ratelimit import RateLimiter
+
+from .fakes import FakeAdapter, PRICES, fake_client
+
+
+class SlowFirstAdapter(FakeAdapter):
+    """The first request hangs for a while, later ones are answered at once"""
+
+    def send(self, request, **kwargs):
+        first = len(self.requests) == 0
+        response = super().send(request, **kwargs)
+        if first:
+            time.sleep(0.5)
+        return response
+
+
+def policy():
+    hedging = HedgingPolicy(min_samples=5, min_delay=0.05)
+    for _ in range(5):
+        hedging.record(0.01)
+    return hedging
+
+
+def test_delay_quantile():
+    hedging = HedgingPolicy(min_samples=3, min_delay=0)
+    assert hedging.delay() is None
+    for latency in range(1, 21):
+        hedging.record(latency)
+    assert hedging.delay() == 19
+
+
+def test_hedged_request_wins():
+    adapter = SlowFirstAdapter()
+    client = fake_client(adapter, hedging=policy(), coalesce=False)
+    started = time.monotonic()
+    response = client._request({'documentType': 'A44'})
+    assert time.monotonic() - started < 0.4
+    assert response.content == PRICES
+    assert len(adapter.requests) == 2
+    assert (client.hedging.hedged, client.hedging.won) == (1, 1)
+
+
+def test_no_hedge_for_bulk_or_without_budget():
+    adapter = SlowFirstAdapter()
+    client = fake_client(adapter, hedging=policy(), coalesce=False)
+    with request_priority('bulk'):
+        client._request({'documentType': 'A44'})
+    assert client.hedging.hedged == 0
+
+    adapter = SlowFirstAdapter()
+    client = fake_client(adapter, hedging=policy(), coalesce=False,
+                         rate_limiter=RateLimiter(rate=1, per=60, burst=1))
+    client._request({'documentType': 'A44'})
+    assert client.hedging.hedged == 0
+    assert len(adapter.requests) == 1
+
+
+class SlowAdapter(FakeAdapter):
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        time.sleep(0.3)
+        return response
+
+
+def test_no_hedge_when_workers_are_busy():
+    adapter = SlowAdapter()
+    hedging = policy()
+    hedging.max_workers = 1
+    client = fake_client(adapter, hedging=hedging, coalesce=False)
+    started = time.monotonic()
+    outcomes = run_concurrently([
+        lambda i=i: client._request({'documentType': 'A44', 'offset': str(i)}) for i in range(4)
+    ], max_workers=4)
+    assert all(error is None for _, error in outcomes)
+    # requests beyond the free worker run on their own thread instead of queueing
+    assert time.monotonic() - started < 0.6
+    assert hedging.hedged == 0
+    assert len(adapter.requests) == 4
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+import requests
+
+from entsoe import EntsoePandasClient
+from entsoe.instrumentation import Hooks, RequestEvent
+
+from .fakes import LOAD, FakeAdapter, fake_client
+
+START = pd.Timestamp('20230101', tz='UTC')
+END = pd.Timestamp('20230101 02:00', tz='UTC')
+
+
+def recording_hooks():
+    hooks = Hooks()
+    events = {}
+    for name in ('before_request', 'after_response', 'on_retry', 'on_parse_done'):
+        hooks.register(name, lambda event, name=name: events.setdefault(name, []).append(event))
+    return hooks, events
+
+
+def test_request_and_parse_events():
+    hooks, events = recording_hooks()
+    client = fake_client(FakeAdapter(content=LOAD), cls=EntsoePandasClient, hooks=hooks)
+    client.query_load('BE', start=START, end=END)
+
+    request, = events['before_request']
+    assert request.endpoint == 'A65/A16'
+    assert 'securityToken' not in request.params
+    response, = events['after_response']
+    assert (response.status, response.bytes, response.cached) == (200, len(LOAD), False)
+    assert response.latency > 0
+    parse, = events['on_parse_done']
+    assert (parse.parser, parse.rows) == ('parse_loads', 2)
+
+
+class FlakyAdapter(FakeAdapter):
+    def send(self, request, **kwargs):
+        if len(self.requests) == 0:
+            self.requests.append(request)
+            raise requests.ConnectionError('connection reset')
+        return super().send(request, **kwargs)
+
+
+def test_retry_event_and_failing_hook():
+    hooks, events = recording_hooks()
+    hooks.register('after_response', lambda event: 1 / 0)
+    client = fake_client(FlakyAdapter(content=LOAD), cls=EntsoePandasClient, hooks=hooks, retry_delay=0)
+    df = client.query_load('BE', start=START, end=END)
+    # a broken hook does not break the query
+    assert len(df) == 2
+
+    retry, = events['on_retry']
+    assert retry.attempt == 1 and isinstance(retry.error, requests.ConnectionError)
+    # the params the failed request was sent with, as in its other events
+    assert retry.params == events['before_request'][0].params == events['after_response'][0].params
+    assert retry.endpoint == 'A65/A16' and 'periodStart' in retry.params
+    assert [e.attempt for e in events['after_response']] == [1, 2]
+    assert events['after_response'][0].error is not None
+
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        Hooks().register('on_everything', print)
+
+
+def test_prometheus_hooks():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from entsoe.instrumentation import prometheus_hooks
+
+    registry = prometheus_client.CollectorRegistry()
+    hooks = prometheus_hooks(registry=registry)
+    client = fake_client(FakeAdapter(content=LOAD), cls=EntsoePandasClient, hooks=hooks)
+    client.query_load('BE', start=START, end=END)
+    assert registry.get_sample_value(
+        'entsoe_requests_total', {'endpoint': 'A65/A16', 'status': '200', 'cached': 'false'}) == 1
+
+    # a caller that joined a request in flight is not another upstream request
+    hooks.emit('after_response', RequestEvent(endpoint='A65/A16', params={}, status=200,
+                                              bytes=len(LOAD), latency=0.1, coalesced=True))
+    assert registry.get_sample_value(
+        'entsoe_requests_total', {'endpoint': 'A65/A16', 'status': '200', 'cached': 'false'}) == 1
+    assert registry.get_sample_value('entsoe_response_bytes_total', {'endpoint': 'A65/A16'}) == len(LOAD)
@@ -0,0 +1,50 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from entsoe import EntsoePandasClient
+from entsoe.exceptions import CacheMissError
+from entsoe.manifest import fetch_manifest, offline_client, read_manifest, write_manifest
+from entsoe.proxy import EntsoeProxyServer
+from tests.fakes import LOAD, FakeAdapter, fake_client
+
+START = pd.Timestamp('20230101', tz='UTC')
+END = pd.Timestamp('20230101 02:00', tz='UTC')
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    adapter = FakeAdapter(content=LOAD)
+    server = EntsoeProxyServer(('127.0.0.1', 0), fake_client(adapter))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr('entsoe.entsoe.URL', f'http://127.0.0.1:{server.server_address[1]}/api')
+    yield adapter
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_manifest_roundtrip(tmp_path, upstream, processes):
+    planner = EntsoePandasClient(api_key='secret')
+    plans = [planner.plan('query_load', 'BE', start=START, end=END),
+             planner.plan('query_load', 'BE', start=START, end=END)]
+    manifest = str(tmp_path / 'manifest.jsonl')
+    assert write_manifest(manifest, *plans) == 1
+    assert 'secret' not in open(manifest).read()
+    assert read_manifest(manifest)[0]['params']['documentType'] == 'A65'
+
+    store = str(tmp_path / 'store')
+    report = fetch_manifest(manifest, store, api_key='key', processes=processes)
+    assert report['error'].isna().all()
+    assert len(upstream.requests) == 1
+    report = fetch_manifest(manifest, store, api_key='key', processes=processes)
+    assert report['cached'].all()
+    assert len(upstream.requests) == 1
+
+    client = offline_client(store)
+    df = client.query_load('BE', start=START, end=END)
+    assert list(df['Actual Load']) == [100, 200]
+    with pytest.raises(CacheMissError):
+        client.query_load('NL', start=START, end=END)
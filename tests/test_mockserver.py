@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from entsoe import EntsoePandasClient, EntsoeRawClient
+from entsoe.exceptions import NoMatchingDataError, PaginationError
+from entsoe.mockserver import MockEntsoeServer, Scenario, load_routes
+
+from .benchmarks import corpus
+
+START = pd.Timestamp('2023-01-01', tz='Europe/Brussels')
+END = pd.Timestamp('2023-01-08', tz='Europe/Brussels')
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = MockEntsoeServer(('127.0.0.1', 0), load_routes(corpus.FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr('entsoe.entsoe.URL', server.url)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def entry(name):
+    return next(entry for entry in corpus.entries() if entry['name'] == name)
+
+
+def test_replays_fixtures(server):
+    client = EntsoePandasClient(api_key='key')
+    for name in ['day_ahead_prices', 'imbalance_prices']:
+        expected = corpus.query(corpus.client(entry(name)), entry(name))
+        pd.testing.assert_frame_equal(pd.DataFrame(corpus.query(client, entry(name))), pd.DataFrame(expected))
+    with pytest.raises(NoMatchingDataError):
+        client.query_load('NL', start=START, end=END)
+
+
+def test_pages_and_limits(server):
+    server.scenario = Scenario(max_period=pd.Timedelta(days=10))
+    client = EntsoePandasClient(api_key='key')
+    unavailability = entry('unavailability_generation_units')
+    df = corpus.query(client, unavailability)
+    expected = corpus.query(corpus.client(unavailability), unavailability)
+
+    # the month and its halves are refused, the four quarters are read until
+    # the offset has no data and the fixture is replayed for each of them
+    periods = {(p['periodStart'], p['periodEnd']) for p in server.requests}
+    assert len(periods) == 1 + 2 + 4
+    assert len(df) == 4 * len(expected)
+    assert {p['offset'] for p in server.requests} == {'0', '200'}
+
+    server.scenario = Scenario(max_offset=0)
+    with pytest.raises(PaginationError):
+        EntsoeRawClient(api_key='key').query_unavailability_of_generation_units('BE', START, END, offset=100)
+
+
+def test_faults(server):
+    client = EntsoeRawClient(api_key='key', retry_count=2, retry_delay=0)
+    server.scenario = Scenario(unavailable=1)
+    with pytest.raises(requests.HTTPError) as error:
+        client.query_day_ahead_prices('BE', START, END)
+    assert error.value.response.status_code == 503
+
+    server.scenario = Scenario(throttle=1)
+    with pytest.raises(requests.HTTPError) as error:
+        client.query_day_ahead_prices('BE', START, END)
+    assert error.value.response.status_code == 429
+
+    server.scenario = Scenario(no_data=1)
+    with pytest.raises(NoMatchingDataError):
+        client.query_day_ahead_prices('BE', START, END)
+
+    server.requests.clear()
+    server.scenario = Scenario(disconnect=1)
+    with pytest.raises(requests.ConnectionError):
+        client.query_day_ahead_prices('BE', START, END)
+    assert len(server.requests) == 2
+
+    server.scenario = Scenario(latency=0.1)
+    started = time.perf_counter()
+    client.query_day_ahead_prices('BE', START, END)
+    assert time.perf_counter() - started >= 0.1
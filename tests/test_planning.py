@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from entsoe import EntsoePandasClient
+from entsoe.ratelimit import RateLimiter
+
+
+class NoNetworkAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        raise AssertionError(f'Planning sent a request to {request.url}')
+
+    def close(self):
+        pass
+
+
+def client(**kwargs):
+    session = requests.Session()
+    session.mount('https://', NoNetworkAdapter())
+    return EntsoePandasClient(api_key='key', session=session, **kwargs)
+
+
+START = pd.Timestamp('20220101', tz='Europe/Brussels')
+
+
+def test_plan_day_ahead_prices():
+    plan = client().plan('query_day_ahead_prices', 'BE', start=START, end=START + pd.Timedelta(days=400))
+    # padded by a day on both sides, split in two years, offsets 0 and 100 per year
+    assert plan.count == 4
+    assert plan.requests[0].start == (START - pd.Timedelta(days=1)).tz_convert('UTC')
+    assert plan.requests[-1].end == (START + pd.Timedelta(days=401)).tz_convert('UTC')
+    assert [r.params['offset'] for r in plan] == [0, 100, 0, 100]
+    assert all('securityToken' not in r.params for r in plan)
+
+
+def test_plan_day_limited_and_expected_documents():
+    plan = client().plan('query_generation_per_plant', 'BE', start=START, end=START + pd.Timedelta(days=3))
+    assert plan.count == 3
+
+    plan = client().plan('query_unavailability_of_generation_units', 'BE', start=START,
+                         end=START + pd.Timedelta(days=30), expected_documents=450)
+    assert [r.params['offset'] for r in plan] == [0, 200, 400, 600]
+
+
+def test_plan_composites_and_duration():
+    plan = client().plan('query_load_and_forecast', 'BE', start=START, end=START + pd.Timedelta(days=3))
+    assert sorted(r.params['processType'] for r in plan) == ['A01', 'A16']
+
+    plan = client(rate_limiter=RateLimiter(rate=1, per=2, burst=1)).plan(
+        'query_import', 'BE', start=START, end=START + pd.Timedelta(days=3))
+    assert plan.count == 5
+    assert plan.estimated_duration(latency=pd.Timedelta(0)) == pd.Timedelta(seconds=8)
+
+
+def test_plan_invalid_area_raises():
+    with pytest.raises(ValueError, match='Invalid country code'):
+        client().plan('query_load', 'XX', start=START, end=START + pd.Timedelta(days=3))
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from entsoe.concurrency import AdaptiveConcurrency, run_concurrently
+from entsoe.priority import Priority, current_priority, request_priority
+from entsoe.ratelimit import RateLimiter
+
+
+def test_priority_context_reaches_workers():
+    assert current_priority() == Priority.ROUTINE
+    with request_priority('bulk'):
+        outcomes = run_concurrently([current_priority] * 4, max_workers=4)
+    assert [result for result, _ in outcomes] == [Priority.BULK] * 4
+    assert current_priority() == Priority.ROUTINE
+
+
+def acquisition_order(acquire):
+    order = []
+    lock = threading.Lock()
+
+    def request(level):
+        acquire(level)
+        with lock:
+            order.append(level)
+
+    threads = [threading.Thread(target=request, args=(Priority.BULK,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    threads.append(threading.Thread(target=request, args=(Priority.INTERACTIVE,)))
+    threads[-1].start()
+    return threads, order
+
+
+def test_rate_limiter_serves_interactive_first():
+    limiter = RateLimiter(rate=10, per=1, burst=1)
+    limiter.acquire()
+    threads, order = acquisition_order(limiter.acquire)
+    for thread in threads:
+        thread.join()
+    assert order[0] == Priority.INTERACTIVE
+
+
+def test_concurrency_slot_goes_to_interactive_first():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=1, latency_target=1)
+    started = concurrency.acquire()
+    threads, order = acquisition_order(concurrency.acquire)
+    time.sleep(0.02)
+    concurrency.release(started, ok=True)
+    for _ in range(4):
+        while concurrency.in_flight == 0:
+            time.sleep(0.001)
+        concurrency.release(time.monotonic(), ok=True)
+    for thread in threads:
+        thread.join()
+    assert order[0] == Priority.INTERACTIVE
@@ -0,0 +1,44 @@
+import tracemalloc
+
+import pandas as pd
+
+from entsoe import EntsoePandasClient
+from entsoe.profiling import profile_report
+
+from .fakes import LOAD, FakeAdapter, fake_client
+
+START = pd.Timestamp('20230101', tz='UTC')
+END = pd.Timestamp('20230101 02:00', tz='UTC')
+
+
+def test_profile_attached_to_result():
+    client = fake_client(FakeAdapter(content=LOAD), cls=EntsoePandasClient, profile=True)
+    df = client.query_load('BE', start=START, end=END)
+
+    report = profile_report(df)
+    assert {'request', 'decode', 'parse', 'concat', 'tz_convert', 'truncate'} <= set(report.index)
+    assert report.loc['request', 'calls'] == 1
+    assert report['seconds'].sum() <= df.attrs['entsoe_profile']['total']
+    assert report['memory'].isna().all()
+
+    # the profile does not get in the way of combining results
+    assert len(pd.concat([df, df])) == 4
+
+
+def test_profile_memory_and_composites():
+    client = fake_client(FakeAdapter(content=LOAD), cls=EntsoePandasClient, profile=True)
+    tracemalloc.start()
+    try:
+        df = client.query_load_and_forecast('BE', start=START, end=END)
+    finally:
+        tracemalloc.stop()
+    report = profile_report(df)
+    # both sub-queries end up in the profile of the combined query
+    assert report.loc['request', 'calls'] == 2
+    assert (report['memory'] > 0).all()
+
+
+def test_profile_off_by_default():
+    client = fake_client(FakeAdapter(content=LOAD), cls=EntsoePandasClient)
+    df = client.query_load('BE', start=START, end=END)
+    assert 'entsoe_profile' not in df.attrs
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from entsoe.exceptions import NoMatchingDataError
+from entsoe.sync import CoverageIndex, EntsoeSync
+
+
+class FakeClient:
+    """Returns an hourly series of ones for every requested window"""
+
+    def __init__(self):
+        self.calls = []
+
+    def query_load(self, country_code, start, end):
+        self.calls.append((start, end))
+        index = pd.date_range(start, end, freq='h')
+        return pd.Series(1.0, index=index)
+
+
+START = pd.Timestamp('20230101', tz='Europe/Brussels')
+
+
+def test_coverage_gaps():
+    coverage = CoverageIndex()
+    coverage.add(START, START + pd.Timedelta(days=2))
+    coverage.add(START + pd.Timedelta(days=4), START + pd.Timedelta(days=5))
+    assert coverage.gaps(START, START + pd.Timedelta(days=6)) == [
+        (START + pd.Timedelta(days=2), START + pd.Timedelta(days=4)),
+        (START + pd.Timedelta(days=5), START + pd.Timedelta(days=6)),
+    ]
+    coverage.add(START + pd.Timedelta(days=1), START + pd.Timedelta(days=4))
+    assert coverage.covers(START, START + pd.Timedelta(days=5))
+    assert CoverageIndex.from_json(coverage.to_json()).intervals == coverage.intervals
+
+
+def test_sync_only_fetches_gaps(tmp_path):
+    client = FakeClient()
+    sync = EntsoeSync(client, str(tmp_path))
+    end = START + pd.Timedelta(days=10)
+
+    sync.sync('query_load', 'BE', start=START, end=START + pd.Timedelta(days=5))
+    assert client.calls == [(START, START + pd.Timedelta(days=5))]
+
+    result = sync.sync('query_load', 'BE', start=START, end=end)
+    assert client.calls[-1] == (START + pd.Timedelta(days=5), end)
+    assert result.index.is_unique and result.index.is_monotonic_increasing
+    assert len(result) == 10 * 24 + 1
+
+    # a fresh engine on the same directory has nothing left to do
+    client.calls = []
+    result = EntsoeSync(client, str(tmp_path)).sync('query_load', 'BE', start=START, end=end)
+    assert client.calls == []
+    assert len(result) == 10 * 24 + 1
+
+
+def test_sync_refetches_mutable_tail(tmp_path):
+    client = FakeClient()
+    sync = EntsoeSync(client, str(tmp_path), mutable_window=pd.Timedelta(days=2))
+    end = pd.Timestamp.now(tz='UTC').floor('h')
+    start = end - pd.Timedelta(days=5)
+    sync.sync('query_load', 'BE', start=start, end=end)
+    sync.sync('query_load', 'BE', start=start, end=end)
+    refetch_start, refetch_end = client.calls[-1]
+    assert refetch_end == end
+    assert start < refetch_start <= end - pd.Timedelta(days=2)
+
+
+def test_sync_no_data(tmp_path):
+    class EmptyClient:
+        def query_load(self, country_code, start, end):
+            raise NoMatchingDataError
+
+    sync = EntsoeSync(EmptyClient(), str(tmp_path))
+    with pytest.raises(NoMatchingDataError):
+        sync.sync('query_load', 'BE', start=START, end=START + pd.Timedelta(days=1))
+    assert sync.coverage('query_load', 'BE').covers(START, START + pd.Timedelta(days=1))
@@ -0,0 +1,43 @@
+import threading
+
+import pandas as pd
+import requests
+
+from entsoe.concurrency import run_concurrently
+from entsoe.files import EntsoeFileClient
+
+from .fakes import FakeAdapter, FileLibraryAdapter, fake_client
+
+
+def test_params_are_not_mutated():
+    adapter = FakeAdapter()
+    client = fake_client(adapter, coalesce=False)
+    params = {'documentType': 'A44', 'in_Domain': '10YBE----------2', 'out_Domain': '10YBE----------2'}
+    starts = [pd.Timestamp('20230101', tz='UTC') + pd.Timedelta(days=i) for i in range(8)]
+    run_concurrently([
+        lambda start=start: client._base_request(params, start=start, end=start + pd.Timedelta(days=1))
+        for start in starts
+    ], max_workers=8)
+    assert 'securityToken' not in params
+    periods = {r.url.split('periodStart=')[1][:12] for r in adapter.requests}
+    assert periods == {client._datetime_to_str(start) for start in starts}
+
+
+def test_file_client_refreshes_token_once():
+    # a slow token endpoint makes racing refreshes likely
+    adapter = FileLibraryAdapter(delay=0.05)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    client = EntsoeFileClient(username='user', pwd='pwd', session=session)
+    client.expire = pd.Timestamp.now(tz='Europe/Amsterdam')
+
+    barrier = threading.Barrier(8)
+
+    def list_folder():
+        barrier.wait()
+        return client.list_folder('EnergyPrices_12.1.D_r3')
+
+    outcomes = run_concurrently([list_folder] * 8, max_workers=8)
+    assert all(error is None for _, error in outcomes)
+    assert adapter.tokens == 2
+    assert client.access_token == 'token-2'